@@ -1,4 +1,13 @@
-from typing import NamedTuple
+from concurrent.futures import (
+    Executor,
+)
+from typing import (
+    Iterable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import rlp
 
@@ -102,6 +111,78 @@ def extract_transaction_sender(transaction: SignedTransactionAPI) -> Address:
     return Address(sender)
 
 
+def _recover_sender(vrs: VRS, message: bytes) -> Optional[Address]:
+    # the same checks as validate_transaction_signature
+    try:
+        signature = keys.Signature(vrs=vrs)
+        public_key = signature.recover_public_key_from_msg(message)
+    except (BadSignature, ValidationError):
+        return None
+
+    if not signature.verify_msg(message, public_key):
+        return None
+    else:
+        return Address(public_key.to_canonical_address())
+
+
+def recover_transaction_senders(transactions: Sequence[SignedTransactionAPI],
+                                executor: Executor,
+                                chunk_size: int = 64) -> None:
+    """
+    Recover the senders of ``transactions`` in ``executor`` (e.g. a ``ProcessPoolExecutor``),
+    ``chunk_size`` transactions per task, and cache each sender on its transaction, as if
+    its ``sender`` had been read. The signatures are checked as well, so validating these
+    transactions doesn't check them again.
+
+    Transactions with an invalid signature are left as they are: reading their sender
+    raises the error, as before.
+    """
+    pending_transactions = []
+    signatures = []
+    for transaction in transactions:
+        if vars(transaction).get('_is_signature_verified'):
+            continue
+        try:
+            vrs = (transaction.y_parity, transaction.r, transaction.s)
+            message = transaction.get_message_for_signing()
+        except ValidationError:
+            continue
+        pending_transactions.append(transaction)
+        signatures.append((vrs, message))
+
+    if not signatures:
+        return
+
+    senders = executor.map(_recover_sender, *zip(*signatures), chunksize=chunk_size)
+    for transaction, sender in zip(pending_transactions, senders):
+        if sender is not None:
+            # prime the cached_property
+            vars(transaction)['sender'] = sender
+            vars(transaction)['_is_signature_verified'] = True
+
+
+def get_transactions_accesses(
+        transactions: Iterable[SignedTransactionAPI]) -> Iterable[Tuple[Address, Sequence[int]]]:
+    """
+    Yield the accounts and storage slots which ``transactions`` are known to access before
+    they run, in the format of an access list: the sender and the recipient of each
+    transaction, and the entries of its access list.
+
+    The sender of a transaction with an invalid signature is left out, the transaction fails
+    its validation when it is applied.
+    """
+    for transaction in transactions:
+        try:
+            sender = transaction.sender
+        except (BadSignature, ValidationError):
+            pass
+        else:
+            yield sender, ()
+        if transaction.to != CREATE_CONTRACT_ADDRESS:
+            yield transaction.to, ()
+        yield from transaction.access_list
+
+
 class IntrinsicGasSchedule(NamedTuple):
     gas_tx: int
     gas_txcreate: int
@@ -2,6 +2,9 @@ from abc import (
     ABC,
     abstractmethod
 )
+from concurrent.futures import (
+    Executor,
+)
 from typing import (
     Any,
     Callable,
@@ -919,6 +922,14 @@ class DatabaseAPI(MutableMapping[bytes, bytes], ABC):
         """
         ...
 
+    @abstractmethod
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """
+        Return the values of the ``keys`` which are in the database, by key. Databases
+        which can read several keys at once, e.g. in a single round trip, do so.
+        """
+        ...
+
 
 class AtomicWriteBatchAPI(DatabaseAPI):
     """
@@ -943,6 +954,15 @@ class AtomicDatabaseAPI(DatabaseAPI):
         """
         ...
 
+    @abstractmethod
+    def write_only_batch(self) -> ContextManager[AtomicWriteBatchAPI]:
+        """
+        Like :meth:`atomic_batch`, for writes which are never read back before the batch is
+        committed. A backend may return a batch which can't be read from at all, and which
+        ignores deletes of missing keys, to avoid tracking the pending changes.
+        """
+        ...
+
 
 class HeaderDatabaseAPI(ABC):
     """
@@ -1450,6 +1470,22 @@ class MemoryAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def write_word(self, start_position: int, value: int) -> None:
+        """
+        Write the 32 byte big-endian representation of ``value`` into memory, without any
+        validation. The memory must already have been extended to fit the word.
+        """
+        ...
+
+    @abstractmethod
+    def write_byte(self, start_position: int, value: int) -> None:
+        """
+        Write the single byte ``value`` into memory, without any validation. The memory must
+        already have been extended to fit the byte.
+        """
+        ...
+
     @abstractmethod
     def read(self, start_position: int, size: int) -> memoryview:
         """
@@ -1464,6 +1500,14 @@ class MemoryAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def read_word(self, start_position: int) -> int:
+        """
+        Read 32 bytes from memory and return them as a big-endian int. The memory must
+        already have been extended to fit the word.
+        """
+        ...
+
 
 class StackAPI(ABC):
     """
@@ -1476,6 +1520,14 @@ class StackAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def push_int_unchecked(self, value: int) -> None:
+        """
+        Push an integer item onto the stack, without validating it. Only use this when
+        ``value`` is known to be a 256 bit unsigned integer.
+        """
+        ...
+
     @abstractmethod
     def push_bytes(self, value: bytes) -> None:
         """
@@ -1512,6 +1564,25 @@ class StackAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def pop2_ints(self) -> Tuple[int, int]:
+        """
+        Pop two items from the stack and return them as integers, the top of the stack first.
+
+        Raise `eth.exceptions.InsufficientStack` if there are not enough items on the stack.
+        """
+        ...
+
+    @abstractmethod
+    def pop3_ints(self) -> Tuple[int, int, int]:
+        """
+        Pop three items from the stack and return them as integers, the top of the stack
+        first.
+
+        Raise `eth.exceptions.InsufficientStack` if there are not enough items on the stack.
+        """
+        ...
+
     @abstractmethod
     def pop_any(self, num_items: int) -> Tuple[Union[int, bytes], ...]:
         """
@@ -1570,6 +1641,7 @@ class CodeStreamAPI(ABC):
     A class representing a stream of EVM code.
     """
     program_counter: int
+    superinstructions: Dict[int, Tuple[int, ...]]
 
     @abstractmethod
     def read(self, size: int) -> bytes:
@@ -1578,6 +1650,24 @@ class CodeStreamAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def read_push_int(self, size: int) -> int:
+        """
+        Read ``size`` bytes of PUSH data from the current position of the cursor and
+        return them as an int. Data that runs past the end of the code is treated as
+        zero bytes.
+        """
+        ...
+
+    @abstractmethod
+    def get_gas_block_costs(self, static_gas_costs: bytes) -> Dict[int, Tuple[int, int]]:
+        """
+        Return a mapping from the start of every gas block of the code to the static gas
+        cost of the opcodes at its head, and the number of those opcodes. See
+        :class:`~eth.vm.code_analysis.CodeAnalysis`.
+        """
+        ...
+
     @abstractmethod
     def __len__(self) -> int:
         """
@@ -1645,6 +1735,20 @@ class StackManipulationAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def stack_pop2_ints(self) -> Tuple[int, int]:
+        """
+        Pop two items from the stack and return their ordinal values, the top item first.
+        """
+        ...
+
+    @abstractmethod
+    def stack_pop3_ints(self) -> Tuple[int, int, int]:
+        """
+        Pop three items from the stack and return their ordinal values, the top item first.
+        """
+        ...
+
     @abstractmethod
     def stack_pop1_int(self) -> int:
         """
@@ -1674,6 +1778,14 @@ class StackManipulationAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def stack_push_int_unchecked(self, value: int) -> None:
+        """
+        Push ``value`` on the stack without validating it. ``value`` must be known to be
+        a 256 bit integer, e.g. because it was masked with ``UINT_256_MAX``.
+        """
+        ...
+
     @abstractmethod
     def stack_push_bytes(self, value: bytes) -> None:
         """
@@ -1887,6 +1999,31 @@ class ComputationAPI(ContextManager['ComputationAPI'], StackManipulationAPI):
         """
         ...
 
+    @abstractmethod
+    def memory_write_word(self, start_position: int, value: int) -> None:
+        """
+        Write the 32 byte big-endian representation of ``value`` to memory at
+        ``start_position``, without any validation. The memory must already have been
+        extended to fit the word.
+        """
+        ...
+
+    @abstractmethod
+    def memory_write_byte(self, start_position: int, value: int) -> None:
+        """
+        Write the single byte ``value`` to memory at ``start_position``, without any
+        validation. The memory must already have been extended to fit the byte.
+        """
+        ...
+
+    @abstractmethod
+    def memory_read_word(self, start_position: int) -> int:
+        """
+        Read 32 bytes from memory starting at ``start_position`` and return them as a
+        big-endian int. The memory must already have been extended to fit the word.
+        """
+        ...
+
     #
     # Gas Consumption
     #
@@ -1957,6 +2094,13 @@ class ComputationAPI(ContextManager['ComputationAPI'], StackManipulationAPI):
         """
         ...
 
+    @abstractmethod
+    def stack_size(self) -> int:
+        """
+        Return the number of items on the stack.
+        """
+        ...
+
     #
     # Computation result
     #
@@ -2134,6 +2278,16 @@ class ComputationAPI(ContextManager['ComputationAPI'], StackManipulationAPI):
         ...
 
 
+class StorageChanges(NamedTuple):
+    """
+    The changes made to the storage of an account since it was last persisted.
+    """
+    # The storage root before the storage was wiped, or None if it was not wiped
+    wiped_root: Optional[Hash32]
+    # The rlp-encoded value of every written slot, by slot hash (b'' for deleted slots)
+    slots: Dict[Hash32, bytes]
+
+
 class AccountStorageDatabaseAPI(ABC):
     """
     Storage cache and write batch for a single account. Changes are not
@@ -2215,6 +2369,14 @@ class AccountStorageDatabaseAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def get_storage_changes(self) -> StorageChanges:
+        """
+        Return the changes to the storage trie since the last persist, made by
+        :meth:`make_storage_root`.
+        """
+        ...
+
     @abstractmethod
     def persist(self, db: DatabaseAPI) -> None:
         """
@@ -2229,6 +2391,20 @@ class AccountStorageDatabaseAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def prefetch(self, slots: Iterable[int]) -> None:
+        """
+        Read the values of ``slots`` into the cache, in a batch, ahead of their use.
+        """
+        ...
+
+    @abstractmethod
+    def fork(self) -> 'AccountStorageDatabaseAPI':
+        """
+        Return a copy-on-write fork of the storage, see :meth:`AccountDatabaseAPI.fork`.
+        """
+        ...
+
 
 class AccountAPI(ABC):
     """
@@ -2515,6 +2691,30 @@ class AccountDatabaseAPI(ABC):
         """
         ...
 
+    @abstractmethod
+    def prefetch(self, accounts: Iterable[Tuple[Address, Sequence[int]]]) -> None:
+        """
+        Read the ``accounts`` and their storage slots into the caches, in batches, ahead of
+        their use. ``accounts`` is in the format of an access list: pairs of an address and
+        a sequence of slots, which may be empty.
+
+        Reading the state this way doesn't change it, and entries which can't be read, e.g.
+        because of a missing trie node, are skipped.
+        """
+        ...
+
+    @abstractmethod
+    def fork(self) -> 'AccountDatabaseAPI':
+        """
+        Return a copy-on-write fork of the current state, including the changes which are
+        not persisted yet, as if they were locked at the start of a new transaction.
+
+        The fork reads through to this database, and keeps its own changes, which can
+        be discarded by dropping the fork. This database must not be changed while the fork
+        is in use. A fork can't make a state root or be persisted.
+        """
+        ...
+
 
 class TransactionExecutorAPI(ABC):
     """
@@ -2936,6 +3136,22 @@ class StateAPI(ConfigurableAPI):
         """
         ...
 
+    @abstractmethod
+    def prefetch(self, accounts: Iterable[Tuple[Address, Sequence[int]]]) -> None:
+        """
+        Read the ``accounts`` and storage slots about to be used into the caches, in batches.
+        See :meth:`AccountDatabaseAPI.prefetch`.
+        """
+        ...
+
+    @abstractmethod
+    def fork(self) -> 'StateAPI':
+        """
+        Return a copy-on-write fork of the state, to execute transactions or calls on, e.g.
+        for ``eth_call``, without changing this state. See :meth:`AccountDatabaseAPI.fork`.
+        """
+        ...
+
     #
     # Access self.prev_hashes (Read-only)
     #
@@ -3095,6 +3311,8 @@ class VirtualMachineAPI(ConfigurableAPI):
     extra_data_max_bytes: ClassVar[int]
     consensus_class: Type[ConsensusAPI]
     consensus_context: ConsensusContextAPI
+    sender_recovery_executor: Executor
+    min_parallel_sender_recoveries: int
 
     @abstractmethod
     def __init__(self,
@@ -3281,6 +3499,22 @@ class VirtualMachineAPI(ConfigurableAPI):
         """
         ...
 
+    @abstractmethod
+    def append_block_transaction(self,
+                                 base_block: BlockAPI,
+                                 new_header: BlockHeaderAPI,
+                                 transaction: SignedTransactionAPI,
+                                 receipt: ReceiptAPI) -> BlockAPI:
+        """
+        Create a new block with ``transaction`` added after the transactions of
+        ``base_block``, and ``receipt`` after its receipts.
+
+        This is equivalent to :meth:`set_block_transactions` with all the transactions and
+        receipts, but only updates the transaction and receipt tries of ``base_block``
+        instead of building them again.
+        """
+        ...
+
     #
     # Finalization
     #
@@ -4000,6 +4234,22 @@ class ChainAPI(ConfigurableAPI):
         """
         ...
 
+    @abstractmethod
+    def import_blocks(self,
+                      blocks: Iterable[BlockAPI],
+                      perform_validation: bool = True,
+                      ) -> Iterator[BlockImportResult]:
+        """
+        Import the given ``blocks`` one after the other, like :meth:`import_block`, and
+        yield the result of each import.
+
+        The blocks are imported as the results are consumed. The headers and seals of the
+        next blocks are validated in a worker thread, and their senders recovered, while a
+        block is executed, so ``blocks`` is iterated in that thread too. Stop consuming the
+        results to stop the import, after the last yielded block.
+        """
+        ...
+
     #
     # Validation API
     #
@@ -4048,7 +4298,8 @@ class ChainAPI(ConfigurableAPI):
 
         By default, check the seal validity (Proof-of-Work on Ethereum 1.x mainnet) of all headers.
         This can be expensive. Instead, check a random sample of seals using
-        seal_check_random_sample_rate.
+        seal_check_random_sample_rate, or check the headers in a worker pool, see
+        :attr:`~eth.chains.base.BaseChain.header_validation_executor`.
         """
         ...
 
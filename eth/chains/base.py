@@ -1,13 +1,22 @@
+from concurrent.futures import (
+    Executor,
+)
 import operator
+import queue
 import random
+import threading
 from typing import (
     Any,
     Callable,
     Dict,
     Iterable,
+    Iterator,
+    List,
     Sequence,
+    Set,
     Tuple,
     Type,
+    Union,
 )
 
 import logging
@@ -34,9 +43,13 @@ from eth._utils.datatypes import (
 from eth._utils.rlp import (
     validate_imported_block_unchanged,
 )
+from eth._utils.transactions import (
+    recover_transaction_senders,
+)
 from eth.abc import (
     BlockAPI,
     BlockAndMetaWitness,
+    ConsensusAPI,
     MiningChainAPI,
     AtomicDatabaseAPI,
     BlockHeaderAPI,
@@ -109,6 +122,28 @@ with catch_and_ignore_import_warning():
     )
 
 
+HeaderPair = Tuple[BlockHeaderAPI, BlockHeaderAPI]
+
+# The headers to check with a VM class and its consensus, with whether to check their seals
+HeaderValidationChunk = Tuple[Type[VirtualMachineAPI], ConsensusAPI, List[HeaderPair], List[bool]]
+
+
+def _validate_header_chunk(vm_class: Type[VirtualMachineAPI],
+                           consensus: ConsensusAPI,
+                           header_pairs: Sequence[HeaderPair],
+                           seal_checks: Sequence[bool]) -> None:
+    for (parent, child), check_seal in zip(header_pairs, seal_checks):
+        try:
+            vm_class.validate_header(child, parent)
+        except ValidationError as exc:
+            raise ValidationError(
+                f"{child} is not a valid child of {parent}: {exc}"
+            ) from exc
+
+        if check_seal:
+            consensus.validate_seal(child)
+
+
 class BaseChain(Configurable, ChainAPI):
     """
     The base class for all Chain objects
@@ -119,6 +154,15 @@ class BaseChain(Configurable, ChainAPI):
     vm_configuration: Tuple[Tuple[BlockNumber, Type[VirtualMachineAPI]], ...] = None
     chain_id: int = None
 
+    # An executor to check the headers of validate_chain() in, e.g. a ProcessPoolExecutor to
+    # check the proofs of work of a headers-first sync on several cores. The headers are sent
+    # to the workers in chunks of consecutive headers of the same VM, with the VM class and
+    # its consensus, which must be picklable for a ProcessPoolExecutor (the mainnet VMs and
+    # PowConsensus are). Shorter header chains are checked in the calling thread.
+    header_validation_executor: Executor = None
+    min_parallel_header_validations: int = 256
+    header_validation_chunk_size: int = 128
+
     @classmethod
     def get_vm_class_for_block_number(cls, block_number: BlockNumber) -> Type[VirtualMachineAPI]:
         if cls.vm_configuration is None:
@@ -153,24 +197,53 @@ class BaseChain(Configurable, ChainAPI):
             sample_size = len(all_indices) // seal_check_random_sample_rate
             indices_to_check_seal = set(random.sample(all_indices, sample_size))
 
-        header_pairs = sliding_window(2, concatv([root], descendants))
+        header_pairs = tuple(sliding_window(2, concatv([root], descendants)))
 
-        for index, (parent, child) in enumerate(header_pairs):
+        # The linkage of the headers is checked first, in order, so that the other checks,
+        # which only need a header and its parent, can run on the headers in any order
+        for parent, child in header_pairs:
             if child.parent_hash != parent.hash:
                 raise ValidationError(
                     f"Invalid header chain; {child} has parent {encode_hex(child.parent_hash)},"
                     f" but expected {encode_hex(parent.hash)}"
                 )
-            vm = self.get_vm(child)
-            try:
-                vm.validate_header(child, parent)
-            except ValidationError as exc:
-                raise ValidationError(
-                    f"{child} is not a valid child of {parent}: {exc}"
-                ) from exc
 
-            if index in indices_to_check_seal:
-                vm.validate_seal(child)
+        chunks = self._get_header_validation_chunks(header_pairs, indices_to_check_seal)
+        executor = self.header_validation_executor
+        if executor is None or len(header_pairs) < self.min_parallel_header_validations:
+            for chunk in chunks:
+                _validate_header_chunk(*chunk)
+        else:
+            futures = [executor.submit(_validate_header_chunk, *chunk) for chunk in chunks]
+            try:
+                # raise the error of the first invalid header in the chain
+                for future in futures:
+                    future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _get_header_validation_chunks(
+            self,
+            header_pairs: Sequence[HeaderPair],
+            indices_to_check_seal: Set[int],
+    ) -> List[HeaderValidationChunk]:
+        # A single VM is built for each VM class, instead of one for every header
+        consensus_by_vm_class: Dict[Type[VirtualMachineAPI], ConsensusAPI] = {}
+        chunks: List[HeaderValidationChunk] = []
+        for index, (parent, child) in enumerate(header_pairs):
+            vm_class = self.get_vm_class(child)
+            if vm_class not in consensus_by_vm_class:
+                vm = self.get_vm(child)
+                consensus_by_vm_class[vm_class] = vm.consensus_class(vm.consensus_context)
+
+            if (not chunks
+                    or chunks[-1][0] is not vm_class
+                    or len(chunks[-1][2]) == self.header_validation_chunk_size):
+                chunks.append((vm_class, consensus_by_vm_class[vm_class], [], []))
+            chunks[-1][2].append((parent, child))
+            chunks[-1][3].append(index in indices_to_check_seal)
+        return chunks
 
     def validate_chain_extension(self, headers: Tuple[BlockHeaderAPI, ...]) -> None:
         for index, header in enumerate(headers):
@@ -188,6 +261,9 @@ class Chain(BaseChain):
     chaindb_class: Type[ChainDatabaseAPI] = ChainDB
     consensus_context_class: Type[ConsensusContextAPI] = ConsensusContext
 
+    # The number of blocks that import_blocks() validates ahead of the block it imports
+    max_pending_imports: int = 16
+
     def __init__(self, base_db: AtomicDatabaseAPI) -> None:
         if not self.vm_configuration:
             raise ValueError(
@@ -457,7 +533,12 @@ class Chain(BaseChain):
                      block: BlockAPI,
                      perform_validation: bool = True
                      ) -> BlockImportResult:
+        return self._import_block(block, perform_validation, self.validate_block)
 
+    def _import_block(self,
+                      block: BlockAPI,
+                      perform_validation: bool,
+                      validate_block: Callable[[BlockAPI], None]) -> BlockImportResult:
         try:
             parent_header = self.get_block_header_by_hash(block.header.parent_hash)
         except HeaderNotFound:
@@ -481,10 +562,97 @@ class Chain(BaseChain):
             except ValidationError:
                 self.logger.warning("Proposed %s doesn't follow EVM rules, rejecting...", block)
                 raise
+            validate_block(imported_block)
 
-        persist_result = self.persist_block(imported_block, perform_validation)
+        persist_result = self.persist_block(imported_block, perform_validation=False)
         return BlockImportResult(*persist_result, block_result.meta_witness)
 
+    def import_blocks(self,
+                      blocks: Iterable[BlockAPI],
+                      perform_validation: bool = True) -> Iterator[BlockImportResult]:
+        # Each block is executed on top of the state and the header persisted for its
+        # parent, so the blocks are executed and persisted one after the other, in this
+        # thread. The headers and seals are validated, and the senders recovered, in a
+        # worker thread, up to max_pending_imports blocks ahead.
+        pending_blocks: 'queue.Queue[Union[Tuple[BlockAPI, bool], BaseException, None]]' = (
+            queue.Queue(self.max_pending_imports)
+        )
+        stop_event = threading.Event()
+        worker = threading.Thread(
+            target=self._prepare_blocks_for_import,
+            args=(blocks, perform_validation, pending_blocks, stop_event),
+            name='eth.chains.base.Chain.import_blocks',
+            daemon=True,
+        )
+        worker.start()
+        try:
+            while True:
+                pending_block = pending_blocks.get()
+                if pending_block is None:
+                    return
+                elif isinstance(pending_block, BaseException):
+                    raise pending_block
+
+                block, is_header_validated = pending_block
+                if is_header_validated:
+                    yield self._import_block(block, perform_validation, self._validate_ancestry)
+                else:
+                    yield self._import_block(block, perform_validation, self.validate_block)
+        finally:
+            stop_event.set()
+            worker.join()
+
+    def _prepare_blocks_for_import(
+            self,
+            blocks: Iterable[BlockAPI],
+            perform_validation: bool,
+            pending_blocks: 'queue.Queue[Union[Tuple[BlockAPI, bool], BaseException, None]]',
+            stop_event: threading.Event) -> None:
+
+        def put_pending(pending_block: Union[Tuple[BlockAPI, bool], BaseException, None]) -> bool:
+            # wait for room in the queue, unless the import stopped
+            while not stop_event.is_set():
+                try:
+                    pending_blocks.put(pending_block, timeout=0.1)
+                except queue.Full:
+                    continue
+                else:
+                    return True
+            return False
+
+        try:
+            previous_header = None
+            for block in blocks:
+                header = block.header
+                is_header_validated = False
+                if perform_validation:
+                    if previous_header is not None and header.parent_hash == previous_header.hash:
+                        parent_header = previous_header
+                    else:
+                        try:
+                            parent_header = self.get_block_header_by_hash(header.parent_hash)
+                        except HeaderNotFound:
+                            # the parent may not be imported yet, validate the header on import
+                            parent_header = None
+
+                    if parent_header is not None:
+                        self._validate_header_and_seal(header, parent_header)
+                        is_header_validated = True
+
+                vm_class = self.get_vm_class(header)
+                executor = vm_class.sender_recovery_executor
+                if (executor is not None
+                        and len(block.transactions) >= vm_class.min_parallel_sender_recoveries):
+                    recover_transaction_senders(block.transactions, executor)
+
+                if not put_pending((block, is_header_validated)):
+                    return
+                previous_header = header
+        except BaseException as exc:
+            put_pending(exc)
+        else:
+            put_pending(None)
+
     def persist_block(
             self,
             block: BlockAPI,
@@ -504,8 +672,9 @@ class Chain(BaseChain):
             encode_hex(block.hash),
         )
 
+        # The persisted block is usually the only new canonical block, don't read it back
         new_canonical_blocks = tuple(
-            self.get_block_by_hash(header_hash)
+            block if header_hash == block.hash else self.get_block_by_hash(header_hash)
             for header_hash
             in new_canonical_hashes
         )
@@ -531,11 +700,22 @@ class Chain(BaseChain):
     def validate_block(self, block: BlockAPI) -> None:
         if block.is_genesis:
             raise ValidationError("Cannot validate genesis block this way")
-        vm = self.get_vm(block.header)
         parent_header = self.get_block_header_by_hash(block.header.parent_hash)
-        vm.validate_header(block.header, parent_header)
-        vm.validate_seal(block.header)
-        vm.validate_seal_extension(block.header, ())
+        self._validate_header_and_seal(block.header, parent_header)
+        self._validate_ancestry(block)
+
+    def _validate_header_and_seal(self,
+                                  header: BlockHeaderAPI,
+                                  parent_header: BlockHeaderAPI) -> None:
+        # The checks of validate_block() which only need the header and its parent
+        vm = self.get_vm(header)
+        vm.validate_header(header, parent_header)
+        vm.validate_seal(header)
+
+    def _validate_ancestry(self, block: BlockAPI) -> None:
+        # The checks of validate_block() which read the ancestors of the block from the
+        # database
+        self.get_vm(block.header).validate_seal_extension(block.header, ())
         self.validate_uncles(block)
 
     def validate_seal(self, header: BlockHeaderAPI) -> None:
@@ -627,11 +807,16 @@ class MiningChain(Chain, MiningChainAPI):
         super().__init__(base_db)
         self.header = self.ensure_header(header)
 
+        # The block built by the last apply_transaction() and its receipts, so that the next
+        # transaction doesn't have to decode all the previous ones from the database again.
+        self._pending_block: BlockAPI = None
+        self._pending_receipts: Tuple[ReceiptAPI, ...] = ()
+
     def apply_transaction(self,
                           transaction: SignedTransactionAPI
                           ) -> Tuple[BlockAPI, ReceiptAPI, ComputationAPI]:
         vm = self.get_vm(self.header)
-        base_block = vm.get_block()
+        base_block, base_receipts = self._get_pending_block_and_receipts(vm)
 
         receipt, computation = vm.apply_transaction(base_block.header, transaction)
         header_with_receipt = vm.add_receipt_to_header(base_block.header, receipt)
@@ -640,15 +825,39 @@ class MiningChain(Chain, MiningChainAPI):
         vm.state.persist()
         new_header: BlockHeaderAPI = header_with_receipt.copy(state_root=vm.state.state_root)
 
-        transactions = base_block.transactions + (transaction, )
-        receipts = base_block.get_receipts(self.chaindb) + (receipt, )
-
-        new_block = vm.set_block_transactions(base_block, new_header, transactions, receipts)
+        new_block = vm.append_block_transaction(base_block, new_header, transaction, receipt)
 
         self.header = new_block.header
+        self._pending_block = new_block
+        self._pending_receipts = base_receipts + (receipt, )
 
         return new_block, receipt, computation
 
+    def _get_pending_block_and_receipts(
+            self,
+            vm: VirtualMachineAPI) -> Tuple[BlockAPI, Tuple[ReceiptAPI, ...]]:
+
+        pending_block = self._pending_block
+        header = self.header
+
+        # The pending header may have been replaced since (by set_header_timestamp(), or by
+        # mining or importing a block), but the roots tell if the block contents are the same.
+        if (
+            pending_block is not None
+            and pending_block.header.transaction_root == header.transaction_root
+            and pending_block.header.receipt_root == header.receipt_root
+            and pending_block.header.uncles_hash == header.uncles_hash
+        ):
+            base_block = type(pending_block)(
+                header=header,
+                transactions=pending_block.transactions,
+                uncles=pending_block.uncles,
+            )
+            return base_block, self._pending_receipts
+        else:
+            base_block = vm.get_block()
+            return base_block, base_block.get_receipts(self.chaindb)
+
     def import_block(self,
                      block: BlockAPI,
                      perform_validation: bool = True
@@ -659,6 +868,13 @@ class MiningChain(Chain, MiningChainAPI):
         self.header = self.ensure_header()
         return result
 
+    def import_blocks(self,
+                      blocks: Iterable[BlockAPI],
+                      perform_validation: bool = True) -> Iterator[BlockImportResult]:
+        for result in super().import_blocks(blocks, perform_validation):
+            self.header = self.ensure_header()
+            yield result
+
     def set_header_timestamp(self, timestamp: int) -> None:
         self.header = self.header.copy(timestamp=timestamp)
 
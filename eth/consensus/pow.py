@@ -1,7 +1,17 @@
 from collections import OrderedDict
+from concurrent.futures import (
+    Executor,
+)
+import fcntl
+import mmap
+import os
+from pathlib import Path
 from typing import (
     Iterable,
+    List,
+    Sequence,
     Tuple,
+    Union,
 )
 
 from eth_typing import (
@@ -36,11 +46,22 @@ from eth.validation import (
 
 
 # Type annotation here is to ensure we don't accidentally use strings instead of bytes.
-cache_by_epoch: 'OrderedDict[int, bytearray]' = OrderedDict()
+cache_by_epoch: 'OrderedDict[int, Union[bytes, mmap.mmap]]' = OrderedDict()
 CACHE_MAX_ITEMS = 10
 
+# The headers of the same epoch that check_pow_batch() sends to a worker at a time
+POW_BATCH_CHUNK_SIZE = 32
+
 
-def get_cache(block_number: int) -> bytes:
+def get_cache(block_number: int) -> Union[bytes, mmap.mmap]:
+    """
+    Return the ethash cache of the epoch of ``block_number``.
+
+    If the ``ETHASH_CACHE_DIR`` environment variable is set, the caches are stored in files
+    in that directory, and read through ``mmap``. Each cache is then only generated once,
+    by the first process which needs it, and its memory is shared by all the processes
+    using it, e.g. the workers of :func:`check_pow_batch`.
+    """
     epoch_index = block_number // EPOCH_LENGTH
 
     # doing explicit caching, because functools.lru_cache is 70% slower in the tests
@@ -52,8 +73,11 @@ def get_cache(block_number: int) -> bytes:
         return c
 
     # Generate the cache if it was not already in memory
-    # Simulate requesting mkcache by block number: multiply index by epoch length
-    c = mkcache_bytes(epoch_index * EPOCH_LENGTH)
+    cache_dir = os.environ.get('ETHASH_CACHE_DIR')
+    if cache_dir is None:
+        c = _make_cache(epoch_index)
+    else:
+        c = _map_cache_file(Path(cache_dir), epoch_index)
     cache_by_epoch[epoch_index] = c
 
     # Limit memory usage for cache
@@ -63,6 +87,28 @@ def get_cache(block_number: int) -> bytes:
     return c
 
 
+def _make_cache(epoch_index: int) -> bytes:
+    # Simulate requesting mkcache by block number: multiply index by epoch length
+    return mkcache_bytes(epoch_index * EPOCH_LENGTH)
+
+
+def _map_cache_file(cache_dir: Path, epoch_index: int) -> mmap.mmap:
+    cache_path = cache_dir / f'cache-{epoch_index}'
+    if not cache_path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Processes which need the same cache wait for the first one to generate it
+        with open(cache_dir / f'cache-{epoch_index}.lock', 'wb') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not cache_path.exists():
+                # the cache is renamed once complete, so a partial cache is never read
+                temp_path = cache_dir / f'cache-{epoch_index}.{os.getpid()}.tmp'
+                temp_path.write_bytes(_make_cache(epoch_index))
+                os.replace(temp_path, cache_path)
+
+    with open(cache_path, 'rb') as cache_file:
+        return mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def check_pow(block_number: int,
               mining_hash: Hash32,
               mix_hash: Hash32,
@@ -80,12 +126,51 @@ def check_pow(block_number: int,
             f"!= actual: {encode_hex(mix_hash)}. "
             f"Mix hash calculated from block #{block_number}, "
             f"mine hash {encode_hex(mining_hash)}, nonce {encode_hex(nonce)}"
-            f", difficulty {difficulty}, cache hash {encode_hex(keccak(cache))}"
+            f", difficulty {difficulty}, cache hash {encode_hex(keccak(bytes(cache)))}"
         )
     result = big_endian_to_int(mining_output[b'result'])
     validate_lte(result, 2**256 // difficulty, title="POW Difficulty")
 
 
+def check_pow_batch(headers: Sequence[BlockHeaderAPI], executor: Executor = None) -> None:
+    """
+    Check the proof of work of all the ``headers``, like :func:`check_pow`, in the workers of
+    ``executor`` if given. Raise the error of the first header whose proof of work is invalid.
+
+    The headers are sent to the workers in chunks of headers of the same epoch, so that a
+    worker only reads a few caches. With a ``ProcessPoolExecutor``, set ``ETHASH_CACHE_DIR``
+    (see :func:`get_cache`) so that the workers share the caches, instead of each of them
+    generating every cache.
+    """
+    chunks: List[List[BlockHeaderAPI]] = []
+    for header in headers:
+        epoch_index = header.block_number // EPOCH_LENGTH
+        if (not chunks
+                or chunks[-1][0].block_number // EPOCH_LENGTH != epoch_index
+                or len(chunks[-1]) == POW_BATCH_CHUNK_SIZE):
+            chunks.append([])
+        chunks[-1].append(header)
+
+    if executor is None:
+        for chunk in chunks:
+            _check_pow_chunk(chunk)
+    else:
+        # map() raises the error of the first invalid chunk
+        for _ in executor.map(_check_pow_chunk, chunks):
+            pass
+
+
+def _check_pow_chunk(headers: Sequence[BlockHeaderAPI]) -> None:
+    for header in headers:
+        check_pow(
+            header.block_number,
+            header.mining_hash,
+            header.mix_hash,
+            header.nonce,
+            header.difficulty,
+        )
+
+
 MAX_TEST_MINE_ATTEMPTS = 1000
 
 
@@ -1,6 +1,8 @@
 from contextlib import contextmanager
 import logging
 from typing import (
+    Dict,
+    Iterable,
     Iterator,
     FrozenSet,
     Set,
@@ -63,6 +65,9 @@ class KeyAccessLoggerDB(BaseDB):
             self._keys_read.add(key)
         return does_exist
 
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        return _get_many_logged(self.wrapped_db, keys, self._keys_read, self._log_missing_keys)
+
 
 class KeyAccessLoggerAtomicDB(BaseAtomicDB):
     """
@@ -107,7 +112,35 @@ class KeyAccessLoggerAtomicDB(BaseAtomicDB):
             self._keys_read.add(key)
         return does_exist
 
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        return _get_many_logged(self.wrapped_db, keys, self._keys_read, self._log_missing_keys)
+
+    def log_key_read(self, key: bytes) -> None:
+        """
+        Add ``key`` to :attr:`keys_read`, for a value that was served from a cache
+        instead of being read from the database.
+        """
+        self._keys_read.add(key)
+
     @contextmanager
     def atomic_batch(self) -> Iterator[AtomicWriteBatchAPI]:
         with self.wrapped_db.atomic_batch() as readable_batch:
             yield readable_batch
+
+    @contextmanager
+    def write_only_batch(self) -> Iterator[AtomicWriteBatchAPI]:
+        with self.wrapped_db.write_only_batch() as write_batch:
+            yield write_batch
+
+
+def _get_many_logged(db: DatabaseAPI,
+                     keys: Iterable[bytes],
+                     keys_read: Set[bytes],
+                     log_missing_keys: bool) -> Dict[bytes, bytes]:
+    keys = tuple(keys)
+    values = db.get_many(keys)
+    if log_missing_keys:
+        keys_read.update(keys)
+    else:
+        keys_read.update(values.keys())
+    return values
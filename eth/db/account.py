@@ -1,8 +1,12 @@
+from concurrent.futures import (
+    Executor,
+)
 from lru import LRU
 from typing import (
     cast,
     Dict,
     Iterable,
+    Sequence,
     Set,
     Tuple,
 )
@@ -34,6 +38,7 @@ from eth.abc import (
     AtomicDatabaseAPI,
     DatabaseAPI,
     MetaWitnessAPI,
+    StorageChanges,
 )
 from eth.constants import (
     BLANK_ROOT_HASH,
@@ -48,6 +53,8 @@ from eth.db.batch import (
 )
 from eth.db.cache import (
     CacheDB,
+    CodeCache,
+    StorageSlotCache,
 )
 from eth.db.diff import (
     DBDiff,
@@ -55,11 +62,19 @@ from eth.db.diff import (
 from eth.db.journal import (
     JournalDB,
 )
+from eth.db.read_only import (
+    ReadOnlyDB,
+)
+from eth.db.snapshot import (
+    AccountSnapshotLookup,
+    StateSnapshot,
+)
 from eth.db.backends.memory import (
     MemoryDB,
 )
 from eth.db.storage import (
     AccountStorageDB,
+    make_storage_roots,
 )
 from eth.db.witness import (
     AccountQueryTracker,
@@ -89,6 +104,32 @@ IS_PRESENT_VALUE = b''
 class AccountDB(AccountDatabaseAPI):
     logger = get_extended_debug_logger('eth.db.account.AccountDB')
 
+    # Set to a CodeCache to share bytecode that was read from the database between all
+    # AccountDB instances, e.g. ``AccountDB.code_cache = CodeCache()``. Bytecode served
+    # from the cache is not looked up in the database again, so it won't raise
+    # MissingBytecode if it is later removed from the database.
+    code_cache: CodeCache = None
+
+    # Set to a StorageSlotCache to share the storage slots that were read from the tries
+    # between all AccountDB instances, across blocks, e.g.
+    # ``AccountDB.storage_slot_cache = StorageSlotCache()``. Slots served from the cache
+    # won't raise MissingStorageTrieNode if the trie nodes are later removed from the
+    # database, and their trie nodes are not part of the witness returned by persist().
+    storage_slot_cache: StorageSlotCache = None
+
+    # Set to True to keep a flat snapshot of the state in the database, beside the tries
+    # (see :class:`~eth.db.snapshot.StateSnapshot`), and read accounts and storage from it
+    # instead of walking the tries. The trie nodes of the reads served by the snapshot are
+    # not part of the witness returned by persist().
+    use_snapshot: bool = False
+
+    # Set to an Executor, e.g. a ``ProcessPoolExecutor``, to compute the storage roots of the
+    # changed accounts in parallel in make_state_root(), when at least
+    # ``min_parallel_storage_roots`` storage tries changed. Otherwise, they are computed
+    # one after the other.
+    storage_root_executor: Executor = None
+    min_parallel_storage_roots: int = 16
+
     def __init__(self, db: AtomicDatabaseAPI, state_root: Hash32 = BLANK_ROOT_HASH) -> None:
         r"""
         Internal implementation details (subject to rapid change):
@@ -126,13 +167,26 @@ class AccountDB(AccountDatabaseAPI):
 
         AccountDB synchronizes the snapshot/revert/persist of both of the
         journals.
+
+        With ``use_snapshot``, _trie is read through the flat state snapshot whenever the
+        snapshot is at the root of the trie, and persist moves the snapshot along with the
+        state root.
         """
         self._raw_store_db = KeyAccessLoggerAtomicDB(db, log_missing_keys=False)
         self._batchdb = BatchDB(self._raw_store_db)
         self._batchtrie = BatchDB(self._raw_store_db, read_through_deletes=True)
         self._journaldb = JournalDB(self._batchdb)
         self._trie = HashTrie(HexaryTrie(self._batchtrie, state_root, prune=True))
-        self._trie_logger = KeyAccessLoggerDB(self._trie, log_missing_keys=False)
+        if self.use_snapshot:
+            # the snapshot is read from db, so that its keys are not logged as trie nodes
+            self._snapshot = StateSnapshot(db)
+            self._trie_logger = KeyAccessLoggerDB(
+                AccountSnapshotLookup(self._trie, self._snapshot),
+                log_missing_keys=False,
+            )
+        else:
+            self._snapshot = None
+            self._trie_logger = KeyAccessLoggerDB(self._trie, log_missing_keys=False)
         self._trie_cache = CacheDB(self._trie_logger)
         self._journaltrie = JournalDB(self._trie_cache)
         self._account_cache = LRU(2048)
@@ -141,6 +195,11 @@ class AccountDB(AccountDatabaseAPI):
         self._root_hash_at_last_persist = state_root
         self._accessed_accounts: Set[Address] = set()
         self._accessed_bytecodes: Set[Address] = set()
+        # Code written since the last persist is served by the journal, not the database
+        self._written_code_hashes: Set[Hash32] = set()
+        # Accounts written to the trie since the last persist, to update the snapshot
+        self._snapshot_base_root = state_root
+        self._snapshot_account_changes: Dict[Address, bytes] = {}
         # Track whether an account or slot have been accessed during a given transaction:
         self._reset_access_counters()
 
@@ -153,6 +212,8 @@ class AccountDB(AccountDatabaseAPI):
         if self._trie.root_hash != value:
             self._trie_cache.reset_cache()
             self._trie.root_hash = value
+            self._snapshot_base_root = value
+            self._snapshot_account_changes = {}
 
     def has_root(self, state_root: bytes) -> bool:
         return state_root in self._batchtrie
@@ -179,8 +240,10 @@ class AccountDB(AccountDatabaseAPI):
     def delete_storage(self, address: Address) -> None:
         validate_canonical_address(address, title="Storage Address")
 
-        self._set_storage_root(address, BLANK_ROOT_HASH)
+        # Wipe the storage first, so that it's loaded with the original storage root
+        # hash, like in delete_account()
         self._wipe_storage(address)
+        self._set_storage_root(address, BLANK_ROOT_HASH)
 
     def is_storage_warm(self, address: Address, slot: int) -> bool:
         key = self._get_storage_tracker_key(address, slot)
@@ -211,7 +274,14 @@ class AccountDB(AccountDatabaseAPI):
             store = self._account_stores[address]
         else:
             storage_root = self._get_storage_root(address)
-            store = AccountStorageDB(self._raw_store_db, storage_root, address)
+            store = AccountStorageDB(
+                self._raw_store_db,
+                storage_root,
+                address,
+                self._snapshot,
+                self._trie.root_hash,
+                slot_cache=self.storage_slot_cache,
+            )
             self._account_stores[address] = store
         return store
 
@@ -291,14 +361,30 @@ class AccountDB(AccountDatabaseAPI):
         code_hash = self.get_code_hash(address)
         if code_hash == EMPTY_SHA3:
             return b''
+
+        code_cache = self.code_cache
+        if code_cache is None or code_hash in self._written_code_hashes:
+            return self._get_code_from_db(address, code_hash)
+
+        code = code_cache.get(code_hash)
+        if code is None:
+            code = self._get_code_from_db(address, code_hash)
+            code_cache.add(code_hash, code)
         else:
-            try:
-                return self._journaldb[code_hash]
-            except KeyError:
-                raise MissingBytecode(code_hash) from KeyError
-            finally:
-                if code_hash in self._get_accessed_node_hashes():
-                    self._accessed_bytecodes.add(address)
+            # Without the cache, the code would have been read from the database, so
+            # it must still be part of the witness.
+            self._raw_store_db.log_key_read(code_hash)
+            self._accessed_bytecodes.add(address)
+        return code
+
+    def _get_code_from_db(self, address: Address, code_hash: Hash32) -> bytes:
+        try:
+            return self._journaldb[code_hash]
+        except KeyError:
+            raise MissingBytecode(code_hash) from KeyError
+        finally:
+            if code_hash in self._get_accessed_node_hashes():
+                self._accessed_bytecodes.add(address)
 
     def set_code(self, address: Address, code: bytes) -> None:
         validate_canonical_address(address, title="Storage Address")
@@ -306,8 +392,9 @@ class AccountDB(AccountDatabaseAPI):
 
         account = self._get_account(address)
 
-        code_hash = keccak(code)
+        code_hash = cast(Hash32, keccak(code))
         self._journaldb[code_hash] = code
+        self._written_code_hashes.add(code_hash)
         self._set_account(address, account.copy(code_hash=code_hash))
 
     def get_code_hash(self, address: Address) -> Hash32:
@@ -434,8 +521,13 @@ class AccountDB(AccountDatabaseAPI):
         self._reset_access_counters()
 
     def make_state_root(self) -> Hash32:
-        for _, store in self._dirty_account_stores():
-            store.make_storage_root()
+        stores = tuple(
+            cast(AccountStorageDB, store) for _, store in self._dirty_account_stores()
+        )
+        if len(stores) >= self.min_parallel_storage_roots:
+            make_storage_roots(stores, self.storage_root_executor)
+        else:
+            make_storage_roots(stores)
 
         for address, storage_root in self._get_changed_roots():
             self.logger.debug2(
@@ -450,6 +542,12 @@ class AccountDB(AccountDatabaseAPI):
 
         diff = self._journaltrie.diff()
         if diff.deleted_keys() or diff.pending_items():
+            if self._snapshot is not None:
+                for key, encoded_account in diff.pending_items():
+                    self._snapshot_account_changes[Address(key)] = encoded_account
+                for key in diff.deleted_keys():
+                    self._snapshot_account_changes[Address(key)] = b''
+
             # In addition to squashing (which is redundant here), this context manager causes
             # an atomic commit of the changes, so exceptions will revert the trie
             with self._trie.squash_changes() as memory_trie:
@@ -464,9 +562,12 @@ class AccountDB(AccountDatabaseAPI):
         self.make_state_root()
 
         # persist storage
-        with self._raw_store_db.atomic_batch() as write_batch:
+        storage_changes: Dict[Address, StorageChanges] = {}
+        with self._raw_store_db.write_only_batch() as write_batch:
             for address, store in self._dirty_account_stores():
                 self._validate_flushed_storage(address, store)
+                if self._snapshot is not None:
+                    storage_changes[address] = store.get_storage_changes()
                 store.persist(write_batch)
 
         for address, new_root in self._get_changed_roots():
@@ -499,13 +600,49 @@ class AccountDB(AccountDatabaseAPI):
         self._validate_generated_root()
         new_root_hash = self.state_root
         self.logger.debug2("Persisting new state root: 0x%s", new_root_hash.hex())
-        with self._raw_store_db.atomic_batch() as write_batch:
+        with self._raw_store_db.write_only_batch() as write_batch:
             self._batchtrie.commit_to(write_batch, apply_deletes=False)
             self._batchdb.commit_to(write_batch, apply_deletes=False)
+            self._update_snapshot(write_batch, new_root_hash, storage_changes)
         self._root_hash_at_last_persist = new_root_hash
+        if self._snapshot is not None:
+            # only once the batch is committed, so that a failed persist can be tried again
+            self._snapshot_base_root = new_root_hash
+            self._snapshot_account_changes = {}
+        self._written_code_hashes = set()
 
         return meta_witness
 
+    def prefetch(self, accounts: Iterable[Tuple[Address, Sequence[int]]]) -> None:
+        slots_by_address: Dict[Address, Set[int]] = {}
+        for address, slots in accounts:
+            slots_by_address.setdefault(address, set()).update(slots)
+
+        # Storage is only prefetched for the accounts which could be read, so that reading
+        # their storage roots can't run into a missing trie node
+        encoded_accounts = self._trie_cache.get_many(slots_by_address.keys())
+        for address, address_slots in slots_by_address.items():
+            if address in encoded_accounts and address_slots:
+                self._get_address_store(address).prefetch(address_slots)
+
+    def fork(self) -> 'ForkedAccountDB':
+        return ForkedAccountDB(self)
+
+    def _update_snapshot(self,
+                         write_batch: DatabaseAPI,
+                         new_root_hash: Hash32,
+                         storage_changes: Dict[Address, StorageChanges]) -> None:
+        if self._snapshot is not None:
+            # The snapshot only follows the state it was at: if another state was persisted
+            # from the same root first, reads from this one will go to the trie.
+            if self._snapshot.state_root == self._snapshot_base_root:
+                self._snapshot.update(
+                    write_batch,
+                    new_root_hash,
+                    self._snapshot_account_changes,
+                    storage_changes,
+                )
+
     def _get_accessed_node_hashes(self) -> Set[Hash32]:
         return cast(Set[Hash32], self._raw_store_db.keys_read)
 
@@ -626,3 +763,37 @@ class AccountDB(AccountDatabaseAPI):
                     self._root_hash_at_last_persist,
                     exc.requested_key,
                 ) from exc
+
+
+class ForkedAccountDB(AccountDB):
+    """
+    A copy-on-write fork of an :class:`AccountDB`, see :meth:`AccountDB.fork`.
+
+    Accounts, code and storage are read through the journals of the parent, so the fork
+    sees the parent's pending changes, and shares its caches. The fork's own changes are
+    journaled in the fork only, and are dropped with it.
+    """
+    def __init__(self, parent: AccountDB) -> None:
+        super().__init__(parent._raw_store_db.wrapped_db, parent.state_root)
+        self.code_cache = parent.code_cache
+        self.storage_slot_cache = parent.storage_slot_cache
+        self._parent = parent
+
+        # The parent's pending changes are the starting point of the fork, as if they had
+        # been locked: they are what from_journal=False reads return.
+        self._journaldb = JournalDB(ReadOnlyDB(parent._journaldb))
+        self._trie_cache = CacheDB(ReadOnlyDB(parent._journaltrie))
+        self._journaltrie = JournalDB(self._trie_cache)
+        self._written_code_hashes = set(parent._written_code_hashes)
+
+    def _get_address_store(self, address: Address) -> AccountStorageDatabaseAPI:
+        if address not in self._account_stores and address in self._parent._account_stores:
+            parent_store = self._parent._account_stores[address]
+            self._account_stores[address] = parent_store.fork()
+        return super()._get_address_store(address)
+
+    def make_state_root(self) -> Hash32:
+        raise ValidationError("Cannot make the state root of a forked AccountDB")
+
+    def persist(self) -> MetaWitnessAPI:
+        raise ValidationError("Cannot persist a forked AccountDB")
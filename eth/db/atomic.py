@@ -1,6 +1,8 @@
 from contextlib import contextmanager
 import logging
 from typing import (
+    Dict,
+    Iterable,
     Iterator,
 )
 
@@ -46,6 +48,9 @@ class AtomicDB(BaseAtomicDB):
     def _exists(self, key: bytes) -> bool:
         return key in self.wrapped_db
 
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        return self.wrapped_db.get_many(keys)
+
     @contextmanager
     def atomic_batch(self) -> Iterator[AtomicWriteBatchAPI]:
         with AtomicDBWriteBatch._commit_unless_raises(self) as readable_batch:
@@ -1,9 +1,13 @@
 from typing import (
+    ContextManager,
+    Dict,
+    Iterable,
     Iterator,
 )
 
 from eth.abc import (
     AtomicDatabaseAPI,
+    AtomicWriteBatchAPI,
     DatabaseAPI,
 )
 
@@ -42,6 +46,15 @@ class BaseDB(DatabaseAPI):
         except KeyError:
             pass
 
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        values = {}
+        for key in keys:
+            try:
+                values[key] = self[key]
+            except KeyError:
+                pass
+        return values
+
     def __iter__(self) -> Iterator[bytes]:
         raise NotImplementedError("By default, DB classes cannot be iterated.")
 
@@ -74,4 +87,5 @@ class BaseAtomicDB(BaseDB, AtomicDatabaseAPI):
             # when exiting the context, the values are saved either key and key2 will both be saved,
             # or neither will
     """
-    pass
+    def write_only_batch(self) -> ContextManager[AtomicWriteBatchAPI]:
+        return self.atomic_batch()
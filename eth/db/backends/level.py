@@ -34,7 +34,17 @@ class LevelDB(BaseAtomicDB):
     # Creates db as a class variable to avoid level db lock error
     def __init__(self,
                  db_path: Path = None,
-                 max_open_files: int = None) -> None:
+                 max_open_files: int = None,
+                 block_cache_size: int = None,
+                 bloom_filter_bits: int = 0,
+                 compression: str = 'snappy') -> None:
+        """
+        :param block_cache_size: size in bytes of the cache of uncompressed blocks, the
+            leveldb default (8MB) if None
+        :param bloom_filter_bits: bits per key of the bloom filters, which save most disk
+            reads for missing keys, e.g. 10; no bloom filters if 0
+        :param compression: ``'snappy'``, or None to store blocks uncompressed
+        """
         if not db_path:
             raise TypeError("Please specifiy a valid path for your database.")
         try:
@@ -49,7 +59,10 @@ class LevelDB(BaseAtomicDB):
             str(db_path),
             create_if_missing=True,
             error_if_exists=False,
-            max_open_files=max_open_files
+            max_open_files=max_open_files,
+            lru_cache_size=block_cache_size,
+            bloom_filter_bits=bloom_filter_bits,
+            compression=compression,
         )
 
     def __getitem__(self, key: bytes) -> bytes:
@@ -69,6 +82,10 @@ class LevelDB(BaseAtomicDB):
             raise KeyError(key)
         self.db.delete(key)
 
+    def delete(self, key: bytes) -> None:
+        # leveldb ignores deletes of missing keys, no need to look for the key first
+        self.db.delete(key)
+
     @contextmanager
     def atomic_batch(self) -> Iterator[AtomicWriteBatchAPI]:
         with self.db.write_batch(transaction=True) as atomic_batch:
@@ -78,6 +95,15 @@ class LevelDB(BaseAtomicDB):
             finally:
                 readable_batch.decommission()
 
+    @contextmanager
+    def write_only_batch(self) -> Iterator[AtomicWriteBatchAPI]:
+        with self.db.write_batch(transaction=True) as atomic_batch:
+            write_batch = LevelDBWriteOnlyBatch(atomic_batch)
+            try:
+                yield write_batch
+            finally:
+                write_batch.decommission()
+
 
 class LevelDBWriteBatch(BaseDB, AtomicWriteBatchAPI):
     """
@@ -140,3 +166,38 @@ class LevelDBWriteBatch(BaseDB, AtomicWriteBatchAPI):
         Prevent any further actions to be taken on this write batch, called after leaving context
         """
         self._track_diff = None
+
+
+class LevelDBWriteOnlyBatch(BaseDB, AtomicWriteBatchAPI):
+    """
+    A native leveldb write batch, without the diff tracking of :class:`LevelDBWriteBatch`:
+    it can't be read from, and deleting a missing key is not an error.
+    """
+    logger = logging.getLogger("eth.db.backends.LevelDBWriteOnlyBatch")
+
+    def __init__(self, write_batch: 'plyvel.WriteBatch') -> None:
+        self._write_batch = write_batch
+
+    def __getitem__(self, key: bytes) -> bytes:
+        raise ValidationError("Cannot get data from a write-only batch")
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        if self._write_batch is None:
+            raise ValidationError("Cannot set data from a write batch, out of context")
+
+        self._write_batch.put(key, value)
+
+    def _exists(self, key: bytes) -> bool:
+        raise ValidationError("Cannot test data existance from a write-only batch")
+
+    def __delitem__(self, key: bytes) -> None:
+        if self._write_batch is None:
+            raise ValidationError("Cannot delete data from a write batch, out of context")
+
+        self._write_batch.delete(key)
+
+    def decommission(self) -> None:
+        """
+        Prevent any further actions to be taken on this write batch, called after leaving context
+        """
+        self._write_batch = None
@@ -1,33 +1,308 @@
-from typing import Iterator
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 from contextlib import contextmanager
+import zlib
 import redis
+from eth_hash.auto import keccak
+from lru import LRU
 
-from eth.db.diff import DELETED
+from eth.db.diff import MissingReason
 from ..atomic import AtomicDB, AtomicDBWriteBatch
 
 
+# number of values kept in the local read cache of AtomicRedis
+DEFAULT_REDIS_CACHE_SIZE = 65536
+
+# number of keys written by each MSET of AtomicRedis.import_items()
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+
+# records how the values of a database are encoded, see AtomicRedis
+VALUE_ENCODING_KEY = b'atomic-redis:value-encoding'
+RAW_ENCODING = b'raw'
+TAGGED_ENCODING = b'tagged'
+
+# first byte of the values, with the tagged encoding
+UNCOMPRESSED_TAG = b'\x00'
+ZLIB_TAG = b'\x01'
+
+# number of keys SCAN looks at in each round trip, to find out if a key prefix is in use
+EMPTY_CHECK_SCAN_COUNT = 1000
+
+
+def is_content_addressed(key: bytes, value: bytes) -> bool:
+    """
+    True for trie nodes, code and the other values stored under their own hash, which
+    never change: they can be cached, even if other processes write to the same redis.
+    """
+    return len(key) == 32 and keccak(value) == key
+
+
+def _escape_glob(pattern: bytes) -> bytes:
+    for special in (b'\\', b'*', b'?', b'['):
+        pattern = pattern.replace(special, b'\\' + special)
+    return pattern
+
+
+def _atomic_redis_from_url(url: str,
+                           max_connections: int,
+                           options: Dict[str, Any]) -> 'AtomicRedis':
+    return AtomicRedis.from_url(url, max_connections, **options)
+
+
 class AtomicRedis(AtomicDB):
+    """
+    An atomic database stored in redis.
+
+    Values stored under their own hash (trie nodes, code...) are kept in a local LRU cache
+    of ``cache_size`` entries (0 disables it), so reading them again doesn't go to redis.
+    Other values, like the canonical head, may be changed by other processes and are always
+    read from redis.
+
+    All the keys are stored with ``key_prefix`` in front, so several chains can share one
+    redis database. With ``compress_min_size``, values of at least that many bytes (code,
+    receipts...) are compressed with zlib. Compressed or not, the values are then tagged
+    with their encoding, so the choice has to be made when the database is created: opening
+    it with and without ``compress_min_size`` raises a ``ValueError``. The encoding is recorded
+    when the first database is opened on empty keys; keys which already have values but no
+    recorded encoding were written before it was recorded, and are read raw. Each database
+    reads the encoding once, when it is opened.
+
+    ``cache_hits``, ``cache_misses`` and ``round_trips`` count the reads served by the
+    cache, the reads that went to redis, and the requests sent to redis.
+
+    Use :meth:`from_url` to connect through a connection pool. Such a database can be sent
+    to worker processes (e.g. with ``multiprocessing``), where it connects again with a
+    pool of its own.
+    """
 
-    def __init__(self, db: redis.StrictRedis) -> None:
+    def __init__(self,
+                 db: redis.StrictRedis,
+                 cache_size: int = DEFAULT_REDIS_CACHE_SIZE,
+                 key_prefix: bytes = b'',
+                 compress_min_size: int = None) -> None:
         if db is None:
             raise ValueError("db None")
         else:
             self.redis_inst = db
 
+        self.key_prefix = key_prefix
+        self.compress_min_size = compress_min_size
+        self._connection_args: Tuple[str, int, Dict[str, Any]] = None
+
+        self._cache: Optional['LRU[bytes, bytes]'] = LRU(cache_size) if cache_size else None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.round_trips = 0
+
+        self._check_value_encoding()
+
+    @classmethod
+    def from_url(cls,
+                 url: str = 'redis://localhost:6379/0',
+                 max_connections: int = None,
+                 **options: Any) -> 'AtomicRedis':
+        """
+        Connect to the redis at ``url`` with a pool of at most ``max_connections``
+        connections. The ``options`` are those of :class:`AtomicRedis`.
+        """
+        pool = redis.ConnectionPool.from_url(url, max_connections=max_connections)
+        atomic_redis = cls(redis.StrictRedis(connection_pool=pool), **options)
+        atomic_redis._connection_args = (url, max_connections, options)
+        return atomic_redis
+
+    def __reduce__(self) -> Any:
+        if self._connection_args is None:
+            raise TypeError("Only an AtomicRedis created with from_url() can be pickled")
+        return (_atomic_redis_from_url, self._connection_args)
+
+    def _check_value_encoding(self) -> None:
+        encoding = TAGGED_ENCODING if self.compress_min_size is not None else RAW_ENCODING
+
+        stored_encoding = self._get_value_encoding(encoding)
+        if stored_encoding != encoding:
+            raise ValueError(
+                f"The database values are {stored_encoding!r}, "
+                f"they can't be read as {encoding!r}: check compress_min_size"
+            )
+
+    def _get_value_encoding(self, new_encoding: bytes) -> bytes:
+        """
+        Return the encoding of the values, recording ``new_encoding`` if there is no value yet.
+        """
+        key = self._key(VALUE_ENCODING_KEY)
+        self.round_trips += 1
+        stored_encoding = self.redis_inst.get(key)
+        if stored_encoding is not None:
+            return stored_encoding
+        elif not self._is_empty():
+            # written before the encoding was recorded, when all values were raw
+            return RAW_ENCODING
+
+        self.round_trips += 1
+        if self.redis_inst.setnx(key, new_encoding):
+            return new_encoding
+        else:
+            # recorded by another process in the meantime
+            self.round_trips += 1
+            return self.redis_inst.get(key)
+
+    def _is_empty(self) -> bool:
+        """
+        True if there is no key with the prefix of this database.
+        """
+        if not self.key_prefix:
+            self.round_trips += 1
+            return self.redis_inst.dbsize() == 0
+
+        pattern = _escape_glob(self.key_prefix) + b'*'
+        cursor = 0
+        while True:
+            self.round_trips += 1
+            cursor, keys = self.redis_inst.scan(
+                cursor,
+                match=pattern,
+                count=EMPTY_CHECK_SCAN_COUNT,
+            )
+            if keys:
+                return False
+            elif cursor == 0:
+                return True
+
+    def _key(self, key: bytes) -> bytes:
+        return self.key_prefix + key
+
+    def _encode(self, value: bytes) -> bytes:
+        if self.compress_min_size is None:
+            return value
+        elif len(value) >= self.compress_min_size:
+            compressed = zlib.compress(value)
+            if len(compressed) < len(value):
+                return ZLIB_TAG + compressed
+        return UNCOMPRESSED_TAG + value
+
+    def _decode(self, stored_value: bytes) -> bytes:
+        if self.compress_min_size is None:
+            return stored_value
+        elif stored_value[:1] == ZLIB_TAG:
+            return zlib.decompress(stored_value[1:])
+        else:
+            return stored_value[1:]
+
     def __getitem__(self, key: bytes) -> bytes:
-        value = self.redis_inst.get(key)
-        if value is None:
+        if self._cache is not None:
+            try:
+                value = self._cache[key]
+            except KeyError:
+                pass
+            else:
+                self.cache_hits += 1
+                return value
+
+        self.cache_misses += 1
+        self.round_trips += 1
+        stored_value = self.redis_inst.get(self._key(key))
+        if stored_value is None:
             raise KeyError(key)
+
+        value = self._decode(stored_value)
+        self._cache_value(key, value)
         return value
 
     def __setitem__(self, key: bytes, value: bytes) -> None:
-        self.redis_inst.set(key, value)
+        self.round_trips += 1
+        self.redis_inst.set(self._key(key), self._encode(value))
+        self._cache_value(key, value)
 
     def __delitem__(self, key: bytes) -> None:
-        self.redis_inst.delete(key)
+        self.round_trips += 1
+        self.redis_inst.delete(self._key(key))
+        self._uncache(key)
 
     def _exists(self, key: bytes) -> bool:
-        return self.redis_inst.exists(key)
+        if self._cache is not None and key in self._cache:
+            self.cache_hits += 1
+            return True
+
+        self.cache_misses += 1
+        self.round_trips += 1
+        return self.redis_inst.exists(self._key(key))
+
+    def _cache_value(self, key: bytes, value: bytes) -> None:
+        if self._cache is not None and is_content_addressed(key, value):
+            self._cache[key] = value
+
+    def _uncache(self, key: bytes) -> None:
+        if self._cache is not None:
+            self._cache.pop(key, None)
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """
+        Return the values of ``keys`` which are in the database, reading all the ones which
+        are not cached with a single MGET.
+        """
+        values = {}
+        missing_keys = []
+        for key in keys:
+            if self._cache is not None and key in self._cache:
+                values[key] = self._cache[key]
+            else:
+                missing_keys.append(key)
+
+        self.cache_hits += len(values)
+        if missing_keys:
+            self.cache_misses += len(missing_keys)
+            self.round_trips += 1
+            stored_values = self.redis_inst.mget([self._key(key) for key in missing_keys])
+            for key, stored_value in zip(missing_keys, stored_values):
+                if stored_value is not None:
+                    value = self._decode(stored_value)
+                    values[key] = value
+                    self._cache_value(key, value)
+
+        return values
+
+    def prefetch(self, keys: Iterable[bytes]) -> None:
+        """
+        Load the values of ``keys`` into the cache with a single MGET, e.g. all the trie nodes
+        which are known to be needed by a block.
+        """
+        if self._cache is not None:
+            self.get_many(keys)
+
+    def import_items(self,
+                     items: Iterable[Tuple[bytes, bytes]],
+                     batch_size: int = DEFAULT_IMPORT_BATCH_SIZE) -> int:
+        """
+        Write the ``(key, value)`` pairs of ``items`` with one MSET every ``batch_size`` pairs,
+        and return the number of pairs written. ``items`` is consumed as it goes, so it can
+        stream a whole database, e.g. ``other_db._db.items()``.
+
+        Unlike :meth:`atomic_batch`, the import is not atomic: if it fails, the pairs of the
+        batches sent so far are in the database.
+        """
+        count = 0
+        batch: Dict[bytes, bytes] = {}
+        for key, value in items:
+            batch[self._key(key)] = self._encode(value)
+            if len(batch) >= batch_size:
+                count += self._mset(batch)
+                batch = {}
+
+        if batch:
+            count += self._mset(batch)
+        return count
+
+    def _mset(self, batch: Dict[bytes, bytes]) -> int:
+        self.round_trips += 1
+        self.redis_inst.mset(batch)
+        for prefixed_key in batch:
+            # the values written may replace cached ones
+            self._uncache(prefixed_key[len(self.key_prefix):])
+        return len(batch)
+
+    def reset_counters(self) -> None:
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.round_trips = 0
 
     @contextmanager
     def atomic_batch(self) -> Iterator[AtomicDBWriteBatch]:
@@ -37,7 +312,7 @@ class AtomicRedis(AtomicDB):
         Although this is technically an external API, it (and this whole class) is only intended
         to be used by AtomicDB.
         """
-        readable_write_batch: AtomicDBWriteBatch = AtomicRedisWriteBatch(self)
+        readable_write_batch = AtomicRedisWriteBatch(self)
         try:
             yield readable_write_batch
             readable_write_batch._commit()
@@ -46,33 +321,36 @@ class AtomicRedis(AtomicDB):
             readable_write_batch.batch_over()
 
 
-
 class AtomicRedisWriteBatch(AtomicDBWriteBatch):
 
     def __init__(self, atomic_redis: AtomicRedis) -> None:
         super().__init__(atomic_redis)
         self.atomic_redis = atomic_redis
 
-
     def _commit(self) -> None:
-        redis_inst: StrictRedis = self.atomic_redis.redis_inst
+        atomic_redis = self.atomic_redis
+        redis_inst: redis.StrictRedis = atomic_redis.redis_inst
 
         p = redis_inst.pipeline()
         p.multi()
 
-        for key, value in self._diff()._changes.items():
-            if value is DELETED:
-                try:
-                    p.delete(key)
-                except:
-                    raise
+        changes = self._diff()._changes
+        for key, value in changes.items():
+            if isinstance(value, MissingReason):
+                p.delete(atomic_redis._key(key))
             else:
-                p.set(key, value)
+                p.set(atomic_redis._key(key), atomic_redis._encode(value))
 
         p.execute()
+        atomic_redis.round_trips += 1
 
+        # only update the cache once the batch is in redis
+        for key, value in changes.items():
+            if isinstance(value, MissingReason):
+                atomic_redis._uncache(key)
+            else:
+                atomic_redis._cache_value(key, value)
 
-    def batch_over(self):
+    def batch_over(self) -> None:
         self._track_diff = None
         self._write_target_db = None
-
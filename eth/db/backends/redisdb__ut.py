@@ -1,8 +1,27 @@
+import os
+import pickle
+import threading
+import unittest
 import redis
+from eth_hash.auto import keccak
 
 from eth.test_util.ut import OmocTestCase
 
-from eth.db.backends.redisdb import AtomicRedis
+from eth.db.backends.redisdb import (
+    RAW_ENCODING,
+    TAGGED_ENCODING,
+    VALUE_ENCODING_KEY,
+    AtomicRedis,
+)
+
+try:
+    from fakeredis import TcpFakeServer
+except ImportError:
+    TcpFakeServer = None
+
+# set to run the tests against a live redis instead of fakeredis, e.g. to
+# redis://localhost:6379/15 -- that redis database is flushed before each test
+REDIS_URL_ENV_VAR = 'REDIS_TEST_URL'
 
 
 ##############################################################################################
@@ -20,21 +39,40 @@ from eth.db.backends.redisdb import AtomicRedis
 ##      then save configuration and run this test again, it will work!!
 ##############################################################################################
 class Test(OmocTestCase):
+    redis_url: str
+    fake_server = None
+    aredis: AtomicRedis
 
     @classmethod
     def setUpClass(cls) -> None:
-        redis_conn = redis.StrictRedis(host='localhost', port=6379, db=0)
-        cls.aredis = AtomicRedis(redis_conn)
+        if REDIS_URL_ENV_VAR in os.environ:
+            cls.redis_url = os.environ[REDIS_URL_ENV_VAR]
+        elif TcpFakeServer is not None:
+            # a fake redis server, served over TCP so from_url() can connect to it
+            cls.fake_server = TcpFakeServer(('127.0.0.1', 0))
+            threading.Thread(target=cls.fake_server.serve_forever, daemon=True).start()
+            cls.redis_url = 'redis://%s:%d/0' % cls.fake_server.server_address
+        else:
+            raise unittest.SkipTest(f"Install fakeredis, or set {REDIS_URL_ENV_VAR}")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        if cls.fake_server is not None:
+            cls.fake_server.shutdown()
+            cls.fake_server.server_close()
 
+    def setUp(self) -> None:
+        redis_conn = redis.StrictRedis.from_url(self.redis_url)
+        redis_conn.flushdb()
+        self.aredis = AtomicRedis(redis_conn)
 
-    def test_set_on_existing_value(self):
+    def test_set_on_existing_value(self) -> None:
         aredis = self.aredis
         aredis.set(b'1', b'2')
         aredis.set(b'1', b'3')
         self.assertEqual(aredis.get(b'1'), b'3')
 
-
-    def test_atomic(self):
+    def test_atomic(self) -> None:
         aredis = self.aredis
         aredis.set(b'1', b'2')
         self.assertEqual(aredis.get(b'1'), b'2')
@@ -68,9 +106,145 @@ class Test(OmocTestCase):
         except:
             pass
 
-
         self.assertEqual(aredis.get(b'1'), b'A')
         # key b'2' was delete before batch, should take effect.
         self.assertEqual(aredis.get(b'2'), None)
         self.assertEqual(aredis.get(b'3'), b'C')
 
+    def test_cache_content_addressed_values(self) -> None:
+        aredis = AtomicRedis(self.aredis.redis_inst)
+        node = b'trie node'
+        aredis.set(keccak(node), node)
+        aredis.set(b'head', b'1')
+
+        aredis.reset_counters()
+        self.assertEqual(aredis.get(keccak(node)), node)
+        self.assertEqual((aredis.cache_hits, aredis.round_trips), (1, 0))
+
+        ################################################################################
+        ##  values which are not stored under their hash may be changed by others
+        ################################################################################
+        self.aredis.set(b'head', b'2')
+        self.assertEqual(aredis.get(b'head'), b'2')
+        self.assertEqual((aredis.cache_misses, aredis.round_trips), (1, 1))
+
+        with aredis.atomic_batch() as batch:
+            batch.delete(keccak(node))
+        self.assertFalse(aredis.exists(keccak(node)))
+
+    def test_get_many(self) -> None:
+        aredis = AtomicRedis(self.aredis.redis_inst)
+        nodes = [b'node %d' % i for i in range(10)]
+        for node in nodes:
+            self.aredis.set(keccak(node), node)
+
+        aredis.reset_counters()
+        values = aredis.get_many([keccak(node) for node in nodes] + [keccak(b'missing')])
+        self.assertEqual(values, {keccak(node): node for node in nodes})
+        self.assertEqual(aredis.round_trips, 1)
+
+        aredis.prefetch([keccak(node) for node in nodes])
+        for node in nodes:
+            self.assertEqual(aredis.get(keccak(node)), node)
+        self.assertEqual(aredis.round_trips, 1)
+
+    def test_key_prefix(self) -> None:
+        chain_a = AtomicRedis(self.aredis.redis_inst, key_prefix=b'chain-a:')
+        chain_b = AtomicRedis(self.aredis.redis_inst, key_prefix=b'chain-b:')
+        chain_a.set(b'head', b'A')
+        chain_b.set(b'head', b'B')
+        with chain_b.atomic_batch() as batch:
+            batch.set(b'tail', b'B')
+
+        self.assertEqual(chain_a.get(b'head'), b'A')
+        self.assertEqual(chain_b.get(b'head'), b'B')
+        self.assertFalse(chain_a.exists(b'tail'))
+        self.assertEqual(self.aredis.redis_inst.get(b'chain-b:tail'), b'B')
+
+    def test_compression(self) -> None:
+        aredis = AtomicRedis(
+            self.aredis.redis_inst,
+            key_prefix=b'compressed:',
+            compress_min_size=64,
+        )
+        code = b'\x60\x00' * 1000
+        aredis.set(keccak(code), code)
+        aredis.set(b'small', b'\x60\x00')
+        with aredis.atomic_batch() as batch:
+            batch.set(b'code', code)
+
+        self.assertLess(len(self.aredis.redis_inst.get(b'compressed:code')), len(code))
+        fresh = AtomicRedis(self.aredis.redis_inst, key_prefix=b'compressed:', compress_min_size=64)
+        self.assertEqual(fresh.get(keccak(code)), code)
+        self.assertEqual(fresh.get(b'code'), code)
+        values = fresh.get_many([b'small', b'code'])
+        self.assertEqual(values, {b'small': b'\x60\x00', b'code': code})
+
+        ################################################################################
+        ##  the values can't be read without the encoding tag
+        ################################################################################
+        with self.assertRaises(ValueError):
+            AtomicRedis(self.aredis.redis_inst, key_prefix=b'compressed:')
+
+    def test_import_items(self) -> None:
+        aredis = AtomicRedis(self.aredis.redis_inst, key_prefix=b'import:', compress_min_size=64)
+        items = {keccak(b'%d' % i): b'%d' % i * 100 for i in range(25)}
+
+        aredis.reset_counters()
+        self.assertEqual(aredis.import_items(items.items(), batch_size=10), 25)
+        self.assertEqual(aredis.round_trips, 3)
+        self.assertEqual(aredis.get_many(items), items)
+
+    def test_pickle_from_url(self) -> None:
+        aredis = AtomicRedis.from_url(self.redis_url, key_prefix=b'pickled:', max_connections=4)
+        aredis.set(b'head', b'1')
+
+        # e.g. sent to a worker process
+        worker_aredis = pickle.loads(pickle.dumps(aredis))
+        self.assertEqual(worker_aredis.key_prefix, b'pickled:')
+        self.assertEqual(worker_aredis.get(b'head'), b'1')
+
+        with self.assertRaises(TypeError):
+            pickle.dumps(self.aredis)
+
+    def test_value_encoding_is_recorded_once(self) -> None:
+        redis_inst = self.aredis.redis_inst
+        # a prefix which needs escaping, in the SCAN looking for its keys
+        redis_inst.set(b'new-db', b'1')
+
+        aredis = AtomicRedis(redis_inst, key_prefix=b'new*', compress_min_size=64)
+        self.assertEqual(redis_inst.get(b'new*' + VALUE_ENCODING_KEY), TAGGED_ENCODING)
+        # get the encoding, look for keys and record it
+        self.assertEqual(aredis.round_trips, 3)
+
+        ################################################################################
+        ##  later databases on the same keys only read the recorded encoding
+        ################################################################################
+        again = AtomicRedis(redis_inst, key_prefix=b'new*', compress_min_size=64)
+        self.assertEqual(again.round_trips, 1)
+        from_url = AtomicRedis.from_url(self.redis_url, key_prefix=b'new*', compress_min_size=64)
+        self.assertEqual(from_url.round_trips, 1)
+        with self.assertRaises(ValueError):
+            AtomicRedis(redis_inst, key_prefix=b'new*')
+
+        ################################################################################
+        ##  once the keys are flushed, a database with another encoding can be opened
+        ################################################################################
+        redis_inst.flushdb()
+        raw = AtomicRedis(redis_inst, key_prefix=b'new*')
+        self.assertEqual(redis_inst.get(b'new*' + VALUE_ENCODING_KEY), RAW_ENCODING)
+        raw[b'head'] = b'1'
+        self.assertEqual(redis_inst.get(b'new*head'), b'1')
+
+    def test_value_encoding_of_existing_values(self) -> None:
+        redis_inst = self.aredis.redis_inst
+        # written before the encoding was recorded
+        redis_inst.set(b'legacy:head', b'1')
+
+        legacy = AtomicRedis(redis_inst, key_prefix=b'legacy:')
+        self.assertEqual(legacy.get(b'head'), b'1')
+        self.assertIsNone(redis_inst.get(b'legacy:' + VALUE_ENCODING_KEY))
+
+        with self.assertRaises(ValueError):
+            AtomicRedis(redis_inst, key_prefix=b'legacy:', compress_min_size=64)
+        self.assertIsNone(redis_inst.get(b'legacy:' + VALUE_ENCODING_KEY))
@@ -1,4 +1,8 @@
 import logging
+from typing import (
+    Dict,
+    Iterable,
+)
 
 from eth_utils import (
     ValidationError,
@@ -75,6 +79,20 @@ class BatchDB(BaseDB):
         else:
             return value
 
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        values = {}
+        wrapped_keys = []
+        for key in keys:
+            try:
+                values[key] = self._track_diff[key]
+            except DiffMissingError as missing:
+                if not missing.is_deleted or self._read_through_deletes:
+                    wrapped_keys.append(key)
+
+        if wrapped_keys:
+            values.update(self.wrapped_db.get_many(wrapped_keys))
+        return values
+
     def __setitem__(self, key: bytes, value: bytes) -> None:
         self._track_diff[key] = value
 
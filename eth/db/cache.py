@@ -1,9 +1,33 @@
+from collections import OrderedDict
+import threading
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+from eth_typing import (
+    Address,
+    Hash32,
+)
 from lru import LRU
 
 from eth.abc import DatabaseAPI
 from eth.db.backends.base import BaseDB
 
 
+# 64MB of bytecode is a few thousand full-size contracts
+DEFAULT_CODE_CACHE_BYTES = 64 * 1024 * 1024
+
+# 256MB of storage is about two million cached slots
+DEFAULT_STORAGE_SLOT_CACHE_BYTES = 256 * 1024 * 1024
+
+# An estimate of the memory used by each cached slot, on top of its value: the slot hash
+# and its entry in the dict of the storage
+SLOT_ENTRY_OVERHEAD_BYTES = 120
+
+
 class CacheDB(BaseDB):
     """
     Set and get decoded RLP objects, where the underlying db stores
@@ -30,3 +54,192 @@ class CacheDB(BaseDB):
         if key in self._cached_values:
             del self._cached_values[key]
         del self._db[key]
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """
+        Return the values of ``keys``, reading the ones which are not cached with a single
+        :meth:`~eth.abc.DatabaseAPI.get_many` on the underlying db, and caching them.
+        """
+        values = {}
+        uncached_keys = []
+        for key in keys:
+            if key in self._cached_values:
+                values[key] = self._cached_values[key]
+            else:
+                uncached_keys.append(key)
+
+        if uncached_keys:
+            read_values = self._db.get_many(uncached_keys)
+            for key, value in read_values.items():
+                self._cached_values[key] = value
+            values.update(read_values)
+        return values
+
+
+class CodeCache:
+    """
+    A least-recently-used cache of contract bytecode, keyed by code hash and bounded by the
+    total size of the bytecode it holds.
+
+    Bytecode is immutable per code hash, so a single instance can be shared by every
+    :class:`~eth.db.account.AccountDB` of the process, across blocks. It is safe to use from
+    several threads.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_CODE_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._codes: 'OrderedDict[Hash32, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, code_hash: Hash32) -> bool:
+        return code_hash in self._codes
+
+    def get(self, code_hash: Hash32) -> Optional[bytes]:
+        with self._lock:
+            try:
+                code = self._codes[code_hash]
+            except KeyError:
+                self.misses += 1
+                return None
+            else:
+                self._codes.move_to_end(code_hash)
+                self.hits += 1
+                return code
+
+    def add(self, code_hash: Hash32, code: bytes) -> None:
+        code_size = len(code)
+        if code_size > self.max_bytes:
+            return
+
+        with self._lock:
+            if code_hash in self._codes:
+                self._codes.move_to_end(code_hash)
+                return
+
+            self._codes[code_hash] = code
+            self.size_bytes += code_size
+
+            while self.size_bytes > self.max_bytes:
+                _, evicted_code = self._codes.popitem(last=False)
+                self.size_bytes -= len(evicted_code)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._codes.clear()
+            self.size_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+class StorageSlotCache:
+    """
+    A least-recently-used cache of storage slot values, keyed by ``(address, storage_root,
+    slot_hash)``, and bounded by an estimate of the memory it uses.
+
+    The values of a storage trie never change for a given root, so a single instance can be
+    shared by every :class:`~eth.db.account.AccountDB` of the process, across blocks. When a
+    storage trie is committed with a new root, the cached slots of the old root are moved to
+    the new root, with the values written in between, so the slots that didn't change stay
+    cached. The slots of an account at a storage root are evicted together. It is safe to
+    use from several threads.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_STORAGE_SLOT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._storages: 'OrderedDict[Tuple[Address, Hash32], Dict[Hash32, bytes]]' = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(slots) for slots in self._storages.values())
+
+    def __contains__(self, key: Tuple[Address, Hash32, Hash32]) -> bool:
+        address, storage_root, slot_hash = key
+        return slot_hash in self._storages.get((address, storage_root), ())
+
+    def get(self, address: Address, storage_root: Hash32, slot_hash: Hash32) -> Optional[bytes]:
+        """
+        Return the value of the slot (b'' if it's empty), or None if it's not cached.
+        """
+        with self._lock:
+            storage_key = (address, storage_root)
+            try:
+                value = self._storages[storage_key][slot_hash]
+            except KeyError:
+                self.misses += 1
+                return None
+            else:
+                self._storages.move_to_end(storage_key)
+                self.hits += 1
+                return value
+
+    def add(self, address: Address, storage_root: Hash32, slot_values: Dict[Hash32, bytes]) -> None:
+        """
+        Cache the values of ``slot_values``, by slot hash, in the storage of ``address`` at
+        ``storage_root``.
+        """
+        with self._lock:
+            storage_key = (address, storage_root)
+            slots = self._storages.setdefault(storage_key, {})
+            self._storages.move_to_end(storage_key)
+            self._update_slots(slots, slot_values)
+            self._evict()
+
+    def move(self,
+             address: Address,
+             old_storage_root: Hash32,
+             new_storage_root: Hash32,
+             written_slots: Dict[Hash32, bytes]) -> None:
+        """
+        Move the cached slots of ``address`` from ``old_storage_root`` to
+        ``new_storage_root``, the root of the trie at ``old_storage_root`` with
+        ``written_slots`` written to it, by slot hash. The written values are cached too.
+        """
+        with self._lock:
+            slots = self._storages.pop((address, old_storage_root), {})
+            storage_key = (address, new_storage_root)
+            if storage_key in self._storages:
+                # the new root was already cached, e.g. after a reorg
+                self.size_bytes -= _get_slots_size(slots)
+                slots = self._storages[storage_key]
+            else:
+                self._storages[storage_key] = slots
+            self._storages.move_to_end(storage_key)
+            self._update_slots(slots, written_slots)
+            self._evict()
+
+    def _update_slots(self, slots: Dict[Hash32, bytes], slot_values: Dict[Hash32, bytes]) -> None:
+        for slot_hash, value in slot_values.items():
+            if slot_hash in slots:
+                self.size_bytes -= len(slots[slot_hash])
+            else:
+                self.size_bytes += SLOT_ENTRY_OVERHEAD_BYTES
+            slots[slot_hash] = value
+            self.size_bytes += len(value)
+
+    def _evict(self) -> None:
+        while self.size_bytes > self.max_bytes and self._storages:
+            _, evicted_slots = self._storages.popitem(last=False)
+            self.size_bytes -= _get_slots_size(evicted_slots)
+            self.evictions += len(evicted_slots)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._storages.clear()
+            self.size_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def _get_slots_size(slots: Dict[Hash32, bytes]) -> int:
+    return sum(SLOT_ENTRY_OVERHEAD_BYTES + len(value) for value in slots.values())
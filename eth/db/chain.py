@@ -1,9 +1,15 @@
+from concurrent.futures import (
+    Executor,
+    Future,
+)
 import functools
 import itertools
+import threading
 
 from typing import (
     Dict,
     Iterable,
+    Optional,
     Sequence,
     Tuple,
     Type,
@@ -46,6 +52,12 @@ from eth.db.chain_gaps import (
     is_block_number_in_gap,
     reopen_gap,
 )
+from eth.db.freezer import (
+    ANCIENT_BLOCK_DISTANCE,
+    FREEZE_BATCH_SIZE,
+    BlockFreezer,
+    FrozenBlock,
+)
 from eth.db.trie import make_trie_root_and_nodes
 from eth.exceptions import (
     HeaderNotFound,
@@ -57,6 +69,7 @@ from eth.db.schema import SchemaV1
 from eth.rlp.sedes import chain_gaps
 from eth.typing import ChainGaps
 from eth.validation import (
+    validate_block_number,
     validate_word,
 )
 from eth.vm.header import HeaderSedes
@@ -80,8 +93,28 @@ class TransactionKey(rlp.Serializable):
 
 
 class ChainDB(HeaderDB, ChainDatabaseAPI):
-    def __init__(self, db: AtomicDatabaseAPI) -> None:
+    def __init__(self,
+                 db: AtomicDatabaseAPI,
+                 freezer: BlockFreezer = None,
+                 ancient_block_distance: int = ANCIENT_BLOCK_DISTANCE,
+                 freeze_batch_size: int = FREEZE_BATCH_SIZE,
+                 freeze_executor: Executor = None) -> None:
+        """
+        :param freezer: where to move the canonical blocks which are at least
+            ``ancient_block_distance`` blocks behind the head, ``freeze_batch_size`` blocks at
+            a time (see :meth:`freeze_ancient_blocks`). The frozen blocks are read from the
+            freezer.
+        :param freeze_executor: if given (e.g. a ``ThreadPoolExecutor``), a persisted block
+            which makes a batch of blocks ancient starts freezing them in this executor,
+            instead of blocking the import.
+        """
         self.db = db
+        self.freezer = freezer
+        self.ancient_block_distance = ancient_block_distance
+        self.freeze_batch_size = freeze_batch_size
+        self.freeze_executor = freeze_executor
+        self._freeze_lock = threading.Lock()
+        self._pending_freeze: Future[int] = None
 
     def get_chain_gaps(self) -> ChainGaps:
         return self._get_chain_gaps(self.db)
@@ -166,6 +199,14 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
         else:
             return tuple(rlp.decode(encoded_uncles, sedes=rlp.sedes.CountableList(HeaderSedes)))
 
+    def get_canonical_block_header_by_number(self, block_number: BlockNumber) -> BlockHeaderAPI:
+        validate_block_number(block_number)
+        if self.freezer is not None and block_number < self.freezer.frozen_count:
+            encoded_header = self.freezer.get_block(block_number).header
+            return rlp.decode(bytes(encoded_header), sedes=HeaderSedes)
+        else:
+            return super().get_canonical_block_header_by_number(block_number)
+
     @classmethod
     def _decanonicalize_old_headers(
         cls,
@@ -204,7 +245,10 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
                       genesis_parent_hash: Hash32 = GENESIS_PARENT_HASH
                       ) -> Tuple[Tuple[Hash32, ...], Tuple[Hash32, ...]]:
         with self.db.atomic_batch() as db:
-            return self._persist_block(db, block, genesis_parent_hash)
+            result = self._persist_block(db, block, genesis_parent_hash)
+
+        self._schedule_freeze()
+        return result
 
     def persist_unexecuted_block(self,
                                  block: BlockAPI,
@@ -232,7 +276,10 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
             self._persist_trie_data_dict(db, receipt_kv_nodes)
             self._persist_trie_data_dict(db, tx_kv_nodes)
 
-            return self._persist_block(db, block, genesis_parent_hash)
+            result = self._persist_block(db, block, genesis_parent_hash)
+
+        self._schedule_freeze()
+        return result
 
     @classmethod
     def _persist_block(
@@ -312,14 +359,28 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
             self,
             header: BlockHeaderAPI,
             transaction_decoder: Type[TransactionDecoderAPI]) -> Tuple[SignedTransactionAPI, ...]:
-        return self._get_block_transactions(header.transaction_root, transaction_decoder)
+        frozen_transactions = self._get_frozen_transaction_data(header)
+        if frozen_transactions is None:
+            return self._get_block_transactions(header.transaction_root, transaction_decoder)
+        else:
+            return tuple(
+                transaction_decoder.decode(encoded_transaction)
+                for encoded_transaction in frozen_transactions
+            )
 
     def get_block_transaction_hashes(self, block_header: BlockHeaderAPI) -> Tuple[Hash32, ...]:
         """
         Returns an iterable of the transaction hashes from the block specified
         by the given block header.
         """
-        return self._get_block_transaction_hashes(self.db, block_header)
+        frozen_transactions = self._get_frozen_transaction_data(block_header)
+        if frozen_transactions is None:
+            return self._get_block_transaction_hashes(self.db, block_header)
+        else:
+            return tuple(
+                cast(Hash32, keccak(encoded_transaction))
+                for encoded_transaction in frozen_transactions
+            )
 
     @classmethod
     @to_tuple
@@ -338,14 +399,14 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
     def get_receipts(self,
                      header: BlockHeaderAPI,
                      receipt_decoder: Type[ReceiptDecoderAPI]) -> Iterable[ReceiptAPI]:
-        receipt_db = HexaryTrie(db=self.db, root_hash=header.receipt_root)
-        for receipt_idx in itertools.count():
-            receipt_key = rlp.encode(receipt_idx)
-            receipt_data = receipt_db[receipt_key]
-            if receipt_data != b'':
-                yield receipt_decoder.decode(receipt_data)
-            else:
-                break
+        frozen_receipts = self._get_frozen_receipt_data(header)
+        if frozen_receipts is None:
+            all_receipt_data = self._get_receipt_data(self.db, header.receipt_root)
+        else:
+            all_receipt_data = frozen_receipts
+
+        for receipt_data in all_receipt_data:
+            yield receipt_decoder.decode(receipt_data)
 
     def get_transaction_by_index(
             self,
@@ -356,9 +417,17 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
             block_header = self.get_canonical_block_header_by_number(block_number)
         except HeaderNotFound:
             raise TransactionNotFound(f"Block {block_number} is not in the canonical chain")
-        transaction_db = HexaryTrie(self.db, root_hash=block_header.transaction_root)
-        encoded_index = rlp.encode(transaction_index)
-        encoded_transaction = transaction_db[encoded_index]
+
+        frozen_transactions = self._get_frozen_transaction_data(block_header)
+        if frozen_transactions is None:
+            transaction_db = HexaryTrie(self.db, root_hash=block_header.transaction_root)
+            encoded_index = rlp.encode(transaction_index)
+            encoded_transaction = transaction_db[encoded_index]
+        elif transaction_index < len(frozen_transactions):
+            encoded_transaction = frozen_transactions[transaction_index]
+        else:
+            encoded_transaction = b''
+
         if encoded_transaction != b'':
             return transaction_decoder.decode(encoded_transaction)
         else:
@@ -388,9 +457,16 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
         except HeaderNotFound:
             raise ReceiptNotFound(f"Block {block_number} is not in the canonical chain")
 
-        receipt_db = HexaryTrie(db=self.db, root_hash=block_header.receipt_root)
-        receipt_key = rlp.encode(receipt_index)
-        receipt_data = receipt_db[receipt_key]
+        frozen_receipts = self._get_frozen_receipt_data(block_header)
+        if frozen_receipts is None:
+            receipt_db = HexaryTrie(db=self.db, root_hash=block_header.receipt_root)
+            receipt_key = rlp.encode(receipt_index)
+            receipt_data = receipt_db[receipt_key]
+        elif receipt_index < len(frozen_receipts):
+            receipt_data = frozen_receipts[receipt_index]
+        else:
+            receipt_data = b''
+
         if receipt_data != b'':
             return receipt_decoder.decode(receipt_data)
         else:
@@ -412,6 +488,20 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
             else:
                 break
 
+    @staticmethod
+    def _get_receipt_data(db: DatabaseAPI, receipt_root: Hash32) -> Iterable[bytes]:
+        """
+        Returns iterable of the encoded receipts for the given receipt root
+        """
+        receipt_db = HexaryTrie(db, root_hash=receipt_root)
+        for receipt_idx in itertools.count():
+            receipt_key = rlp.encode(receipt_idx)
+            receipt_data = receipt_db[receipt_key]
+            if receipt_data != b'':
+                yield receipt_data
+            else:
+                break
+
     @functools.lru_cache(maxsize=32)
     @to_tuple
     def _get_block_transactions(
@@ -460,10 +550,105 @@ class ChainDB(HeaderDB, ChainDatabaseAPI):
         return self.db[key]
 
     def persist_trie_data_dict(self, trie_data_dict: Dict[Hash32, bytes]) -> None:
-        with self.db.atomic_batch() as db:
+        with self.db.write_only_batch() as db:
             self._persist_trie_data_dict(db, trie_data_dict)
 
     @classmethod
     def _persist_trie_data_dict(cls, db: DatabaseAPI, trie_data_dict: Dict[Hash32, bytes]) -> None:
         for key, value in trie_data_dict.items():
             db[key] = value
+
+    #
+    # Freezer API
+    #
+    def freeze_ancient_blocks(self) -> int:
+        """
+        Move the canonical blocks which are at least ``ancient_block_distance`` blocks behind
+        the head to the freezer, if there is one, in batches of ``freeze_batch_size`` blocks
+        which are each written to disk at once. Blocks short of a full batch wait for a later
+        call. Return the number of blocks frozen.
+
+        The frozen blocks stay in the database: their trie nodes, receipts and uncles are
+        stored by hash, and may be shared with blocks which are not frozen.
+
+        Freezing stops at the first block whose body is missing, e.g. in a gap of the chain.
+        Blocks may be imported and read meanwhile, so this can run in a background thread.
+        """
+        if self.freezer is None:
+            return 0
+
+        frozen_count = 0
+        with self._freeze_lock:
+            while self._count_blocks_to_freeze() >= self.freeze_batch_size:
+                next_block_number = self.freezer.frozen_count
+                for block_number in range(
+                        next_block_number,
+                        next_block_number + self.freeze_batch_size):
+                    if not self._freeze_block(BlockNumber(block_number)):
+                        self.freezer.flush()
+                        return frozen_count
+                    frozen_count += 1
+                self.freezer.flush()
+
+        return frozen_count
+
+    def _count_blocks_to_freeze(self) -> int:
+        head = self.get_canonical_head()
+        last_ancient_block_number = head.block_number - self.ancient_block_distance
+        return last_ancient_block_number + 1 - self.freezer.frozen_count
+
+    def _freeze_block(self, block_number: BlockNumber) -> bool:
+        try:
+            header = self.get_canonical_block_header_by_number(block_number)
+            transactions = tuple(self._get_block_transaction_data(self.db, header.transaction_root))
+            receipts = tuple(self._get_receipt_data(self.db, header.receipt_root))
+            if header.uncles_hash == EMPTY_UNCLE_HASH:
+                encoded_uncles = rlp.encode([])
+            else:
+                encoded_uncles = self.db[header.uncles_hash]
+        except (HeaderNotFound, MissingTrieNode, KeyError):
+            return False
+
+        self.freezer.append_block(
+            header.block_number,
+            header.hash,
+            rlp.encode(header),
+            transactions,
+            encoded_uncles,
+            receipts,
+        )
+        return True
+
+    def _schedule_freeze(self) -> None:
+        if self.freezer is None or self.freeze_executor is None:
+            return
+
+        if self._pending_freeze is not None:
+            if not self._pending_freeze.done():
+                return
+            # raise the error of the last freeze, if any
+            self._pending_freeze.result()
+            self._pending_freeze = None
+
+        if self._count_blocks_to_freeze() >= self.freeze_batch_size:
+            self._pending_freeze = self.freeze_executor.submit(self.freeze_ancient_blocks)
+
+    def _get_frozen_block(self, header: BlockHeaderAPI) -> Optional[FrozenBlock]:
+        if self.freezer is not None and self.freezer.is_frozen(header.block_number, header.hash):
+            return self.freezer.get_block(header.block_number)
+        else:
+            return None
+
+    def _get_frozen_transaction_data(self, header: BlockHeaderAPI) -> Optional[Sequence[bytes]]:
+        frozen_block = self._get_frozen_block(header)
+        if frozen_block is None:
+            return None
+        else:
+            return rlp.decode(bytes(frozen_block.transactions))
+
+    def _get_frozen_receipt_data(self, header: BlockHeaderAPI) -> Optional[Sequence[bytes]]:
+        frozen_block = self._get_frozen_block(header)
+        if frozen_block is None:
+            return None
+        else:
+            return rlp.decode(bytes(frozen_block.receipts))
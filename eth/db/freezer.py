@@ -0,0 +1,309 @@
+"""
+An append-only archive of old canonical blocks, stored in flat files beside the database
+instead of as individual database entries, and read through ``mmap``.
+"""
+import mmap
+import os
+from pathlib import Path
+import threading
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Tuple,
+)
+
+from eth_typing import (
+    BlockNumber,
+    Hash32,
+)
+from eth_utils import (
+    ValidationError,
+)
+import rlp
+
+
+# Canonical blocks this far behind the head are moved to the freezer by ChainDB, as in geth
+ANCIENT_BLOCK_DISTANCE = 90000
+
+# Blocks frozen at a time by ChainDB, and written to disk together
+FREEZE_BATCH_SIZE = 2048
+
+# Blocks in each segment file of a table
+DEFAULT_BLOCKS_PER_SEGMENT = 8192
+
+# Byte length of each entry in the index files: the end offset of an item in its data file
+INDEX_ENTRY_SIZE = 8
+
+# The hashes are appended last, so that a block is only counted once it's in every table
+FREEZER_TABLES = ('headers', 'transactions', 'uncles', 'receipts', 'hashes')
+
+
+class FreezerTable:
+    """
+    A list of byte strings, appended one at a time and never modified.
+
+    The items are stored in segments of ``items_per_segment`` items. Each segment has a data
+    file with the items one after the other, and an index file with the end offset of each
+    item, so that any item is found with a fixed-width read of the index. The files are read
+    through ``mmap``, so reading an item doesn't copy it. The items appended are readable at
+    once, and on disk after :meth:`flush`.
+    """
+    def __init__(self, path: Path, name: str, items_per_segment: int) -> None:
+        self._path = path
+        self._name = name
+        self._items_per_segment = items_per_segment
+        self._maps: Dict[int, Tuple[mmap.mmap, mmap.mmap]] = {}
+
+        self._length = 0
+        segment = 0
+        while self._get_file_path(segment, 'idx').exists():
+            self._length += self._get_file_path(segment, 'idx').stat().st_size // INDEX_ENTRY_SIZE
+            segment += 1
+
+        self._data_file: BinaryIO = None
+        self._index_file: BinaryIO = None
+        self._data_size = 0
+        self._is_flushed = True
+        self._is_synced = True
+        self._is_new_segment = False
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _get_file_path(self, segment: int, extension: str) -> Path:
+        return self._path / f'{self._name}.{segment:06d}.{extension}'
+
+    def _get_maps(self, segment: int, index_end: int) -> Tuple[mmap.mmap, mmap.mmap]:
+        maps = self._maps.get(segment)
+        if maps is None or len(maps[0]) < index_end:
+            # The segment grew since it was mapped. The old maps are released when the
+            # views returned from them are.
+            maps = (
+                _map_file(self._get_file_path(segment, 'idx')),
+                _map_file(self._get_file_path(segment, 'dat')),
+            )
+            self._maps[segment] = maps
+        return maps
+
+    def __getitem__(self, index: int) -> memoryview:
+        if not 0 <= index < self._length:
+            raise IndexError(f"No item {index} in the {self._name} table of {self._length} items")
+
+        if not self._is_flushed:
+            self._flush_buffers()
+
+        segment, position = divmod(index, self._items_per_segment)
+        index_end = (position + 1) * INDEX_ENTRY_SIZE
+        index_map, data_map = self._get_maps(segment, index_end)
+
+        if position == 0:
+            start = 0
+        else:
+            start_entry = index_end - INDEX_ENTRY_SIZE
+            start = int.from_bytes(index_map[start_entry - INDEX_ENTRY_SIZE:start_entry], 'big')
+        end = int.from_bytes(index_map[index_end - INDEX_ENTRY_SIZE:index_end], 'big')
+        return memoryview(data_map)[start:end]
+
+    def append(self, item: bytes) -> None:
+        segment, position = divmod(self._length, self._items_per_segment)
+        if position == 0 or self._data_file is None:
+            self._open_segment(segment)
+
+        self._data_file.write(item)
+        self._data_size += len(item)
+        self._index_file.write(self._data_size.to_bytes(INDEX_ENTRY_SIZE, 'big'))
+        self._length += 1
+        self._is_flushed = False
+        self._is_synced = False
+
+    def flush(self) -> None:
+        """
+        Write the items appended so far to disk, with ``fsync``.
+        """
+        if self._is_synced:
+            return
+
+        self._flush_buffers()
+        if self._data_file is not None:
+            # the data first, so that the index never refers to missing data
+            os.fsync(self._data_file.fileno())
+            os.fsync(self._index_file.fileno())
+        if self._is_new_segment:
+            _fsync_directory(self._path)
+            self._is_new_segment = False
+        self._is_synced = True
+
+    def _flush_buffers(self) -> None:
+        if self._data_file is not None:
+            self._data_file.flush()
+            self._index_file.flush()
+        self._is_flushed = True
+
+    def _open_segment(self, segment: int) -> None:
+        # the previous segment is closed, its items must be on disk first
+        self.flush()
+        self.close()
+        if not self._get_file_path(segment, 'idx').exists():
+            self._is_new_segment = True
+        self._data_file = open(self._get_file_path(segment, 'dat'), 'ab')
+        self._index_file = open(self._get_file_path(segment, 'idx'), 'ab')
+        self._data_size = self._data_file.tell()
+
+    def truncate(self, length: int) -> None:
+        """
+        Drop the items after the first ``length`` ones, and any partly written item, e.g.
+        those written by an append that was interrupted before it reached every table.
+        """
+        if length > self._length:
+            raise ValidationError(
+                f"Cannot truncate the {self._name} table of {self._length} items to {length}"
+            )
+
+        self.close()
+        self._maps = {}
+        last_segment = (self._length - 1) // self._items_per_segment
+        segment, position = divmod(length, self._items_per_segment)
+        for extra_segment in range(segment + 1, last_segment + 1):
+            for extension in ('idx', 'dat'):
+                os.remove(self._get_file_path(extra_segment, extension))
+
+        index_path = self._get_file_path(segment, 'idx')
+        if position == 0:
+            data_size = 0
+        else:
+            with open(index_path, 'rb') as index_file:
+                index_file.seek((position - 1) * INDEX_ENTRY_SIZE)
+                data_size = int.from_bytes(index_file.read(INDEX_ENTRY_SIZE), 'big')
+        for file_path, size in ((index_path, position * INDEX_ENTRY_SIZE),
+                                (self._get_file_path(segment, 'dat'), data_size)):
+            if file_path.exists():
+                os.truncate(file_path, size)
+        self._length = length
+
+    def close(self) -> None:
+        if self._data_file is not None:
+            self._data_file.close()
+            self._index_file.close()
+            self._data_file = None
+            self._index_file = None
+
+
+def _fsync_directory(path: Path) -> None:
+    # the entries of the files created in the directory
+    directory_fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+
+
+def _map_file(file_path: Path) -> mmap.mmap:
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # an empty file can't be mapped, it only holds empty items
+            return mmap.mmap(-1, 1)
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class FrozenBlock(NamedTuple):
+    """
+    The rlp-encoded parts of a frozen block, as views into the freezer files.
+    """
+    header: memoryview
+    transactions: memoryview
+    uncles: memoryview
+    receipts: memoryview
+    block_hash: memoryview
+
+
+class BlockFreezer:
+    """
+    An append-only archive of the canonical blocks from genesis up to some block number,
+    with one table per part of the block (see :class:`FreezerTable`), in the ``path``
+    directory. The blocks are looked up by number, by reading fixed-width index entries.
+
+    Blocks must be final when they are frozen: a reorg can't remove them from the freezer.
+    Use it through :class:`~eth.db.chain.ChainDB`, which moves the blocks older than a given
+    distance from its head into the freezer. Blocks may be read from one thread while they
+    are frozen from another.
+    """
+    def __init__(self,
+                 path: Path,
+                 blocks_per_segment: int = DEFAULT_BLOCKS_PER_SEGMENT) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._tables = {
+            name: FreezerTable(path, name, blocks_per_segment)
+            for name in FREEZER_TABLES
+        }
+
+        # drop the block that was being appended, if the process stopped part-way
+        frozen_count = min(len(table) for table in self._tables.values())
+        for table in self._tables.values():
+            table.truncate(frozen_count)
+
+    @property
+    def frozen_count(self) -> int:
+        """
+        The number of frozen blocks, which is also the number of the next block to freeze.
+        """
+        return len(self._tables['hashes'])
+
+    def is_frozen(self, block_number: BlockNumber, block_hash: Hash32) -> bool:
+        with self._lock:
+            return (
+                block_number < self.frozen_count
+                and self._tables['hashes'][block_number] == block_hash
+            )
+
+    def get_block(self, block_number: BlockNumber) -> FrozenBlock:
+        """
+        Return the rlp-encoded parts of the frozen block ``block_number``, or raise an
+        IndexError if it is not frozen.
+        """
+        with self._lock:
+            return FrozenBlock(*(self._tables[name][block_number] for name in FREEZER_TABLES))
+
+    def append_block(self,
+                     block_number: BlockNumber,
+                     block_hash: Hash32,
+                     header: bytes,
+                     transactions: Iterable[bytes],
+                     uncles: bytes,
+                     receipts: Iterable[bytes]) -> None:
+        """
+        Freeze the next block, with its rlp-encoded ``header``, the encoded ``transactions``
+        and ``receipts``, and the rlp-encoded list of ``uncles``. The block is only durable
+        after :meth:`flush`.
+        """
+        items = (
+            header,
+            rlp.encode(list(transactions)),
+            uncles,
+            rlp.encode(list(receipts)),
+            block_hash,
+        )
+        with self._lock:
+            if block_number != self.frozen_count:
+                raise ValidationError(
+                    f"Cannot freeze block {block_number}, the next block to freeze is "
+                    f"{self.frozen_count}"
+                )
+            for name, item in zip(FREEZER_TABLES, items):
+                self._tables[name].append(item)
+
+    def flush(self) -> None:
+        """
+        Write the blocks frozen so far to disk, with ``fsync``.
+        """
+        with self._lock:
+            for table in self._tables.values():
+                table.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for table in self._tables.values():
+                table.close()
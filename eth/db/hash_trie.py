@@ -1,6 +1,8 @@
 import contextlib
 from typing import (
     cast,
+    Dict,
+    Iterable,
     Iterator,
 )
 
@@ -10,11 +12,25 @@ from trie import HexaryTrie
 from eth.db.keymap import (
     KeyMapDB,
 )
+from eth.db.trie import (
+    get_trie_items,
+)
 
 
 class HashTrie(KeyMapDB):
     keymap = keccak  # type: ignore  # mypy doesn't like that keccak accepts bytearray
 
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """
+        Read ``keys`` from the trie, with one :meth:`~eth.abc.DatabaseAPI.get_many` per level
+        of the trie, see :func:`~eth.db.trie.get_trie_items`. Keys which are not in the trie
+        have the value b'', as when they are read one at a time.
+        """
+        trie = cast(HexaryTrie, self._db)
+        keys_by_hash = {keccak(key): key for key in keys}
+        values = get_trie_items(trie.db, trie.root_hash, keys_by_hash.keys())
+        return {keys_by_hash[key_hash]: value for key_hash, value in values.items()}
+
     @contextlib.contextmanager
     def squash_changes(self) -> Iterator['HashTrie']:
         with cast(HexaryTrie, self._db).squash_changes() as memory_trie:
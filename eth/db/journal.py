@@ -1,13 +1,8 @@
-import collections
 from itertools import (
     count,
 )
 from typing import Callable, cast, Dict, List, Set, Union
 
-from eth_utils.toolz import (
-    first,
-    nth,
-)
 from eth_utils import (
     ValidationError,
 )
@@ -47,9 +42,11 @@ class Journal(BaseDB):
     checkpoints, and committing to them or rolling back to them, and ultimitely persisting
     the final changes.
 
-    Internally, it keeps an ordered list of reversion changesets, used to roll back
-    on demand. This is optimized for the most common path: lots of checkpoints and commits,
-    and not many discards.
+    Internally, it keeps a stack of the active checkpoints, each with the reversion changeset
+    used to roll back to it on demand. A checkpoint is looked up by its position in the stack,
+    and committing a checkpoint merges its changeset (and those of all later checkpoints) into
+    the changeset of the checkpoint before it. This is optimized for the most common path:
+    lots of checkpoints and commits, and not many discards.
 
     Checkpoints are referenced by an internally-generated integer. This is *not* threadsafe.
     """
@@ -59,6 +56,7 @@ class Journal(BaseDB):
         '_current_values',
         '_ignore_wrapped_db',
         '_checkpoint_stack',
+        '_checkpoint_positions',
     ]
 
     #
@@ -71,28 +69,30 @@ class Journal(BaseDB):
         # If the journal was persisted right now, these would be the current changes to push:
         self._current_values: ChangesetDict = {}
 
-        # contains a mapping from all of the int checkpoints
-        # to a dictionary of key:value pairs that are used to rewind from the current values
-        # to the given checkpoint
-        self._journal_data: collections.OrderedDict[JournalDBCheckpoint, ChangesetDict] = collections.OrderedDict()  # noqa E501
+        # The active checkpoints, from the oldest to the latest. The first one is the root.
+        self._checkpoint_stack: List[JournalDBCheckpoint] = []
+
+        # The position of each active checkpoint in the stack
+        self._checkpoint_positions: Dict[JournalDBCheckpoint, int] = {}
+
+        # For each active checkpoint, in the same order as the stack, a dictionary of key:value
+        # pairs that are used to rewind from the current values to the given checkpoint
+        self._journal_data: List[ChangesetDict] = []
 
         # Clears are special operations that enforce that the underlying database and current
-        # changes are completely emptied out. Clears are also committable & discardable.
+        # changes are completely emptied out. Clears are also committable & discardable, so
+        # this holds the checkpoints which were the latest ones when a clear happened.
         self._clears_at: Set[JournalDBCheckpoint] = set()
 
         # If a clear was called, then any missing keys should be treated as missing
         self._ignore_wrapped_db = False
 
-        # To speed up commits, we leave in old recorded checkpoints in self._journal_data, even
-        # on commit. Instead of dropping them, we keep a separate list of active checkpoints.
-        self._checkpoint_stack: List[JournalDBCheckpoint] = []
-
     @property
     def root_checkpoint(self) -> JournalDBCheckpoint:
         """
         Returns the starting checkpoint
         """
-        return first(self._journal_data.keys())
+        return self._checkpoint_stack[0]
 
     @property
     def is_flattened(self) -> bool:
@@ -106,15 +106,16 @@ class Journal(BaseDB):
         """
         Returns the latest checkpoint
         """
-        # last() was iterating through all values, so first(reversed()) gives a 12.5x speedup
-        # Interestingly, an attempt to cache this value caused a slowdown.
-        return first(reversed(self._journal_data.keys()))
+        return self._checkpoint_stack[-1]
 
     def has_checkpoint(self, checkpoint: JournalDBCheckpoint) -> bool:
-        # another option would be to enforce monotonically-increasing checkpoints, so we can do:
-        # checkpoint_idx = bisect_left(self._checkpoint_stack, checkpoint)
-        # (then validate against length and value at index)
-        return checkpoint in self._checkpoint_stack
+        return checkpoint in self._checkpoint_positions
+
+    def _get_checkpoint_position(self, checkpoint: JournalDBCheckpoint) -> int:
+        try:
+            return self._checkpoint_positions[checkpoint]
+        except KeyError:
+            raise ValidationError(f"No checkpoint {checkpoint} was found")
 
     def record_checkpoint(
             self,
@@ -124,7 +125,7 @@ class Journal(BaseDB):
         to prevent collisions.
         """
         if custom_checkpoint is not None:
-            if custom_checkpoint in self._journal_data:
+            if custom_checkpoint in self._checkpoint_positions:
                 raise ValidationError(
                     f"Tried to record with an existing checkpoint: {custom_checkpoint!r}"
                 )
@@ -133,24 +134,27 @@ class Journal(BaseDB):
         else:
             checkpoint = get_next_checkpoint()
 
-        self._journal_data[checkpoint] = {}
+        self._checkpoint_positions[checkpoint] = len(self._checkpoint_stack)
         self._checkpoint_stack.append(checkpoint)
+        self._journal_data.append({})
         return checkpoint
 
+    def _pop_checkpoints(self, position: int) -> None:
+        """
+        Drop the checkpoints from ``position`` onwards, with their changesets.
+        """
+        for checkpoint in self._checkpoint_stack[position:]:
+            del self._checkpoint_positions[checkpoint]
+            self._clears_at.discard(checkpoint)
+        del self._checkpoint_stack[position:]
+        del self._journal_data[position:]
+
     def discard(self, through_checkpoint_id: JournalDBCheckpoint) -> None:
-        while self._checkpoint_stack:
-            checkpoint_id = self._checkpoint_stack.pop()
-            if checkpoint_id == through_checkpoint_id:
-                break
-        else:
-            # checkpoint not found!
-            raise ValidationError(f"No checkpoint {through_checkpoint_id} was found")
+        position = self._get_checkpoint_position(through_checkpoint_id)
 
         # This might be optimized further by iterating the other direction and
         # ignoring any follow-up rollbacks on the same variable.
-        for _ in range(len(self._journal_data)):
-            checkpoint_id, rollback_data = self._journal_data.popitem()
-
+        for rollback_data in reversed(self._journal_data[position:]):
             for old_key, old_value in rollback_data.items():
                 if old_value is REVERT_TO_WRAPPED:
                     # The current value may not exist, if it was a delete followed by a clear,
@@ -163,59 +167,72 @@ class Journal(BaseDB):
                 else:
                     raise ValidationError(f"Unexpected value, must be bytes: {old_value!r}")
 
-            if checkpoint_id in self._clears_at:
-                self._clears_at.remove(checkpoint_id)
-                self._ignore_wrapped_db = False
-
-            if checkpoint_id == through_checkpoint_id:
-                break
+        self._pop_checkpoints(position)
 
-        if self._clears_at:
-            # if there is still a clear in older locations, then reinitiate the clear flag
-            self._ignore_wrapped_db = True
+        # if there is still a clear in older locations, then keep the clear flag
+        self._ignore_wrapped_db = bool(self._clears_at)
 
     def clear(self) -> None:
         """
         Treat as if the *underlying* database will also be cleared by some other mechanism.
-        We build a special empty reversion changeset just for marking that all previous data should
-        be ignored.
+        All the current values are added to the reversion changeset of the latest checkpoint,
+        which is marked as having a clear, so that all previous data is ignored.
         """
-        checkpoint = get_next_checkpoint()
-        self._journal_data[checkpoint] = self._current_values
+        revert_changeset = self._journal_data[-1]
+        if revert_changeset:
+            for key, value in self._current_values.items():
+                if key not in revert_changeset:
+                    revert_changeset[key] = value
+        else:
+            self._journal_data[-1] = self._current_values
         self._current_values = {}
         self._ignore_wrapped_db = True
-        self._clears_at.add(checkpoint)
+        self._clears_at.add(self._checkpoint_stack[-1])
 
     def has_clear(self, at_checkpoint: JournalDBCheckpoint) -> bool:
-        for reversion_changeset_id in reversed(self._journal_data.keys()):
-            if reversion_changeset_id in self._clears_at:
-                return True
-            elif at_checkpoint == reversion_changeset_id:
-                return False
-        raise ValidationError(f"Checkpoint {at_checkpoint} is not in the journal")
+        position = self._get_checkpoint_position(at_checkpoint)
+        if position == 0:
+            return bool(self._clears_at)
+        else:
+            return any(
+                checkpoint in self._clears_at
+                for checkpoint in self._checkpoint_stack[position:]
+            )
 
     def commit_checkpoint(self, commit_to: JournalDBCheckpoint) -> ChangesetDict:
         """
         Collapses all changes since the given checkpoint. Can no longer discard to any of
         the checkpoints that followed the given checkpoint.
         """
-        # Another option would be to enforce monotonically-increasing changeset ids, so we can do:
-        # checkpoint_idx = bisect_left(self._checkpoint_stack, commit_to)
-        # (then validate against length and value at index)
-        for positions_before_last, checkpoint in enumerate(reversed(self._checkpoint_stack)):
-            if checkpoint == commit_to:
-                checkpoint_idx = -1 - positions_before_last
-                break
-        else:
-            raise ValidationError(f"No checkpoint {commit_to} was found")
-
-        if checkpoint_idx == -1 * len(self._checkpoint_stack):
+        position = self._get_checkpoint_position(commit_to)
+        if position == 0:
             raise ValidationError(
                 "Should not commit root changeset with commit_changeset, use pop_all() instead"
             )
 
-        # delete committed checkpoints from the stack (but keep rollbacks for future discards)
-        del self._checkpoint_stack[checkpoint_idx:]
+        # Merge the committed changesets into the previous one. Where a key is in several,
+        # the oldest rollback value is the one to keep. The smaller changeset is always
+        # copied into the larger one, so that committing a deep stack of checkpoints one
+        # at a time doesn't copy the same keys again and again.
+        previous_checkpoint = self._checkpoint_stack[position - 1]
+        merged_changeset = self._journal_data[position - 1]
+        for committed_changeset in self._journal_data[position:]:
+            if len(merged_changeset) >= len(committed_changeset):
+                for key, value in committed_changeset.items():
+                    if key not in merged_changeset:
+                        merged_changeset[key] = value
+            else:
+                committed_changeset.update(merged_changeset)
+                merged_changeset = committed_changeset
+        self._journal_data[position - 1] = merged_changeset
+
+        has_merged_clear = self._clears_at and any(
+            checkpoint in self._clears_at
+            for checkpoint in self._checkpoint_stack[position:]
+        )
+        self._pop_checkpoints(position)
+        if has_merged_clear:
+            self._clears_at.add(previous_checkpoint)
 
         return self._current_values
 
@@ -225,6 +242,7 @@ class Journal(BaseDB):
         self._clears_at.clear()
         self._current_values = {}
         self._checkpoint_stack.clear()
+        self._checkpoint_positions.clear()
         self.record_checkpoint()
         self._ignore_wrapped_db = False
         return final_changes
@@ -233,7 +251,7 @@ class Journal(BaseDB):
         if self.is_flattened:
             return
 
-        checkpoint_after_root = nth(1, self._checkpoint_stack)
+        checkpoint_after_root = self._checkpoint_stack[1]
         self.commit_checkpoint(checkpoint_after_root)
 
     #
@@ -254,7 +272,7 @@ class Journal(BaseDB):
 
     def __setitem__(self, key: bytes, value: bytes) -> None:
         # if the value has not been changed since wrapping, then simply revert to original value
-        revert_changeset = self._journal_data[self.last_checkpoint]
+        revert_changeset = self._journal_data[-1]
         if key not in revert_changeset:
             revert_changeset[key] = self._current_values.get(key, REVERT_TO_WRAPPED)
         self._current_values[key] = value
@@ -267,13 +285,13 @@ class Journal(BaseDB):
         raise NotImplementedError("You must delete with one of delete_local or delete_wrapped")
 
     def delete_wrapped(self, key: bytes) -> None:
-        revert_changeset = self._journal_data[self.last_checkpoint]
+        revert_changeset = self._journal_data[-1]
         if key not in revert_changeset:
             revert_changeset[key] = self._current_values.get(key, REVERT_TO_WRAPPED)
         self._current_values[key] = DELETE_WRAPPED
 
     def delete_local(self, key: bytes) -> None:
-        revert_changeset = self._journal_data[self.last_checkpoint]
+        revert_changeset = self._journal_data[-1]
         if key not in revert_changeset:
             revert_changeset[key] = self._current_values.get(key, REVERT_TO_WRAPPED)
         self._current_values[key] = REVERT_TO_WRAPPED
@@ -0,0 +1,348 @@
+"""
+An index of the logs of the canonical chain, to answer log queries over block ranges without
+scanning every block.
+"""
+import collections
+import threading
+from typing import (
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from eth_typing import (
+    Address,
+    BlockNumber,
+    Hash32,
+)
+from eth_utils import (
+    ValidationError,
+    to_tuple,
+)
+import rlp
+
+from eth.abc import (
+    BlockHeaderAPI,
+    ChainAPI,
+    DatabaseAPI,
+    LogAPI,
+    ReceiptAPI,
+)
+from eth.db.schema import SchemaV1
+from eth.exceptions import (
+    HeaderNotFound,
+)
+
+
+DEFAULT_LOG_INDEX_BUCKET_SIZE = 1024
+
+# A filter on the topic at one position: any topic (None), or one of the given topics
+TopicFilter = Union[None, int, Collection[int]]
+
+
+class IndexedLog(NamedTuple):
+    block_number: BlockNumber
+    block_hash: Hash32
+    transaction_index: int
+    transaction_hash: Hash32
+    log_index: int
+    address: Address
+    topics: Tuple[int, ...]
+    data: bytes
+
+
+class LogIndexHead(rlp.Serializable):
+    fields = [
+        ('block_number', rlp.sedes.big_endian_int),
+        ('block_hash', rlp.sedes.Binary.fixed_length(32)),
+        ('bucket_size', rlp.sedes.big_endian_int),
+    ]
+
+
+def _encode_block_numbers(block_numbers: Iterable[int]) -> bytes:
+    return b''.join(block_number.to_bytes(8, 'big') for block_number in block_numbers)
+
+
+def _decode_block_numbers(encoded: bytes) -> Set[int]:
+    return {
+        int.from_bytes(encoded[offset:offset + 8], 'big')
+        for offset in range(0, len(encoded), 8)
+    }
+
+
+class LogIndexDB:
+    """
+    An index of the logs of the canonical chain of ``chain``, stored in its database.
+
+    For every emitting address, and every topic at each position, the index keeps the
+    numbers of the blocks with a matching log, in buckets of ``bucket_size`` blocks. A query
+    reads one entry per bucket and per filter value, and only decodes the receipts of the
+    blocks which match all the filters.
+
+    The index follows the canonical chain: :meth:`update` indexes the blocks added since it
+    was last called. It is called by :meth:`get_logs`, unless the caller keeps the index up
+    to date itself, e.g. after each new block. Blocks which left the canonical chain in a
+    reorg may still be listed in the index, but their logs are never returned, since the
+    logs are always read from the canonical block.
+    """
+
+    def __init__(self,
+                 chain: ChainAPI,
+                 bucket_size: int = DEFAULT_LOG_INDEX_BUCKET_SIZE) -> None:
+        self.chain = chain
+        self.chaindb = chain.chaindb
+        self.db = chain.chaindb.db
+        self.bucket_size = bucket_size
+        self._lock = threading.Lock()
+
+    #
+    # Indexing
+    #
+    def update(self) -> BlockNumber:
+        """
+        Index the canonical blocks up to the head of the chain, and return the number of the
+        head.
+        """
+        with self._lock:
+            head = self.chaindb.get_canonical_head()
+            next_block_number = self._get_first_unindexed_block_number()
+
+            while next_block_number <= head.block_number:
+                # Write a bucket at a time, so that indexing a long chain can be resumed
+                last_block_number = BlockNumber(min(
+                    head.block_number,
+                    next_block_number - next_block_number % self.bucket_size
+                    + self.bucket_size - 1,
+                ))
+                self._index_blocks(next_block_number, last_block_number)
+                next_block_number = BlockNumber(last_block_number + 1)
+
+            return head.block_number
+
+    def is_up_to_date(self) -> bool:
+        """
+        Return whether the index covers the canonical chain up to its head, i.e. whether
+        :meth:`update` has nothing to index.
+        """
+        index_head = self._get_index_head()
+        if index_head is None:
+            return False
+        return index_head.block_hash == self.chaindb.get_canonical_head().hash
+
+    def _get_index_head(self) -> Optional[LogIndexHead]:
+        try:
+            encoded_head = self.db[SchemaV1.make_log_index_head_key()]
+        except KeyError:
+            return None
+
+        index_head = rlp.decode(encoded_head, sedes=LogIndexHead)
+        if index_head.bucket_size != self.bucket_size:
+            raise ValidationError(
+                f"The log index was built with buckets of {index_head.bucket_size} blocks, "
+                f"not {self.bucket_size}"
+            )
+        return index_head
+
+    def _get_first_unindexed_block_number(self) -> BlockNumber:
+        index_head = self._get_index_head()
+        if index_head is None:
+            return BlockNumber(0)
+
+        # After a reorg, index again from the last indexed block which is still canonical
+        for block_number in map(BlockNumber, range(index_head.block_number, -1, -1)):
+            indexed_hash = self.db.get(SchemaV1.make_log_index_block_hash_key(block_number))
+            try:
+                canonical_hash = self.chaindb.get_canonical_block_hash(block_number)
+            except HeaderNotFound:
+                continue
+            if indexed_hash == canonical_hash:
+                return BlockNumber(block_number + 1)
+
+        return BlockNumber(0)
+
+    def _index_blocks(self, first_block_number: int, last_block_number: int) -> None:
+        block_numbers_by_key: Dict[bytes, List[int]] = collections.defaultdict(list)
+
+        with self.db.atomic_batch() as db:
+            for block_number in range(first_block_number, last_block_number + 1):
+                header = self.chaindb.get_canonical_block_header_by_number(
+                    BlockNumber(block_number),
+                )
+                for key in self._get_index_keys(header):
+                    block_numbers_by_key[key].append(block_number)
+
+                db[SchemaV1.make_log_index_block_hash_key(header.block_number)] = header.hash
+
+            for key, block_numbers in block_numbers_by_key.items():
+                self._append_block_numbers(db, key, block_numbers)
+
+            db[SchemaV1.make_log_index_head_key()] = rlp.encode(LogIndexHead(
+                block_number=header.block_number,
+                block_hash=header.hash,
+                bucket_size=self.bucket_size,
+            ))
+
+    def _get_index_keys(self, header: BlockHeaderAPI) -> Set[bytes]:
+        if header.bloom == 0:
+            # an empty bloom filter means that there are no logs in the block
+            return set()
+
+        bucket = header.block_number // self.bucket_size
+        keys = set()
+        for receipt in self._get_receipts(header):
+            for log in receipt.logs:
+                keys.add(SchemaV1.make_log_index_address_key(log.address, bucket))
+                for position, topic in enumerate(log.topics):
+                    keys.add(SchemaV1.make_log_index_topic_key(position, topic, bucket))
+
+        if keys:
+            keys.add(SchemaV1.make_log_index_blocks_key(bucket))
+        return keys
+
+    @staticmethod
+    def _append_block_numbers(db: DatabaseAPI, key: bytes, block_numbers: List[int]) -> None:
+        encoded = db.get(key, b'')
+        # blocks are indexed again after a reorg, don't list them twice
+        already_indexed = _decode_block_numbers(encoded)
+        new_block_numbers = [
+            block_number for block_number in block_numbers if block_number not in already_indexed
+        ]
+        if new_block_numbers:
+            db[key] = encoded + _encode_block_numbers(new_block_numbers)
+
+    def _get_receipts(self, header: BlockHeaderAPI) -> Tuple[ReceiptAPI, ...]:
+        vm_class = self.chain.get_vm_class_for_block_number(header.block_number)
+        return self.chaindb.get_receipts(header, vm_class.get_receipt_builder())
+
+    #
+    # Queries
+    #
+    @to_tuple
+    def get_logs(self,
+                 from_block: BlockNumber,
+                 to_block: BlockNumber = None,
+                 addresses: Collection[Address] = (),
+                 topics: Sequence[TopicFilter] = (),
+                 update: bool = True) -> Iterable[IndexedLog]:
+        """
+        Return the logs of the canonical blocks ``from_block`` to ``to_block`` (the head of the
+        chain if None), emitted by one of ``addresses`` (any address if empty) and matching
+        ``topics``. The ``topics`` filter the topic at their position, as in ``eth_getLogs``.
+
+        With ``update`` False, the index isn't brought up to date first, and only the blocks
+        indexed so far are searched: the query then only reads from the database.
+        """
+        if update:
+            head_block_number = self.update()
+        else:
+            index_head = self._get_index_head()
+            if index_head is None:
+                return
+            head_block_number = index_head.block_number
+
+        if to_block is None or to_block > head_block_number:
+            to_block = head_block_number
+
+        topic_filters = tuple(
+            None if topic_filter is None
+            else frozenset((topic_filter,)) if isinstance(topic_filter, int)
+            else frozenset(topic_filter)
+            for topic_filter in topics
+        )
+        address_filter = frozenset(addresses)
+
+        for block_number in self._get_candidate_block_numbers(
+                from_block,
+                to_block,
+                address_filter,
+                topic_filters):
+            yield from self._get_block_logs(block_number, address_filter, topic_filters)
+
+    @to_tuple
+    def _get_candidate_block_numbers(
+            self,
+            from_block: BlockNumber,
+            to_block: BlockNumber,
+            address_filter: Collection[Address],
+            topic_filters: Sequence[Optional[Collection[int]]]) -> Iterable[BlockNumber]:
+
+        for bucket in range(from_block // self.bucket_size, to_block // self.bucket_size + 1):
+            candidates = None
+
+            key_groups = []
+            if address_filter:
+                key_groups.append(tuple(
+                    SchemaV1.make_log_index_address_key(address, bucket)
+                    for address in address_filter
+                ))
+            for position, topic_filter in enumerate(topic_filters):
+                if topic_filter is not None:
+                    key_groups.append(tuple(
+                        SchemaV1.make_log_index_topic_key(position, topic, bucket)
+                        for topic in topic_filter
+                    ))
+            if not key_groups:
+                key_groups.append((SchemaV1.make_log_index_blocks_key(bucket), ))
+
+            for keys in key_groups:
+                # blocks matching any of the keys
+                matching: Set[int] = set()
+                for key in keys:
+                    matching.update(_decode_block_numbers(self.db.get(key, b'')))
+
+                candidates = matching if candidates is None else candidates & matching
+                if not candidates:
+                    break
+
+            for block_number in sorted(candidates):
+                if from_block <= block_number <= to_block:
+                    yield BlockNumber(block_number)
+
+    def _get_block_logs(
+            self,
+            block_number: BlockNumber,
+            address_filter: Collection[Address],
+            topic_filters: Sequence[Optional[Collection[int]]]) -> Iterable[IndexedLog]:
+
+        header = self.chaindb.get_canonical_block_header_by_number(block_number)
+        transaction_hashes = None
+
+        log_index = 0
+        for transaction_index, receipt in enumerate(self._get_receipts(header)):
+            for log in receipt.logs:
+                if _is_match(log, address_filter, topic_filters):
+                    if transaction_hashes is None:
+                        transaction_hashes = self.chaindb.get_block_transaction_hashes(header)
+
+                    yield IndexedLog(
+                        block_number=header.block_number,
+                        block_hash=header.hash,
+                        transaction_index=transaction_index,
+                        transaction_hash=transaction_hashes[transaction_index],
+                        log_index=log_index,
+                        address=log.address,
+                        topics=tuple(log.topics),
+                        data=log.data,
+                    )
+                log_index += 1
+
+
+def _is_match(log: LogAPI,
+              address_filter: Collection[Address],
+              topic_filters: Sequence[Optional[Collection[int]]]) -> bool:
+    if address_filter and log.address not in address_filter:
+        return False
+    if len(topic_filters) > len(log.topics):
+        # like in geth, a log matches only if it has a topic at every position of the filter
+        return False
+    for topic, topic_filter in zip(log.topics, topic_filters):
+        if topic_filter is not None and topic not in topic_filter:
+            return False
+    return True
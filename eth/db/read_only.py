@@ -0,0 +1,34 @@
+from typing import (
+    Dict,
+    Iterable,
+)
+
+from eth_utils import (
+    ValidationError,
+)
+
+from eth.abc import DatabaseAPI
+from eth.db.backends.base import BaseDB
+
+
+class ReadOnlyDB(BaseDB):
+    """
+    A view of ``db`` which can be read from, but not written to.
+    """
+    def __init__(self, db: DatabaseAPI) -> None:
+        self._db = db
+
+    def __getitem__(self, key: bytes) -> bytes:
+        return self._db[key]
+
+    def _exists(self, key: bytes) -> bool:
+        return key in self._db
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        return self._db.get_many(keys)
+
+    def __setitem__(self, key: bytes, value: bytes) -> None:
+        raise ValidationError("Cannot write to a read-only database")
+
+    def __delitem__(self, key: bytes) -> None:
+        raise ValidationError("Cannot delete from a read-only database")
@@ -1,4 +1,5 @@
 from eth_typing import (
+    Address,
     BlockNumber,
     Hash32,
 )
@@ -38,3 +39,49 @@ class SchemaV1(SchemaAPI):
     @staticmethod
     def make_transaction_hash_to_block_lookup_key(transaction_hash: Hash32) -> bytes:
         return b'transaction-hash-to-block:%s' % transaction_hash
+
+    @staticmethod
+    def make_log_index_head_key() -> bytes:
+        return b'v1:log-index-head'
+
+    @staticmethod
+    def make_log_index_block_hash_key(block_number: BlockNumber) -> bytes:
+        return b'log-index-block-hash:%d' % block_number
+
+    @staticmethod
+    def make_log_index_blocks_key(bucket: int) -> bytes:
+        """
+        Numbers of the blocks with logs in the ``bucket``, as concatenated 8 byte values
+        """
+        return b'log-index-blocks:%d' % bucket
+
+    @staticmethod
+    def make_log_index_address_key(address: Address, bucket: int) -> bytes:
+        """
+        Numbers of the blocks with logs emitted by ``address`` in the ``bucket``, as
+        concatenated 8 byte values
+        """
+        return b'log-index-address:%s:%d' % (address, bucket)
+
+    @staticmethod
+    def make_log_index_topic_key(position: int, topic: int, bucket: int) -> bytes:
+        """
+        Numbers of the blocks with logs that have ``topic`` at ``position`` in the
+        ``bucket``, as concatenated 8 byte values
+        """
+        return b'log-index-topic:%d:%064x:%d' % (position, topic, bucket)
+
+    @staticmethod
+    def make_snapshot_root_key() -> bytes:
+        """
+        State root of the flat state snapshot
+        """
+        return b'v1:snapshot-root'
+
+    @staticmethod
+    def make_snapshot_account_key(address_hash: Hash32) -> bytes:
+        return b'snapshot-account:%s' % address_hash
+
+    @staticmethod
+    def make_snapshot_storage_key(address_hash: Hash32, slot_hash: Hash32) -> bytes:
+        return b'snapshot-storage:%s%s' % (address_hash, slot_hash)
@@ -0,0 +1,268 @@
+"""
+A flat copy of the state at one state root, stored beside the tries, so that accounts and
+storage slots can be read with a single database lookup instead of a walk down the trie.
+"""
+import itertools
+from typing import (
+    cast,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+from eth_hash.auto import keccak
+from eth_typing import (
+    Address,
+    Hash32,
+)
+import rlp
+from trie import HexaryTrie
+from trie.iter import NodeIterator
+
+from eth.abc import (
+    AtomicDatabaseAPI,
+    DatabaseAPI,
+    StorageChanges,
+)
+from eth.constants import (
+    BLANK_ROOT_HASH,
+)
+from eth.db.backends.base import (
+    BaseDB,
+)
+from eth.db.hash_trie import (
+    HashTrie,
+)
+from eth.db.schema import SchemaV1
+from eth.rlp.accounts import (
+    Account,
+)
+
+
+# Written as the snapshot root while the snapshot is rebuilt: it matches no state root
+INVALID_SNAPSHOT_ROOT = b''
+
+# Number of entries written per batch by StateSnapshot.generate()
+GENERATE_BATCH_SIZE = 10000
+
+
+class StateSnapshot:
+    """
+    A flat copy of the accounts and storage of one state root, stored in ``db``: the
+    rlp-encoded account under the hash of its address, and the rlp-encoded value of each
+    slot under the hash of the address and the hash of the slot, as in the tries.
+
+    The snapshot is at a single state root at a time. Every read takes the state root it
+    expects, and returns None if the snapshot is at another root, in which case the caller
+    must read the trie. :meth:`update` moves the snapshot to the next state root, with the
+    changes of the persist which created it.
+
+    The state root of the snapshot is stored in ``db`` with it, and every read fetches it
+    in the same :meth:`~eth.abc.DatabaseAPI.get_many` as the entries it reads. So a read
+    never sees the snapshot at a root whose batch wasn't committed, and sees it move
+    whichever database or process moved it.
+    """
+    def __init__(self, db: AtomicDatabaseAPI) -> None:
+        self._db = db
+
+    @property
+    def state_root(self) -> Hash32:
+        # An empty database has the snapshot of the empty state
+        return Hash32(self._db.get(SchemaV1.make_snapshot_root_key(), BLANK_ROOT_HASH))
+
+    def _get_many_at_root(self,
+                          state_root: Hash32,
+                          keys: Iterable[bytes]) -> Optional[Dict[bytes, bytes]]:
+        """
+        Read ``keys`` together with the state root of the snapshot, and return the values
+        which are set, by key, or None if the snapshot is not at ``state_root``.
+        """
+        root_key = SchemaV1.make_snapshot_root_key()
+        values = self._db.get_many(itertools.chain((root_key, ), keys))
+        if values.get(root_key, BLANK_ROOT_HASH) != state_root:
+            return None
+        return values
+
+    def get_account(self, state_root: Hash32, address: Address) -> Optional[bytes]:
+        """
+        Return the rlp-encoded account at ``address`` (b'' if there is none), or None if the
+        snapshot is not at ``state_root``.
+        """
+        key = SchemaV1.make_snapshot_account_key(cast(Hash32, keccak(address)))
+        values = self._get_many_at_root(state_root, (key, ))
+        if values is None:
+            return None
+        return values.get(key, b'')
+
+    def get_storage(self,
+                    state_root: Hash32,
+                    address: Address,
+                    slot_hash: Hash32) -> Optional[bytes]:
+        """
+        Return the rlp-encoded value of the slot with hash ``slot_hash`` of the account at
+        ``address`` (b'' if it is empty), or None if the snapshot is not at ``state_root``.
+        """
+        key = SchemaV1.make_snapshot_storage_key(cast(Hash32, keccak(address)), slot_hash)
+        values = self._get_many_at_root(state_root, (key, ))
+        if values is None:
+            return None
+        return values.get(key, b'')
+
+    def get_accounts(self,
+                     state_root: Hash32,
+                     addresses: Iterable[Address]) -> Optional[Dict[Address, bytes]]:
+        """
+        Like :meth:`get_account` for several accounts, read with a single
+        :meth:`~eth.abc.DatabaseAPI.get_many`.
+        """
+        addresses_by_key = {
+            SchemaV1.make_snapshot_account_key(cast(Hash32, keccak(address))): address
+            for address in addresses
+        }
+        encoded_accounts = self._get_many_at_root(state_root, addresses_by_key.keys())
+        if encoded_accounts is None:
+            return None
+        return {
+            address: encoded_accounts.get(key, b'')
+            for key, address in addresses_by_key.items()
+        }
+
+    def get_storage_values(self,
+                           state_root: Hash32,
+                           address: Address,
+                           slot_hashes: Iterable[Hash32]) -> Optional[Dict[Hash32, bytes]]:
+        """
+        Like :meth:`get_storage` for several slots of one account, read with a single
+        :meth:`~eth.abc.DatabaseAPI.get_many`.
+        """
+        address_hash = cast(Hash32, keccak(address))
+        slot_hashes_by_key = {
+            SchemaV1.make_snapshot_storage_key(address_hash, slot_hash): slot_hash
+            for slot_hash in slot_hashes
+        }
+        values = self._get_many_at_root(state_root, slot_hashes_by_key.keys())
+        if values is None:
+            return None
+        return {
+            slot_hash: values.get(key, b'')
+            for key, slot_hash in slot_hashes_by_key.items()
+        }
+
+    def update(self,
+               write_batch: DatabaseAPI,
+               new_state_root: Hash32,
+               account_changes: Dict[Address, bytes],
+               storage_changes: Dict[Address, StorageChanges]) -> None:
+        """
+        Write the changes which lead from the current state root of the snapshot to
+        ``new_state_root`` into ``write_batch``, which should also hold the new trie nodes.
+
+        ``account_changes`` holds the rlp-encoded accounts which changed (b'' for deleted
+        accounts), and ``storage_changes`` the changes to their storage. The snapshot is at
+        ``new_state_root`` once ``write_batch`` is committed.
+        """
+        for address, storage in storage_changes.items():
+            address_hash = cast(Hash32, keccak(address))
+            if storage.wiped_root is not None:
+                for slot_hash in self._iter_trie(storage.wiped_root).keys():
+                    key = SchemaV1.make_snapshot_storage_key(address_hash, slot_hash)
+                    write_batch.delete(key)
+
+            for slot_hash, value in storage.slots.items():
+                key = SchemaV1.make_snapshot_storage_key(address_hash, slot_hash)
+                if value:
+                    write_batch[key] = value
+                else:
+                    write_batch.delete(key)
+
+        for address, encoded_account in account_changes.items():
+            key = SchemaV1.make_snapshot_account_key(cast(Hash32, keccak(address)))
+            if encoded_account:
+                write_batch[key] = encoded_account
+            else:
+                write_batch.delete(key)
+
+        write_batch[SchemaV1.make_snapshot_root_key()] = new_state_root
+
+    def generate(self, state_root: Hash32) -> None:
+        """
+        Rebuild the snapshot at ``state_root`` from the tries, e.g. for a database whose
+        state was written before the snapshot was enabled. The entries of the current snapshot
+        are removed first, by walking the tries of its state root.
+
+        The snapshot is not used while it is rebuilt, and is written in several batches, so
+        that a large state doesn't have to fit in memory. If the rebuild is interrupted, it
+        must be run again with the same ``state_root``.
+        """
+        old_state_root = self.state_root
+        self._db[SchemaV1.make_snapshot_root_key()] = INVALID_SNAPSHOT_ROOT
+
+        if old_state_root not in (INVALID_SNAPSHOT_ROOT, BLANK_ROOT_HASH, state_root):
+            self._write_in_batches(
+                (key, b'') for key, _ in self._iter_entries(old_state_root)
+            )
+        self._write_in_batches(self._iter_entries(state_root))
+
+        self._db[SchemaV1.make_snapshot_root_key()] = state_root
+
+    def _write_in_batches(self, entries: Iterable[Tuple[bytes, bytes]]) -> None:
+        entries = iter(entries)
+        batch_size = GENERATE_BATCH_SIZE
+        while batch_size == GENERATE_BATCH_SIZE:
+            batch_size = 0
+            with self._db.atomic_batch() as write_batch:
+                for key, value in itertools.islice(entries, GENERATE_BATCH_SIZE):
+                    if value:
+                        write_batch[key] = value
+                    else:
+                        write_batch.delete(key)
+                    batch_size += 1
+
+    def _iter_entries(self, state_root: Hash32) -> Iterable[Tuple[bytes, bytes]]:
+        for address_hash, encoded_account in self._iter_trie(state_root).items():
+            yield SchemaV1.make_snapshot_account_key(address_hash), encoded_account
+
+            account = rlp.decode(encoded_account, sedes=Account)
+            for slot_hash, value in self._iter_trie(account.storage_root).items():
+                yield SchemaV1.make_snapshot_storage_key(address_hash, slot_hash), value
+
+    def _iter_trie(self, root_hash: Hash32) -> NodeIterator:
+        return NodeIterator(HexaryTrie(self._db, root_hash))
+
+
+class AccountSnapshotLookup(BaseDB):
+    """
+    Read the accounts of ``trie`` from ``snapshot`` when the snapshot is at the root of the
+    trie, and from the trie otherwise. Writes go to the trie.
+    """
+    def __init__(self, trie: HashTrie, snapshot: StateSnapshot) -> None:
+        self._trie = trie
+        self._snapshot = snapshot
+
+    def __getitem__(self, address: bytes) -> bytes:
+        encoded_account = self._snapshot.get_account(self._trie.root_hash, Address(address))
+        if encoded_account is None:
+            return self._trie[address]
+        else:
+            return encoded_account
+
+    def __setitem__(self, address: bytes, value: bytes) -> None:
+        self._trie[address] = value
+
+    def __delitem__(self, address: bytes) -> None:
+        del self._trie[address]
+
+    def get_many(self, addresses: Iterable[bytes]) -> Dict[bytes, bytes]:
+        addresses = tuple(addresses)
+        encoded_accounts = self._snapshot.get_accounts(
+            self._trie.root_hash,
+            cast(Iterable[Address], addresses),
+        )
+        if encoded_accounts is None:
+            return self._trie.get_many(addresses)
+        else:
+            return cast(Dict[bytes, bytes], encoded_accounts)
+
+    def _exists(self, address: bytes) -> bool:
+        return self[address] != b''
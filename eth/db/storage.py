@@ -1,8 +1,17 @@
+from concurrent.futures import (
+    Executor,
+)
 from typing import (
+    Dict,
     FrozenSet,
+    Iterable,
     List,
     NamedTuple,
+    Optional,
+    Sequence,
     Set,
+    Tuple,
+    cast,
 )
 
 from eth_hash.auto import keccak
@@ -31,6 +40,7 @@ from eth.abc import (
     AccountStorageDatabaseAPI,
     AtomicDatabaseAPI,
     DatabaseAPI,
+    StorageChanges,
 )
 from eth.constants import (
     BLANK_ROOT_HASH,
@@ -46,10 +56,24 @@ from eth.db.batch import (
 )
 from eth.db.cache import (
     CacheDB,
+    StorageSlotCache,
 )
 from eth.db.journal import (
     JournalDB,
 )
+from eth.db.read_only import (
+    ReadOnlyDB,
+)
+from eth.db.snapshot import (
+    StateSnapshot,
+)
+from eth.db.trie import (
+    TrieRootAndData,
+    get_reachable_trie_nodes,
+    get_trie_items,
+    get_trie_update_nodes,
+    update_trie_items,
+)
 from eth.vm.interrupt import (
     MissingStorageTrieNode,
 )
@@ -67,29 +91,53 @@ class PendingWrites(NamedTuple):
     write_trie: HexaryTrie  # The write trie at the time of deletion
     trie_nodes_batch: BatchDB  # A batch of all trie nodes written to the trie
     starting_root_hash: Hash32  # The starting root hash
+    written_slots: Dict[Hash32, bytes]  # The slots written to the trie
 
 
 class StorageLookup(BaseDB):
     """
     This lookup converts lookups of storage slot integers into the appropriate trie lookup.
-    Similarly, it persists changes to the appropriate trie at write time.
+    Writes are held until the storage root is needed, and then applied to the trie all at
+    once, with :func:`~eth.db.trie.update_trie_items`.
 
     StorageLookup also tracks the state roots changed since the last persist.
+
+    With a ``snapshot``, the slots are read from the snapshot if it is at ``state_root``, as
+    long as the trie was not changed.
+
+    With a ``slot_cache``, the slots read from the trie are cached by storage root, as long
+    as the trie was not changed, and the cached slots are moved to the new root on commit.
     """
     logger = get_extended_debug_logger("eth.db.storage.StorageLookup")
 
     # The trie that is modified in-place, used to calculate storage root on-demand
     _write_trie: HexaryTrie
 
-    # These are the new trie nodes, waiting to be committed to disk
+    # These are the new trie nodes, waiting to be committed to disk, along with the nodes
+    # replaced by later updates, which are not
     _trie_nodes_batch: BatchDB
 
+    # The values written to the trie since the last commit, by slot hash (b'' when deleted)
+    _written_slots: Dict[Hash32, bytes]
+
+    # The values written since the trie was last updated, by slot hash (b'' when deleted)
+    _pending_writes: Dict[Hash32, bytes]
+
     # When deleting an account, push the pending write info onto this stack.
     # This stack can get as big as the number of transactions per block: one for each delete.
     _historical_write_tries: List[PendingWrites]
 
-    def __init__(self, db: DatabaseAPI, storage_root: Hash32, address: Address) -> None:
+    def __init__(self,
+                 db: DatabaseAPI,
+                 storage_root: Hash32,
+                 address: Address,
+                 snapshot: StateSnapshot = None,
+                 state_root: Hash32 = None,
+                 slot_cache: StorageSlotCache = None) -> None:
         self._db = db
+        self._snapshot = snapshot
+        self._snapshot_state_root = state_root
+        self._slot_cache = slot_cache
 
         # Set the starting root hash, to be used for on-disk storage read lookups
         self._initialize_to_root_hash(storage_root)
@@ -102,7 +150,7 @@ class StorageLookup(BaseDB):
 
         if self._write_trie is None:
             batch_db = self._trie_nodes_batch
-            self._write_trie = HexaryTrie(batch_db, root_hash=self._starting_root_hash, prune=True)
+            self._write_trie = HexaryTrie(batch_db, root_hash=self._starting_root_hash)
 
         return self._write_trie
 
@@ -115,15 +163,49 @@ class StorageLookup(BaseDB):
             # cache the read trie, if this becomes a bottleneck.
             return HexaryTrie(self._db, root_hash=self._starting_root_hash)
 
-    def _decode_key(self, key: bytes) -> bytes:
+    def _decode_key(self, key: bytes) -> Hash32:
         padded_slot = pad32(key)
-        return keccak(padded_slot)
+        return cast(Hash32, keccak(padded_slot))
+
+    def _is_snapshot_readable(self) -> bool:
+        return (
+            self._snapshot is not None
+            and self._write_trie is None
+            and not self._historical_write_tries
+        )
+
+    def _is_slot_cache_readable(self) -> bool:
+        # The write trie may be at a root that is never committed, don't cache its slots
+        return self._slot_cache is not None and self._write_trie is None
+
+    def _get_from_snapshot(self, hashed_slot: Hash32) -> Optional[bytes]:
+        if self._is_snapshot_readable():
+            return self._snapshot.get_storage(
+                self._snapshot_state_root,
+                self._address,
+                hashed_slot,
+            )
+        else:
+            return None
 
     def __getitem__(self, key: bytes) -> bytes:
         hashed_slot = self._decode_key(key)
+        if hashed_slot in self._pending_writes:
+            return self._pending_writes[hashed_slot]
+
+        value = self._get_from_snapshot(hashed_slot)
+        if value is not None:
+            return value
+
+        is_slot_cache_readable = self._is_slot_cache_readable()
+        if is_slot_cache_readable:
+            value = self._slot_cache.get(self._address, self._starting_root_hash, hashed_slot)
+            if value is not None:
+                return value
+
         read_trie = self._get_read_trie()
         try:
-            return read_trie[hashed_slot]
+            value = read_trie[hashed_slot]
         except trie_exceptions.MissingTrieNode as exc:
             raise MissingStorageTrieNode(
                 exc.missing_node_hash,
@@ -133,45 +215,159 @@ class StorageLookup(BaseDB):
                 self._address,
             ) from exc
 
+        if is_slot_cache_readable:
+            self._slot_cache.add(self._address, self._starting_root_hash, {hashed_slot: value})
+        return value
+
     def __setitem__(self, key: bytes, value: bytes) -> None:
         hashed_slot = self._decode_key(key)
-        write_trie = self._get_write_trie()
-        write_trie[hashed_slot] = value
+        self._pending_writes[hashed_slot] = value
+        self._written_slots[hashed_slot] = value
 
     def _exists(self, key: bytes) -> bool:
         # used by BaseDB for __contains__ checks
         hashed_slot = self._decode_key(key)
+        if hashed_slot in self._pending_writes:
+            return self._pending_writes[hashed_slot] != b''
+
+        value = self._get_from_snapshot(hashed_slot)
+        if value is not None:
+            return value != b''
+
         read_trie = self._get_read_trie()
         return hashed_slot in read_trie
 
     def __delitem__(self, key: bytes) -> None:
         hashed_slot = self._decode_key(key)
-        write_trie = self._get_write_trie()
-        try:
-            del write_trie[hashed_slot]
-        except trie_exceptions.MissingTrieNode as exc:
-            raise MissingStorageTrieNode(
-                exc.missing_node_hash,
-                self._starting_root_hash,
-                exc.requested_key,
-                exc.prefix,
+        self._pending_writes[hashed_slot] = b''
+        self._written_slots[hashed_slot] = b''
+
+    def get_many(self, keys: Iterable[bytes]) -> Dict[bytes, bytes]:
+        """
+        Read several slots at once, from the snapshot or with one
+        :meth:`~eth.abc.DatabaseAPI.get_many` per level of the trie. Slots whose trie nodes
+        are missing are left out, reading them one at a time raises the
+        :class:`~eth.vm.interrupt.MissingStorageTrieNode`.
+        """
+        values = {}
+        keys_by_slot_hash = {}
+        for key in keys:
+            hashed_slot = self._decode_key(key)
+            if hashed_slot in self._pending_writes:
+                values[key] = self._pending_writes[hashed_slot]
+            else:
+                keys_by_slot_hash[hashed_slot] = key
+
+        if not keys_by_slot_hash:
+            return values
+        elif self._is_snapshot_readable():
+            slot_values = self._snapshot.get_storage_values(
+                self._snapshot_state_root,
                 self._address,
-            ) from exc
+                keys_by_slot_hash.keys(),
+            )
+        else:
+            slot_values = None
+
+        if slot_values is None:
+            slot_values = self._get_many_from_trie(keys_by_slot_hash.keys())
+
+        for hashed_slot, value in slot_values.items():
+            values[keys_by_slot_hash[hashed_slot]] = value
+        return values
+
+    def _get_many_from_trie(self, slot_hashes: Iterable[Hash32]) -> Dict[Hash32, bytes]:
+        if not self._is_slot_cache_readable():
+            read_trie = self._get_read_trie()
+            return get_trie_items(read_trie.db, read_trie.root_hash, slot_hashes)
+
+        slot_values = {}
+        uncached_slot_hashes = []
+        for hashed_slot in slot_hashes:
+            value = self._slot_cache.get(self._address, self._starting_root_hash, hashed_slot)
+            if value is None:
+                uncached_slot_hashes.append(hashed_slot)
+            else:
+                slot_values[hashed_slot] = value
+
+        if uncached_slot_hashes:
+            read_values = get_trie_items(self._db, self._starting_root_hash, uncached_slot_hashes)
+            self._slot_cache.add(self._address, self._starting_root_hash, read_values)
+            slot_values.update(read_values)
+        return slot_values
+
+    @property
+    def has_pending_writes(self) -> bool:
+        return bool(self._pending_writes)
+
+    def get_pending_update(self) -> Tuple[Hash32, Dict[Hash32, bytes], Dict[Hash32, bytes]]:
+        """
+        Return the root of the trie, the writes which are not applied to it yet, and the trie
+        nodes needed to apply them, so that the new root can be computed elsewhere.
+        """
+        write_trie = self._get_write_trie()
+        nodes = get_trie_update_nodes(
+            self._trie_nodes_batch,
+            write_trie.root_hash,
+            self._pending_writes,
+        )
+        return write_trie.root_hash, self._pending_writes, nodes
+
+    def apply_trie_update(self, root_and_nodes: TrieRootAndData) -> None:
+        """
+        Set the trie to the root and new nodes which result from applying the pending
+        writes, as computed by :func:`~eth.db.trie.update_trie_items`.
+        """
+        root_hash, new_nodes = root_and_nodes
+        write_trie = self._get_write_trie()
+        for node_hash, encoded_node in new_nodes.items():
+            self._trie_nodes_batch[node_hash] = encoded_node
+        write_trie.root_hash = root_hash
+        self._pending_writes = {}
+
+    def _update_trie(self) -> None:
+        if self._pending_writes:
+            write_trie = self._get_write_trie()
+            try:
+                root_and_nodes = update_trie_items(
+                    self._trie_nodes_batch,
+                    write_trie.root_hash,
+                    self._pending_writes,
+                )
+            except trie_exceptions.MissingTrieNode as exc:
+                raise MissingStorageTrieNode(
+                    exc.missing_node_hash,
+                    self._starting_root_hash,
+                    exc.requested_key,
+                    exc.prefix,
+                    self._address,
+                ) from exc
+            self.apply_trie_update(root_and_nodes)
 
     @property
     def has_changed_root(self) -> bool:
-        return self._write_trie is not None
+        return self._write_trie is not None or bool(self._pending_writes)
 
     def get_changed_root(self) -> Hash32:
-        if self._write_trie is not None:
+        if self.has_changed_root:
+            self._update_trie()
             return self._write_trie.root_hash
         else:
             raise ValidationError("Asked for changed root when no writes have been made")
 
+    def get_storage_changes(self) -> StorageChanges:
+        if self._historical_write_tries:
+            wiped_root = self._historical_write_tries[0].starting_root_hash
+        else:
+            wiped_root = None
+        return StorageChanges(wiped_root, dict(self._written_slots))
+
     def _initialize_to_root_hash(self, root_hash: Hash32) -> None:
         self._starting_root_hash = root_hash
         self._write_trie = None
         self._trie_nodes_batch = None
+        self._written_slots = {}
+        self._pending_writes = {}
 
         # Reset the historical writes, which can't be reverted after committing
         self._historical_write_tries = []
@@ -182,6 +378,7 @@ class StorageLookup(BaseDB):
         ValidationError
         """
         self.logger.debug2('persist storage root to data store')
+        self._update_trie()
         if self._trie_nodes_batch is None:
             raise ValidationError(
                 "It is invalid to commit an account's storage if it has no pending changes. "
@@ -189,12 +386,29 @@ class StorageLookup(BaseDB):
                 f"Write tries on stack = {len(self._historical_write_tries)}; Root hash = "
                 f"{encode_hex(self._starting_root_hash)}"
             )
-        self._trie_nodes_batch.commit_to(db, apply_deletes=False)
+        # Each update of the trie replaced some of the nodes of the previous one
+        new_nodes = get_reachable_trie_nodes(
+            self._write_trie.root_hash,
+            dict(self._trie_nodes_batch.diff().pending_items()),
+        )
+        for node_hash, encoded_node in new_nodes.items():
+            db[node_hash] = encoded_node
+
+        if self._slot_cache is not None:
+            self._slot_cache.move(
+                self._address,
+                self._starting_root_hash,
+                self._write_trie.root_hash,
+                self._written_slots,
+            )
 
         # Mark the trie as having been all written out to the database.
         # It removes the 'dirty' flag and clears out any pending writes.
         self._initialize_to_root_hash(self._write_trie.root_hash)
 
+        # The snapshot is not at the state with the new storage root
+        self._snapshot = None
+
     def new_trie(self) -> int:
         """
         Switch to an empty trie. Save the old trie, and pending writes, in
@@ -202,6 +416,7 @@ class StorageLookup(BaseDB):
 
         :return: index for reviving the previous trie
         """
+        self._update_trie()
         write_trie = self._get_write_trie()
 
         # Write the previous trie into a historical stack
@@ -209,12 +424,14 @@ class StorageLookup(BaseDB):
             write_trie,
             self._trie_nodes_batch,
             self._starting_root_hash,
+            self._written_slots,
         ))
 
         new_idx = len(self._historical_write_tries)
         self._starting_root_hash = BLANK_ROOT_HASH
         self._write_trie = None
         self._trie_nodes_batch = None
+        self._written_slots = {}
 
         return new_idx
 
@@ -237,7 +454,9 @@ class StorageLookup(BaseDB):
             self._write_trie,
             self._trie_nodes_batch,
             self._starting_root_hash,
+            self._written_slots,
         ) = self._historical_write_tries[trie_index]
+        self._pending_writes = {}
 
         # Cannot roll forward after a rollback, so remove created/ignored tries.
         # This also deletes the trie that you just reverted to. It will be re-added
@@ -251,7 +470,14 @@ CLEAR_COUNT_KEY_NAME = b'clear-count'
 class AccountStorageDB(AccountStorageDatabaseAPI):
     logger = get_extended_debug_logger("eth.db.storage.AccountStorageDB")
 
-    def __init__(self, db: AtomicDatabaseAPI, storage_root: Hash32, address: Address) -> None:
+    def __init__(self,
+                 db: AtomicDatabaseAPI,
+                 storage_root: Hash32,
+                 address: Address,
+                 snapshot: StateSnapshot = None,
+                 state_root: Hash32 = None,
+                 base: DatabaseAPI = None,
+                 slot_cache: StorageSlotCache = None) -> None:
         """
         Database entries go through several pipes, like so...
 
@@ -263,10 +489,10 @@ class AccountStorageDB(AccountStorageDatabaseAPI):
         Keys are stored as node hashes and rlp-encoded node values.
 
         _storage_lookup is itself a pair of databases: (BatchDB -> HexaryTrie),
-        writes to storage lookup *are* immeditaely applied to a trie, generating
-        the appropriate trie nodes and and root hash (via the HexaryTrie). The
-        writes are *not* persisted to db, until _storage_lookup is explicitly instructed to,
-        via :meth:`StorageLookup.commit_to`
+        writes to storage lookup are held until the storage root is requested, and then
+        applied to the trie in one pass, generating the appropriate trie nodes and root
+        hash. The writes are *not* persisted to db, until _storage_lookup is explicitly
+        instructed to, via :meth:`StorageLookup.commit_to`
 
         _storage_cache is a cache tied to the state root of the trie. It
         is important that this cache is checked *after* looking for
@@ -283,10 +509,33 @@ class AccountStorageDB(AccountStorageDatabaseAPI):
 
         In both _storage_cache and _journal_storage, Keys are set/retrieved as the
         big_endian encoding of the slot integer, and the rlp-encoded value.
+
+        With a ``snapshot``, _storage_lookup reads the slots from the snapshot instead of
+        the trie, when the snapshot is at ``state_root``.
+
+        With a ``base``, the slots are read from ``base`` instead of _storage_lookup, with the
+        same keys and values as _storage_cache. This is how a :meth:`fork` reads through to
+        the storage it was forked from.
+
+        With a ``slot_cache``, _storage_lookup caches the slots it reads from the trie across
+        instances, see :class:`~eth.db.cache.StorageSlotCache`. Unlike _storage_cache, it is
+        not reset when the storage root changes.
         """
+        self._db = db
+        self._storage_root = storage_root
         self._address = address
-        self._storage_lookup = StorageLookup(db, storage_root, address)
-        self._storage_cache = CacheDB(self._storage_lookup)
+        self._storage_lookup = StorageLookup(
+            db,
+            storage_root,
+            address,
+            snapshot,
+            state_root,
+            slot_cache,
+        )
+        if base is None:
+            self._storage_cache = CacheDB(self._storage_lookup)
+        else:
+            self._storage_cache = CacheDB(base)
         self._locked_changes = JournalDB(self._storage_cache)
         self._journal_storage = JournalDB(self._locked_changes)
         self._accessed_slots: Set[int] = set()
@@ -422,6 +671,17 @@ class AccountStorageDB(AccountStorageDatabaseAPI):
     def get_accessed_slots(self) -> FrozenSet[int]:
         return frozenset(self._accessed_slots)
 
+    def prefetch(self, slots: Iterable[int]) -> None:
+        self._storage_cache.get_many(int_to_big_endian(slot) for slot in slots)
+
+    def fork(self) -> 'AccountStorageDB':
+        return AccountStorageDB(
+            self._db,
+            self._storage_root,
+            self._address,
+            base=ReadOnlyDB(self._journal_storage),
+        )
+
     @property
     def has_changed_root(self) -> bool:
         return self._storage_lookup.has_changed_root
@@ -429,7 +689,51 @@ class AccountStorageDB(AccountStorageDatabaseAPI):
     def get_changed_root(self) -> Hash32:
         return self._storage_lookup.get_changed_root()
 
+    def get_storage_changes(self) -> StorageChanges:
+        return self._storage_lookup.get_storage_changes()
+
     def persist(self, db: DatabaseAPI) -> None:
         self._validate_flushed()
         if self._storage_lookup.has_changed_root:
             self._storage_lookup.commit_to(db)
+
+
+def _update_trie_in_worker(nodes: Dict[Hash32, bytes],
+                           root_hash: Hash32,
+                           items: Dict[Hash32, bytes]) -> TrieRootAndData:
+    return update_trie_items(MemoryDB(cast(Dict[bytes, bytes], nodes)), root_hash, items)
+
+
+def make_storage_roots(stores: Sequence[AccountStorageDB], executor: Executor = None) -> None:
+    """
+    Call :meth:`AccountStorageDB.make_storage_root` on all the ``stores``, computing the
+    new storage roots in ``executor`` (e.g. a ``ProcessPoolExecutor``) if there is one.
+
+    The tries are independent, so each one is updated in its own task, against a copy of
+    the trie nodes it needs.
+    """
+    for store in stores:
+        store.make_storage_root()
+
+    lookups = [
+        store._storage_lookup
+        for store in stores
+        if store._storage_lookup.has_pending_writes
+    ]
+    if executor is None or not lookups:
+        return
+
+    futures = [
+        executor.submit(_update_trie_in_worker, nodes, root_hash, dict(pending_writes))
+        for root_hash, pending_writes, nodes in (
+            lookup.get_pending_update() for lookup in lookups
+        )
+    ]
+    for lookup, future in zip(lookups, futures):
+        try:
+            root_and_nodes = future.result()
+        except trie_exceptions.MissingTrieNode:
+            # Leave the update to get_changed_root(), which raises the missing node
+            # with the details of the account
+            continue
+        lookup.apply_trie_update(root_and_nodes)
@@ -1,14 +1,39 @@
+import collections
 import functools
-from typing import Dict, Sequence, Tuple, Union
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, TypeVar, Union, cast
 
+from eth_hash.auto import keccak
 import rlp
 from trie import (
     HexaryTrie,
 )
+from trie.constants import (
+    BLANK_NODE,
+    NODE_TYPE_BLANK,
+    NODE_TYPE_BRANCH,
+    NODE_TYPE_EXTENSION,
+    NODE_TYPE_LEAF,
+)
+from trie.exceptions import (
+    MissingTrieNode,
+)
+from trie.utils.nibbles import (
+    bytes_to_nibbles,
+    decode_nibbles,
+    nibbles_to_bytes,
+)
+from trie.utils.nodes import (
+    compute_extension_key,
+    compute_leaf_key,
+    extract_key,
+    get_common_prefix_length,
+    get_node_type,
+)
 
 from eth_typing import Hash32
 
 from eth.abc import (
+    DatabaseAPI,
     ReceiptAPI,
     SignedTransactionAPI,
 )
@@ -19,11 +44,29 @@ from eth.constants import (
 TransactionsOrReceipts = Union[Sequence[ReceiptAPI], Sequence[SignedTransactionAPI]]
 TrieRootAndData = Tuple[Hash32, Dict[Hash32, bytes]]
 
+# The keys of a trie, e.g. the hashes of the slots of a storage trie
+TTrieKey = TypeVar('TTrieKey', bound=bytes)
+
+# A decoded trie node, and the reference to a node from its parent: the hash of the node, or
+# the node itself if its encoding is shorter than 32 bytes
+RawNode = Any
+NodeRef = Union[bytes, List[Any]]
+Nibbles = Tuple[int, ...]
+# Changes to the items under a node, by path from the node, sorted by path
+PathUpdates = List[Tuple[Nibbles, bytes]]
+
 
 def make_trie_root_and_nodes(items: TransactionsOrReceipts) -> TrieRootAndData:
     return _make_trie_root_and_nodes(tuple(item.encode() for item in items))
 
 
+def make_encoded_trie_root_and_nodes(encoded_items: Sequence[bytes]) -> TrieRootAndData:
+    """
+    Like :func:`make_trie_root_and_nodes`, for already encoded transactions or receipts.
+    """
+    return _make_trie_root_and_nodes(tuple(encoded_items))
+
+
 # This cache is expected to be useful when importing blocks as we call this once when importing
 # and again when validating the imported block. But it should also help for post-Byzantium blocks
 # as it's common for them to have duplicate receipt_roots. Given that, it probably makes sense to
@@ -37,3 +80,389 @@ def _make_trie_root_and_nodes(items: Tuple[bytes, ...]) -> TrieRootAndData:
             index_key = rlp.encode(index, sedes=rlp.sedes.big_endian_int)
             memory_trie[index_key] = item
     return trie.root_hash, kv_store
+
+
+def append_trie_item(db: DatabaseAPI,
+                     root_hash: Hash32,
+                     index: int,
+                     item: bytes) -> TrieRootAndData:
+    """
+    Set ``item`` at ``index`` in the trie of transactions or receipts at ``root_hash``, whose
+    nodes are read from ``db``. Return the new root and the new nodes, without writing them.
+
+    This only touches the nodes on the path to ``index``, so appending the items of a block
+    one at a time costs the same for every item, instead of growing with the size of the
+    block as rebuilding it with :func:`make_trie_root_and_nodes` would.
+    """
+    kv_store: Dict[Hash32, bytes] = {}
+    trie = HexaryTrie(collections.ChainMap(cast(Dict[bytes, bytes], kv_store), db), root_hash)
+    index_key = rlp.encode(index, sedes=rlp.sedes.big_endian_int)
+    trie[index_key] = item
+    return trie.root_hash, kv_store
+
+
+def update_trie_items(db: DatabaseAPI,
+                      root_hash: Hash32,
+                      items: Mapping[TTrieKey, bytes]) -> TrieRootAndData:
+    """
+    Set all the ``items`` (deleting the keys set to ``b''``) in the trie at ``root_hash``,
+    whose nodes are read from ``db``. Return the new root and the new nodes, without writing
+    them.
+
+    Unlike setting the items one at a time on a :class:`~trie.HexaryTrie`, which encodes and
+    hashes every node on the path of every item, the items are sorted and the updated nodes
+    are built bottom-up in one pass, so each new node is hashed once.
+    """
+    new_nodes: Dict[Hash32, bytes] = {}
+    updates = sorted((tuple(bytes_to_nibbles(key)), value) for key, value in items.items())
+    updater = _TrieUpdater(db, root_hash, new_nodes)
+
+    root_node = updater.update(updater.resolve(root_hash, ()), (), updates)
+    if root_node == BLANK_NODE:
+        return BLANK_ROOT_HASH, new_nodes
+
+    # The root node is always stored by hash, even if it's small
+    encoded_root = rlp.encode(root_node)
+    new_root_hash = cast(Hash32, keccak(encoded_root))
+    new_nodes[new_root_hash] = encoded_root
+    return new_root_hash, new_nodes
+
+
+def get_reachable_trie_nodes(root_hash: Hash32,
+                             nodes: Mapping[bytes, bytes]) -> Dict[Hash32, bytes]:
+    """
+    Return the ``nodes`` which are part of the trie at ``root_hash``, leaving out the ones
+    which were replaced by later updates of the trie, e.g. the new nodes of several calls to
+    :func:`update_trie_items` before they are written.
+
+    Only the ``nodes`` are walked: the nodes which are not in ``nodes`` were written before
+    them, and can't refer to them.
+    """
+    reachable_nodes: Dict[Hash32, bytes] = {}
+    node_refs: List[NodeRef] = [root_hash]
+    while node_refs:
+        node_ref = node_refs.pop()
+        if isinstance(node_ref, list):
+            node = node_ref
+        elif node_ref in nodes and node_ref not in reachable_nodes:
+            node_hash = cast(Hash32, node_ref)
+            reachable_nodes[node_hash] = nodes[node_hash]
+            node = rlp.decode(nodes[node_hash])
+        else:
+            continue
+
+        node_type = get_node_type(node)
+        if node_type == NODE_TYPE_BRANCH:
+            node_refs.extend(node[:16])
+        elif node_type == NODE_TYPE_EXTENSION:
+            node_refs.append(node[1])
+
+    return reachable_nodes
+
+
+class _TrieUpdater:
+    def __init__(self, db: DatabaseAPI, root_hash: Hash32, new_nodes: Dict[Hash32, bytes]) -> None:
+        self.db = db
+        self.root_hash = root_hash
+        self.new_nodes = new_nodes
+
+    def resolve(self, node_ref: NodeRef, prefix: Nibbles) -> RawNode:
+        if node_ref == BLANK_NODE or node_ref == BLANK_ROOT_HASH:
+            return BLANK_NODE
+        elif isinstance(node_ref, list):
+            return node_ref
+
+        node_hash = cast(Hash32, node_ref)
+        try:
+            if node_hash in self.new_nodes:
+                encoded_node = self.new_nodes[node_hash]
+            else:
+                encoded_node = self.db[node_hash]
+        except KeyError:
+            raise MissingTrieNode(
+                node_ref,
+                self.root_hash,
+                nibbles_to_bytes(prefix + (0, ) * (len(prefix) % 2)),
+                prefix,
+            )
+        return rlp.decode(encoded_node)
+
+    def make_ref(self, node: RawNode) -> NodeRef:
+        if node == BLANK_NODE:
+            return BLANK_NODE
+
+        encoded_node = rlp.encode(node)
+        if len(encoded_node) < 32:
+            return node
+
+        node_hash = cast(Hash32, keccak(encoded_node))
+        self.new_nodes[node_hash] = encoded_node
+        return node_hash
+
+    def update(self, node: RawNode, prefix: Nibbles, updates: PathUpdates) -> RawNode:
+        if not updates:
+            return node
+
+        node_type = get_node_type(node)
+        if node_type == NODE_TYPE_BLANK:
+            return self.build(prefix, [(path, value) for path, value in updates if value])
+
+        elif node_type == NODE_TYPE_LEAF:
+            leaf_path = tuple(extract_key(node))
+            merged = dict(updates)
+            merged.setdefault(leaf_path, node[1])
+            return self.build(prefix, sorted(
+                (path, value) for path, value in merged.items() if value
+            ))
+
+        elif node_type == NODE_TYPE_EXTENSION:
+            extension_path = tuple(decode_nibbles(node[0]))
+            path_length = len(extension_path)
+            if all(path[:path_length] == extension_path for path, _ in updates):
+                child_prefix = prefix + extension_path
+                child = self.update(
+                    self.resolve(node[1], child_prefix),
+                    child_prefix,
+                    [(path[path_length:], value) for path, value in updates],
+                )
+                return self.make_extension(extension_path, child)
+
+            # Some items leave the path of the extension: update it as the equivalent branch
+            branch = [BLANK_NODE] * 17
+            if path_length == 1:
+                branch[extension_path[0]] = node[1]
+            else:
+                branch[extension_path[0]] = self.make_ref(
+                    [compute_extension_key(extension_path[1:]), node[1]],
+                )
+            return self.update_branch(branch, prefix, updates)
+
+        elif node_type == NODE_TYPE_BRANCH:
+            return self.update_branch(list(node), prefix, updates)
+
+        else:
+            raise Exception(f"Invariant: unknown node type {node_type}")
+
+    def update_branch(self, branch: RawNode, prefix: Nibbles, updates: PathUpdates) -> RawNode:
+        index = 0
+        if not updates[0][0]:
+            # an empty path is the value of the branch itself
+            branch[16] = updates[0][1]
+            index = 1
+
+        while index < len(updates):
+            nibble = updates[index][0][0]
+            end = index
+            while end < len(updates) and updates[end][0][0] == nibble:
+                end += 1
+
+            child_prefix = prefix + (nibble, )
+            child = self.update(
+                self.resolve(branch[nibble], child_prefix),
+                child_prefix,
+                [(path[1:], value) for path, value in updates[index:end]],
+            )
+            branch[nibble] = self.make_ref(child)
+            index = end
+
+        return self.normalize_branch(branch, prefix)
+
+    def normalize_branch(self, branch: RawNode, prefix: Nibbles) -> RawNode:
+        children = [nibble for nibble in range(16) if branch[nibble] != BLANK_NODE]
+        if len(children) > 1 or (children and branch[16]):
+            return branch
+        elif branch[16]:
+            return [compute_leaf_key(()), branch[16]]
+        elif not children:
+            return BLANK_NODE
+
+        # A single child is left, which is merged into the branch
+        nibble = children[0]
+        child = self.resolve(branch[nibble], prefix + (nibble, ))
+        if get_node_type(child) == NODE_TYPE_BRANCH:
+            return [compute_extension_key((nibble, )), branch[nibble]]
+        else:
+            return self.make_extension((nibble, ), child)
+
+    def make_extension(self, extension_path: Nibbles, child: RawNode) -> RawNode:
+        child_type = get_node_type(child)
+        if child_type == NODE_TYPE_BLANK:
+            return BLANK_NODE
+        elif child_type == NODE_TYPE_LEAF:
+            return [compute_leaf_key(extension_path + tuple(extract_key(child))), child[1]]
+        elif child_type == NODE_TYPE_EXTENSION:
+            child_path = tuple(decode_nibbles(child[0]))
+            return [compute_extension_key(extension_path + child_path), child[1]]
+        elif not extension_path:
+            return child
+        else:
+            return [compute_extension_key(extension_path), self.make_ref(child)]
+
+    def build(self, prefix: Nibbles, items: PathUpdates) -> RawNode:
+        """
+        Build the subtree holding ``items``, which must not contain deletions.
+        """
+        if not items:
+            return BLANK_NODE
+        elif len(items) == 1:
+            path, value = items[0]
+            return [compute_leaf_key(path), value]
+
+        # the items are sorted, so the first and last ones have the shortest common prefix
+        common_length = get_common_prefix_length(items[0][0], items[-1][0])
+        if common_length:
+            common_path = items[0][0][:common_length]
+            branch = self.build(
+                prefix + common_path,
+                [(path[common_length:], value) for path, value in items],
+            )
+            return [compute_extension_key(common_path), self.make_ref(branch)]
+
+        branch = [BLANK_NODE] * 17
+        index = 0
+        if not items[0][0]:
+            branch[16] = items[0][1]
+            index = 1
+
+        while index < len(items):
+            nibble = items[index][0][0]
+            end = index
+            while end < len(items) and items[end][0][0] == nibble:
+                end += 1
+
+            child = self.build(
+                prefix + (nibble, ),
+                [(path[1:], value) for path, value in items[index:end]],
+            )
+            branch[nibble] = self.make_ref(child)
+            index = end
+
+        return branch
+
+
+def get_trie_update_nodes(db: DatabaseAPI,
+                          root_hash: Hash32,
+                          items: Mapping[TTrieKey, bytes]) -> Dict[Hash32, bytes]:
+    """
+    Return the nodes of the trie at ``root_hash`` which :func:`update_trie_items` reads to
+    set ``items``, so that the update can run against a copy of just those nodes.
+
+    Nodes missing from ``db`` are left out, the update will raise the
+    :class:`~trie.exceptions.MissingTrieNode`.
+    """
+    nodes: Dict[Hash32, bytes] = {}
+
+    def load(node_ref: NodeRef) -> RawNode:
+        if node_ref == BLANK_NODE or node_ref == BLANK_ROOT_HASH:
+            return BLANK_NODE
+        elif isinstance(node_ref, list):
+            return node_ref
+
+        node_hash = cast(Hash32, node_ref)
+        if node_hash not in nodes:
+            encoded_node = db.get(node_hash)
+            if encoded_node is None:
+                return BLANK_NODE
+            nodes[node_hash] = encoded_node
+        return rlp.decode(nodes[node_hash])
+
+    def visit(node_ref: NodeRef, updates: PathUpdates) -> None:
+        node = load(node_ref)
+        node_type = get_node_type(node)
+        has_deletes = any(not value for _, value in updates)
+
+        if node_type == NODE_TYPE_EXTENSION:
+            extension_path = tuple(decode_nibbles(node[0]))
+            path_length = len(extension_path)
+            child_updates = [
+                (path[path_length:], value)
+                for path, value in updates
+                if path[:path_length] == extension_path
+            ]
+            if child_updates:
+                visit(node[1], child_updates)
+            elif has_deletes:
+                # the child may be merged into the branch that replaces the extension
+                load(node[1])
+
+        elif node_type == NODE_TYPE_BRANCH:
+            updates_by_nibble: Dict[int, PathUpdates] = collections.defaultdict(list)
+            for path, value in updates:
+                if path:
+                    updates_by_nibble[path[0]].append((path[1:], value))
+
+            for nibble in range(16):
+                if nibble in updates_by_nibble:
+                    visit(node[nibble], updates_by_nibble[nibble])
+                elif has_deletes:
+                    # after deletes, a single remaining child is merged into its parent
+                    load(node[nibble])
+
+    visit(root_hash, [(tuple(bytes_to_nibbles(key)), value) for key, value in items.items()])
+    return nodes
+
+
+def get_trie_items(db: DatabaseAPI,
+                   root_hash: Hash32,
+                   keys: Iterable[TTrieKey]) -> Dict[TTrieKey, bytes]:
+    """
+    Return the values of ``keys`` in the trie at ``root_hash`` (b'' for the keys which are
+    not in the trie), like reading the keys one after the other from a
+    :class:`~trie.HexaryTrie`, but walking down all the paths together, so that the nodes of
+    each level of the trie are read with a single :meth:`~eth.abc.DatabaseAPI.get_many`.
+
+    Keys whose path goes through a node missing from ``db`` are left out.
+    """
+    values: Dict[TTrieKey, bytes] = {}
+    decoded_nodes: Dict[bytes, RawNode] = {}
+    # the node reference to resolve next for each key, with the remaining path of the key
+    lookups: List[Tuple[NodeRef, Nibbles, TTrieKey]] = [
+        (root_hash, tuple(bytes_to_nibbles(key)), key) for key in keys
+    ]
+
+    while lookups:
+        missing_hashes = {
+            node_ref
+            for node_ref, _, _ in lookups
+            if not isinstance(node_ref, list)
+            and node_ref not in decoded_nodes
+            and node_ref != BLANK_NODE
+            and node_ref != BLANK_ROOT_HASH
+        }
+        if missing_hashes:
+            for node_hash, encoded_node in db.get_many(missing_hashes).items():
+                decoded_nodes[node_hash] = rlp.decode(encoded_node)
+
+        next_lookups = []
+        for node_ref, path, key in lookups:
+            if node_ref == BLANK_NODE or node_ref == BLANK_ROOT_HASH:
+                values[key] = b''
+                continue
+            elif isinstance(node_ref, list):
+                node = node_ref
+            elif node_ref in decoded_nodes:
+                node = decoded_nodes[node_ref]
+            else:
+                # the node is missing from the database
+                continue
+
+            node_type = get_node_type(node)
+            if node_type == NODE_TYPE_LEAF:
+                values[key] = node[1] if tuple(extract_key(node)) == path else b''
+            elif node_type == NODE_TYPE_EXTENSION:
+                extension_path = tuple(extract_key(node))
+                path_length = len(extension_path)
+                if path[:path_length] == extension_path:
+                    next_lookups.append((node[1], path[path_length:], key))
+                else:
+                    values[key] = b''
+            elif node_type == NODE_TYPE_BRANCH:
+                if path:
+                    next_lookups.append((node[path[0]], path[1:], key))
+                else:
+                    values[key] = node[16]
+            else:
+                values[key] = b''
+        lookups = next_lookups
+
+    return values
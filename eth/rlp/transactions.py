@@ -72,14 +72,19 @@ BASE_TRANSACTION_FIELDS = [
 class BaseTransactionFields(rlp.Serializable, TransactionFieldsAPI):
     fields = BASE_TRANSACTION_FIELDS
 
-    @property
+    @cached_property
     def hash(self) -> Hash32:
+        # The encoding is cached by rlp, from decoding the transaction or the first encode()
         return cast(Hash32, keccak(rlp.encode(self)))
 
 
 class SignedTransactionMethods(BaseTransactionMethods, SignedTransactionAPI):
     type_id: Optional[int] = None
 
+    # Set by recover_transaction_senders once it checked the signature like
+    # check_signature_validity does
+    _is_signature_verified = False
+
     @cached_property
     def sender(self) -> Address:
         return self.get_sender()
@@ -90,7 +95,8 @@ class SignedTransactionMethods(BaseTransactionMethods, SignedTransactionAPI):
     def validate(self) -> None:
         if self.gas < self.intrinsic_gas:
             raise ValidationError("Insufficient gas")
-        self.check_signature_validity()
+        if not self._is_signature_verified:
+            self.check_signature_validity()
 
     #
     # Signature and Sender
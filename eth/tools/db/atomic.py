@@ -156,3 +156,29 @@ class AtomicDatabaseBatchAPITestSuite:
 
         with pytest.raises(KeyError):
             atomic_db[b'key-2']
+
+    def test_write_only_batch_set_and_delete(self, atomic_db: AtomicDatabaseAPI) -> None:
+        atomic_db[b'key-1'] = b'origin'
+
+        with atomic_db.write_only_batch() as batch:
+            batch.set(b'key-2', b'value-2')
+            batch.delete(b'key-1')
+            batch.delete(b'missing-key')
+
+        assert atomic_db[b'key-2'] == b'value-2'
+        assert b'key-1' not in atomic_db
+
+    def test_write_only_batch_with_exception(self, atomic_db: AtomicDatabaseAPI) -> None:
+        class CustomException(Exception):
+            pass
+
+        atomic_db[b'key-1'] = b'origin'
+
+        with pytest.raises(CustomException):
+            with atomic_db.write_only_batch() as batch:
+                batch.set(b'key-1', b'new-value-1')
+                batch.set(b'key-2', b'value-2')
+                raise CustomException('pretend something went wrong')
+
+        assert atomic_db[b'key-1'] == b'origin'
+        assert b'key-2' not in atomic_db
@@ -21,6 +21,14 @@ class DatabaseAPITestSuite:
         with pytest.raises(KeyError):
             db[b'key-1']
 
+    def test_database_api_get_many(self, db: DatabaseAPI) -> None:
+        db[b'key-1'] = b'value-1'
+        db[b'key-2'] = b'value-2'
+        assert db.get_many([b'key-1', b'key-2', b'key-3']) == {
+            b'key-1': b'value-1',
+            b'key-2': b'value-2',
+        }
+
     def test_database_api_set(self, db: DatabaseAPI) -> None:
         db[b'key-1'] = b'value-1'
         assert db[b'key-1'] == b'value-1'
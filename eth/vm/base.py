@@ -1,3 +1,6 @@
+from concurrent.futures import (
+    Executor,
+)
 import contextlib
 import itertools
 import logging
@@ -52,7 +55,10 @@ from eth.constants import (
     MAX_PREV_HEADER_DEPTH,
     MAX_UNCLES,
 )
-from eth.db.trie import make_trie_root_and_nodes
+from eth.db.trie import (
+    append_trie_item,
+    make_trie_root_and_nodes,
+)
 from eth.exceptions import (
     HeaderNotFound,
 )
@@ -69,6 +75,10 @@ from eth._utils.db import (
     get_parent_header,
     get_block_header_by_hash,
 )
+from eth._utils.transactions import (
+    get_transactions_accesses,
+    recover_transaction_senders,
+)
 from eth.validation import (
     validate_length_lte,
     validate_gas_limit,
@@ -95,6 +105,18 @@ class VM(Configurable, VirtualMachineAPI):
     _state = None
     _block = None
 
+    # Set to an Executor, e.g. a ``ProcessPoolExecutor``, to recover the senders of the
+    # transactions of an imported block in parallel before running them, when the block
+    # has at least ``min_parallel_sender_recoveries`` transactions. Otherwise, each sender
+    # is recovered when its transaction is applied.
+    sender_recovery_executor: Executor = None
+    min_parallel_sender_recoveries: int = 16
+
+    # Set to read the accounts and storage slots which the transactions are known to use
+    # (senders, recipients and access lists) in a few batches before running them, rather
+    # than one by one as they are first used. This recovers the senders up front.
+    prefetch_transaction_accesses: bool = False
+
     cls_logger = logging.getLogger('eth.vm.base.VM')
 
     def __init__(self,
@@ -247,6 +269,9 @@ class VM(Configurable, VirtualMachineAPI):
                 f"but the target header has block #{base_header.block_number}"
             )
 
+        if self.prefetch_transaction_accesses:
+            self.state.prefetch(get_transactions_accesses(transactions))
+
         receipts = []
         computations = []
         previous_header = base_header
@@ -315,6 +340,10 @@ class VM(Configurable, VirtualMachineAPI):
         # we need to re-initialize the `state` to update the execution context.
         self._state = self.get_state_class()(self.chaindb.db, execution_context, header.state_root)
 
+        if (self.sender_recovery_executor is not None
+                and len(block.transactions) >= self.min_parallel_sender_recoveries):
+            recover_transaction_senders(block.transactions, self.sender_recovery_executor)
+
         # run all of the transactions.
         new_header, receipts, _ = self.apply_all_transactions(block.transactions, header)
 
@@ -357,6 +386,39 @@ class VM(Configurable, VirtualMachineAPI):
             ),
         )
 
+    def append_block_transaction(self,
+                                 base_block: BlockAPI,
+                                 new_header: BlockHeaderAPI,
+                                 transaction: SignedTransactionAPI,
+                                 receipt: ReceiptAPI) -> BlockAPI:
+
+        index = len(base_block.transactions)
+        base_header = base_block.header
+
+        tx_root_hash, tx_kv_nodes = append_trie_item(
+            self.chaindb.db,
+            base_header.transaction_root,
+            index,
+            transaction.encode(),
+        )
+        self.chaindb.persist_trie_data_dict(tx_kv_nodes)
+
+        receipt_root_hash, receipt_kv_nodes = append_trie_item(
+            self.chaindb.db,
+            base_header.receipt_root,
+            index,
+            receipt.encode(),
+        )
+        self.chaindb.persist_trie_data_dict(receipt_kv_nodes)
+
+        return base_block.copy(
+            transactions=base_block.transactions + (transaction, ),
+            header=new_header.copy(
+                transaction_root=tx_root_hash,
+                receipt_root=receipt_root_hash,
+            ),
+        )
+
     #
     # Finalization
     #
@@ -0,0 +1,278 @@
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from eth_utils import (
+    big_endian_to_int,
+)
+from lru import LRU
+
+from eth.vm import opcode_values
+from eth.vm.opcode_values import (
+    DUP1,
+    DUP16,
+    EQ,
+    JUMP,
+    JUMPDEST,
+    JUMPI,
+    MSTORE,
+    POP,
+    PUSH1,
+    PUSH32,
+    SWAP1,
+    SWAP16,
+)
+
+
+# Bytecode is immutable per code hash, so the analysis of a contract can be shared by every
+# message that runs it, for as long as the process lives. The bound keeps memory in check
+# when many distinct contracts are executed, while the hot ones stay resident.
+CODE_ANALYSIS_CACHE_SIZE = 256
+
+# Opcodes whose whole gas cost is the static cost of the opcode, and whose logic neither
+# consumes more gas nor reads the gas meter. Only runs of these opcodes can be charged
+# up-front by gas block, anything else is metered when it runs.
+STATIC_GAS_OPCODES = frozenset((
+    opcode_values.ADD,
+    opcode_values.MUL,
+    opcode_values.SUB,
+    opcode_values.DIV,
+    opcode_values.SDIV,
+    opcode_values.MOD,
+    opcode_values.SMOD,
+    opcode_values.ADDMOD,
+    opcode_values.MULMOD,
+    opcode_values.SIGNEXTEND,
+    opcode_values.LT,
+    opcode_values.GT,
+    opcode_values.SLT,
+    opcode_values.SGT,
+    opcode_values.EQ,
+    opcode_values.ISZERO,
+    opcode_values.AND,
+    opcode_values.OR,
+    opcode_values.XOR,
+    opcode_values.NOT,
+    opcode_values.BYTE,
+    opcode_values.SHL,
+    opcode_values.SHR,
+    opcode_values.SAR,
+    opcode_values.ADDRESS,
+    opcode_values.ORIGIN,
+    opcode_values.CALLER,
+    opcode_values.CALLVALUE,
+    opcode_values.CALLDATALOAD,
+    opcode_values.CALLDATASIZE,
+    opcode_values.CODESIZE,
+    opcode_values.GASPRICE,
+    opcode_values.RETURNDATASIZE,
+    opcode_values.BLOCKHASH,
+    opcode_values.COINBASE,
+    opcode_values.TIMESTAMP,
+    opcode_values.NUMBER,
+    opcode_values.DIFFICULTY,
+    opcode_values.GASLIMIT,
+    opcode_values.CHAINID,
+    opcode_values.SELFBALANCE,
+    opcode_values.BASEFEE,
+    opcode_values.POP,
+    opcode_values.JUMP,
+    opcode_values.JUMPI,
+    opcode_values.PC,
+    opcode_values.MSIZE,
+    opcode_values.JUMPDEST,
+)) | frozenset(range(PUSH1, PUSH32 + 1)) \
+    | frozenset(range(DUP1, DUP16 + 1)) \
+    | frozenset(range(SWAP1, SWAP16 + 1))
+
+# Marks an opcode without a static-only gas cost in a table of static gas costs
+NOT_STATIC_GAS = 0xff
+
+
+class CodeAnalysis:
+    """
+    The result of a single linear pass over some EVM bytecode.
+
+    ``valid_opcodes`` is a bitmap with one byte per position of the code: ``1`` if an
+    instruction starts at that position, ``0`` if the position is PUSH data. This is the
+    bitmap that answers whether a JUMP/JUMPI destination is valid.
+
+    ``push_values`` is indexed by the position where the data of a PUSH instruction starts,
+    and holds that data already decoded as an int (right-padded with zero bytes if the code
+    ends early). Every other position holds ``None``.
+
+    ``superinstructions`` maps the position of the first instruction of every fusable
+    sequence (see :mod:`eth.vm.superinstructions`) to the operands of that sequence, with
+    the position of the instruction following the sequence last.
+
+    ``gas_blocks`` maps the start of every gas block to the opcodes at the head of the
+    block that are in :data:`STATIC_GAS_OPCODES`. Gas blocks are the basic blocks of the
+    code (split at every JUMPDEST and after every JUMP/JUMPI), further split after every
+    opcode whose gas cost is not entirely static.
+
+    Instances are shared between code streams, so they must never be mutated, apart from
+    the memoized results of :meth:`get_gas_block_costs`.
+    """
+    __slots__ = [
+        'valid_opcodes',
+        'push_values',
+        'superinstructions',
+        'gas_blocks',
+        '_gas_block_costs',
+    ]
+
+    def __init__(self, code: bytes) -> None:
+        code_length = len(code)
+        valid_opcodes = bytearray(code_length)
+        push_values: List[Optional[int]] = [None] * (code_length + 1)
+
+        instructions: List[Tuple[int, int]] = []
+
+        pc = 0
+        while pc < code_length:
+            opcode = code[pc]
+            valid_opcodes[pc] = 1
+            instructions.append((pc, opcode))
+            pc += 1
+
+            if PUSH1 <= opcode <= PUSH32:
+                size = opcode - PUSH1 + 1
+                push_values[pc] = big_endian_to_int(code[pc:pc + size].ljust(size, b'\x00'))
+                pc += size
+
+        self.valid_opcodes = bytes(valid_opcodes)
+        self.push_values = push_values
+        self.superinstructions = _find_superinstructions(instructions, push_values)
+        self.gas_blocks = _find_gas_blocks(instructions)
+        self._gas_block_costs: Dict[bytes, Dict[int, Tuple[int, int]]] = {}
+
+    def get_gas_block_costs(self, static_gas_costs: bytes) -> Dict[int, Tuple[int, int]]:
+        """
+        Return a mapping from the start of every gas block to the summed static gas cost
+        of the opcodes at its head and the number of those opcodes.
+
+        ``static_gas_costs`` holds the static gas cost of every opcode of a fork, indexed by
+        opcode, or :data:`NOT_STATIC_GAS`. The head of a block ends at the first opcode that
+        does not have a static gas cost in the fork.
+        """
+        try:
+            return self._gas_block_costs[static_gas_costs]
+        except KeyError:
+            pass
+
+        gas_block_costs = {}
+        for start_pc, block_opcodes in self.gas_blocks.items():
+            gas_cost = 0
+            num_opcodes = 0
+            for opcode in block_opcodes:
+                opcode_gas_cost = static_gas_costs[opcode]
+                if opcode_gas_cost == NOT_STATIC_GAS:
+                    break
+                gas_cost += opcode_gas_cost
+                num_opcodes += 1
+
+            if num_opcodes:
+                gas_block_costs[start_pc] = (gas_cost, num_opcodes)
+
+        self._gas_block_costs[static_gas_costs] = gas_block_costs
+        return gas_block_costs
+
+
+def _is_push(opcode: int) -> bool:
+    return PUSH1 <= opcode <= PUSH32
+
+
+def _find_superinstructions(
+        instructions: List[Tuple[int, int]],
+        push_values: List[Optional[int]]) -> Dict[int, Tuple[int, ...]]:
+
+    superinstructions: Dict[int, Tuple[int, ...]] = {}
+    # pad with an impossible opcode, so that patterns can be matched up to the end of the code
+    opcodes = [opcode for _, opcode in instructions] + [-1] * 4
+
+    for index, (pc, opcode) in enumerate(instructions):
+        if opcode == PUSH1:
+            # PUSH1 value; PUSHn offset; MSTORE
+            if _is_push(opcodes[index + 1]) and opcodes[index + 2] == MSTORE:
+                offset_pc = instructions[index + 1][0]
+                superinstructions[pc] = (
+                    push_values[pc + 1],
+                    push_values[offset_pc + 1],
+                    instructions[index + 2][0] + 1,
+                )
+        elif opcode == DUP1:
+            # DUP1; PUSHn selector; EQ; PUSHn destination; JUMPI -- the Solidity dispatcher
+            if (
+                _is_push(opcodes[index + 1])
+                and opcodes[index + 2] == EQ
+                and _is_push(opcodes[index + 3])
+                and opcodes[index + 4] == JUMPI
+            ):
+                selector_pc = instructions[index + 1][0]
+                destination_pc = instructions[index + 3][0]
+                superinstructions[pc] = (
+                    push_values[selector_pc + 1],
+                    push_values[destination_pc + 1],
+                    instructions[index + 4][0] + 1,
+                )
+        elif opcode == SWAP1:
+            # SWAP1; POP
+            if opcodes[index + 1] == POP:
+                superinstructions[pc] = (instructions[index + 1][0] + 1,)
+
+    return superinstructions
+
+
+def _find_gas_blocks(instructions: List[Tuple[int, int]]) -> Dict[int, bytes]:
+    gas_blocks: Dict[int, bytes] = {}
+
+    block_start = 0
+    block_opcodes = bytearray()
+    starts_block = True
+
+    for pc, opcode in instructions:
+        if starts_block or opcode == JUMPDEST:
+            if block_opcodes:
+                gas_blocks[block_start] = bytes(block_opcodes)
+            block_start = pc
+            block_opcodes = bytearray()
+
+        is_static = opcode in STATIC_GAS_OPCODES
+        if is_static:
+            block_opcodes.append(opcode)
+        elif block_opcodes:
+            # the head of the block ends here, the opcode is metered when it runs
+            gas_blocks[block_start] = bytes(block_opcodes)
+            block_opcodes = bytearray()
+
+        starts_block = not is_static or opcode == JUMP or opcode == JUMPI
+
+    if block_opcodes:
+        gas_blocks[block_start] = bytes(block_opcodes)
+
+    return gas_blocks
+
+
+# Keyed by the code itself rather than by its hash: hashing a bytes object is memoized by
+# the object, so a lookup for code that is already loaded costs no keccak at all.
+_code_analysis_cache: 'LRU[bytes, CodeAnalysis]' = LRU(CODE_ANALYSIS_CACHE_SIZE)
+
+
+def get_code_analysis(code: bytes) -> CodeAnalysis:
+    """
+    Return the :class:`CodeAnalysis` of ``code``, analyzing it only if the same code
+    has not been seen recently.
+    """
+    try:
+        return _code_analysis_cache[code]
+    except KeyError:
+        analysis = CodeAnalysis(code)
+        _code_analysis_cache[code] = analysis
+        return analysis
+
+
+def clear_code_analysis_cache() -> None:
+    _code_analysis_cache.clear()
@@ -1,23 +1,38 @@
 import contextlib
 import logging
 from typing import (
+    Dict,
     Iterator,
-    Set
+    Tuple,
+)
+
+from eth_utils import (
+    big_endian_to_int,
 )
 
 from eth.abc import CodeStreamAPI
 from eth.validation import (
     validate_is_bytes,
 )
+from eth.vm.code_analysis import (
+    get_code_analysis,
+)
 from eth.vm.opcode_values import (
     PUSH1,
-    PUSH32,
     STOP,
 )
 
 
 class CodeStream(CodeStreamAPI):
-    __slots__ = ['_length_cache', '_raw_code_bytes', 'invalid_positions', 'valid_positions', 'pc']
+    __slots__ = [
+        '_length_cache',
+        '_raw_code_bytes',
+        '_valid_opcodes',
+        '_push_values',
+        'superinstructions',
+        '_code_analysis',
+        'pc',
+    ]
 
     logger = logging.getLogger('eth.vm.CodeStream')
 
@@ -29,8 +44,14 @@ class CodeStream(CodeStreamAPI):
         self.program_counter = 0
         self._raw_code_bytes = code_bytes
         self._length_cache = len(code_bytes)
-        self.invalid_positions: Set[int] = set()
-        self.valid_positions: Set[int] = set()
+
+        # The jump destination bitmap and decoded PUSH data are computed once per code
+        # and shared with every other stream running the same code.
+        analysis = get_code_analysis(code_bytes)
+        self._valid_opcodes = analysis.valid_opcodes
+        self._push_values = analysis.push_values
+        self.superinstructions = analysis.superinstructions
+        self._code_analysis = analysis
 
     def read(self, size: int) -> bytes:
         old_program_counter = self.program_counter
@@ -38,6 +59,22 @@ class CodeStream(CodeStreamAPI):
         self.program_counter = target_program_counter
         return self._raw_code_bytes[old_program_counter:target_program_counter]
 
+    def read_push_int(self, size: int) -> int:
+        # a very performance-sensitive method
+        pc = self.program_counter
+        if pc <= self._length_cache:
+            value = self._push_values[pc]
+            # The pre-decoded value is only usable if the cursor sits right after a
+            # PUSH instruction of the requested size.
+            if value is not None and self._raw_code_bytes[pc - 1] == PUSH1 + size - 1:
+                self.program_counter = pc + size
+                return value
+
+        return big_endian_to_int(self.read(size).ljust(size, b'\x00'))
+
+    def get_gas_block_costs(self, static_gas_costs: bytes) -> Dict[int, Tuple[int, int]]:
+        return self._code_analysis.get_gas_block_costs(static_gas_costs)
+
     def __len__(self) -> int:
         return self._length_cache
 
@@ -46,9 +83,11 @@ class CodeStream(CodeStreamAPI):
 
     def __iter__(self) -> Iterator[int]:
         # a very performance-sensitive method
+        raw_code_bytes = self._raw_code_bytes
+        length = self._length_cache
         pc = self.program_counter
-        while pc < self._length_cache:
-            opcode = self._raw_code_bytes[pc]
+        while pc < length:
+            opcode = raw_code_bytes[pc]
             self.program_counter = pc + 1
             yield opcode
             # a read might have adjusted the pc during the last yield
@@ -72,38 +111,10 @@ class CodeStream(CodeStreamAPI):
         finally:
             self.program_counter = anchor_pc
 
-    def _potentially_disqualifying_opcode_positions(self, position: int) -> Iterator[int]:
-        # Look at the last 32 positions (from 1 byte back to 32 bytes back).
-        # Don't attempt to look at negative positions.
-        deepest_lookback = min(32, position)
-        # iterate in reverse, because PUSH32 is more common than others
-        for bytes_back in range(deepest_lookback, 0, -1):
-            earlier_position = position - bytes_back
-            opcode = self._raw_code_bytes[earlier_position]
-            if PUSH1 + (bytes_back - 1) <= opcode <= PUSH32:
-                # that PUSH1, if two bytes back, isn't disqualifying
-                # PUSH32 in any of the bytes back is disqualifying
-                yield earlier_position
-
     def is_valid_opcode(self, position: int) -> bool:
         if position >= self._length_cache:
             return False
-        elif position in self.invalid_positions:
-            return False
-        elif position in self.valid_positions:
-            return True
         else:
-            # An opcode is not valid, iff it is the "data" following a PUSH_
-            # So we look at the previous 32 bytes (PUSH32 being the largest) to see if there
-            # is a PUSH_ before the opcode in this position.
-            for disqualifier in self._potentially_disqualifying_opcode_positions(position):
-                # Now that we found a PUSH_ before this position, we check if *that* PUSH is valid
-                if self.is_valid_opcode(disqualifier):
-                    # If the PUSH_ valid, then the current position is invalid
-                    self.invalid_positions.add(position)
-                    return False
-                # Otherwise, keep looking for other potentially disqualifying PUSH_ codes
-
-            # We didn't find any valid PUSH_ opcodes in the 32 bytes before position; it's valid
-            self.valid_positions.add(position)
-            return True
+            # An opcode is not valid, iff it is the "data" following a PUSH_, which
+            # the code analysis already marked in its bitmap.
+            return self._valid_opcodes[position] == 1
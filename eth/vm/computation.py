@@ -6,6 +6,7 @@ from typing import (
     Dict,
     List,
     Optional,
+    Sized,
     Tuple,
     Type,
     Union,
@@ -57,6 +58,9 @@ from eth.validation import (
 from eth.vm.code_stream import (
     CodeStream,
 )
+from eth.vm.gas_blocks import (
+    prepaid_opcodes,
+)
 from eth.vm.gas_meter import (
     GasMeter,
 )
@@ -69,9 +73,15 @@ from eth.vm.memory import (
 from eth.vm.message import (
     Message,
 )
+from eth.vm.opcode_values import (
+    STOP,
+)
 from eth.vm.stack import (
     Stack,
 )
+from eth.vm.superinstructions import (
+    fuse_opcodes,
+)
 
 
 def NO_RESULT(computation: ComputationAPI) -> None:
@@ -103,6 +113,15 @@ class BaseComputation(Configurable, ComputationAPI):
 
         ``_precompiles``: A mapping of contract address to the precompile function for execution
         of precompiled contracts.
+
+        ``stack_class``: The stack implementation, either :class:`~eth.vm.stack.Stack` or the
+        int-only :class:`~eth.vm.stack.IntStack`.
+
+        Setting ``use_superinstructions`` executes common opcode sequences as single fused
+        callables, see :mod:`eth.vm.superinstructions`.
+
+        Setting ``use_gas_blocks`` charges the static gas of whole gas blocks on entry,
+        see :mod:`eth.vm.gas_blocks`. It takes precedence over ``use_superinstructions``.
     """
     state: StateAPI = None
     msg: MessageAPI = None
@@ -127,6 +146,11 @@ class BaseComputation(Configurable, ComputationAPI):
     # VM configuration
     opcodes: Dict[int, OpcodeAPI] = None
     _precompiles: Dict[Address, Callable[[ComputationAPI], ComputationAPI]] = None
+    stack_class: Type[StackAPI] = Stack
+    use_superinstructions: bool = False
+    _superinstruction_opcodes: Dict[int, OpcodeAPI] = None
+    use_gas_blocks: bool = False
+    _prepaid_opcodes: Tuple[bytes, Dict[int, OpcodeAPI]] = None
 
     logger = get_extended_debug_logger('eth.vm.computation.Computation')
 
@@ -140,7 +164,7 @@ class BaseComputation(Configurable, ComputationAPI):
         self.transaction_context = transaction_context
 
         self._memory = Memory()
-        self._stack = Stack()
+        self._stack = self.stack_class()
         self._gas_meter = self.get_gas_meter()
 
         self.children = []
@@ -203,6 +227,10 @@ class BaseComputation(Configurable, ComputationAPI):
         validate_uint256(start_position, title="Memory start position")
         validate_uint256(size, title="Memory size")
 
+        if start_position + size <= len(self._memory):
+            # already allocated and paid for
+            return
+
         before_size = ceil32(len(self._memory))
         after_size = ceil32(start_position + size)
 
@@ -242,6 +270,21 @@ class BaseComputation(Configurable, ComputationAPI):
     def memory_read_bytes(self, start_position: int, size: int) -> bytes:
         return self._memory.read_bytes(start_position, size)
 
+    # The word and byte accessors run for every MSTORE, MSTORE8 and MLOAD, so they are
+    # proxied directly to the memory object, like the stack methods below.
+
+    @cached_property
+    def memory_write_word(self) -> Callable[[int, int], None]:
+        return self._memory.write_word
+
+    @cached_property
+    def memory_write_byte(self) -> Callable[[int, int], None]:
+        return self._memory.write_byte
+
+    @cached_property
+    def memory_read_word(self) -> Callable[[int], int]:
+        return self._memory.read_word
+
     #
     # Gas Consumption
     #
@@ -287,6 +330,10 @@ class BaseComputation(Configurable, ComputationAPI):
     def stack_dup(self, position: int) -> None:
         return self._stack.dup(position)
 
+    def stack_size(self) -> int:
+        # both stack implementations are sized, though StackAPI doesn't declare it
+        return len(cast(Sized, self._stack))
+
     # Stack manipulation is performance-sensitive code.
     # Avoid method call overhead by proxying stack method directly to stack object
 
@@ -302,6 +349,14 @@ class BaseComputation(Configurable, ComputationAPI):
     def stack_pop_any(self) -> Callable[[int], Tuple[Union[int, bytes], ...]]:
         return self._stack.pop_any
 
+    @cached_property
+    def stack_pop2_ints(self) -> Callable[[], Tuple[int, int]]:
+        return self._stack.pop2_ints
+
+    @cached_property
+    def stack_pop3_ints(self) -> Callable[[], Tuple[int, int, int]]:
+        return self._stack.pop3_ints
+
     @cached_property
     def stack_pop1_int(self) -> Callable[[], int]:
         return self._stack.pop1_int
@@ -318,6 +373,10 @@ class BaseComputation(Configurable, ComputationAPI):
     def stack_push_int(self) -> Callable[[int], None]:
         return self._stack.push_int
 
+    @cached_property
+    def stack_push_int_unchecked(self) -> Callable[[int], None]:
+        return self._stack.push_int_unchecked
+
     @cached_property
     def stack_push_bytes(self) -> Callable[[bytes], None]:
         return self._stack.push_bytes
@@ -529,7 +588,17 @@ class BaseComputation(Configurable, ComputationAPI):
 
             show_debug2 = computation.logger.show_debug2
 
-            opcode_lookup = computation.opcodes
+            if cls.use_gas_blocks and not show_debug2:
+                # gas blocks would hide the gas of their inner opcodes from the debug log
+                cls._apply_by_gas_block(computation)
+                return computation
+
+            if cls.use_superinstructions and not show_debug2:
+                # fused sequences would hide their inner opcodes from the debug log
+                opcode_lookup = cls.get_superinstruction_opcodes()
+            else:
+                opcode_lookup = computation.opcodes
+
             for opcode in computation.code:
                 try:
                     opcode_fn = opcode_lookup[opcode]
@@ -553,6 +622,42 @@ class BaseComputation(Configurable, ComputationAPI):
                     break
         return computation
 
+    @classmethod
+    def _apply_by_gas_block(cls, computation: ComputationAPI) -> None:
+        static_gas_costs, prepaid_opcodes = cls.get_prepaid_opcodes()
+        opcodes = computation.opcodes
+        code = computation.code
+
+        gas_block_costs = code.get_gas_block_costs(static_gas_costs)
+        num_prepaid = 0
+
+        for opcode in code:
+            if num_prepaid:
+                num_prepaid -= 1
+                opcode_fn = prepaid_opcodes[opcode]
+            else:
+                # The STOP at the end of the code shares its program counter with the
+                # last opcode of the code, but it never starts a gas block.
+                gas_block = gas_block_costs.get(code.program_counter - 1)
+                if (
+                    gas_block is not None
+                    and opcode != STOP
+                    and computation.get_gas_remaining() >= gas_block[0]
+                ):
+                    computation.consume_gas(gas_block[0], "gas block")
+                    num_prepaid = gas_block[1] - 1
+                    opcode_fn = prepaid_opcodes[opcode]
+                else:
+                    try:
+                        opcode_fn = opcodes[opcode]
+                    except KeyError:
+                        opcode_fn = InvalidOpcode(opcode)
+
+            try:
+                opcode_fn(computation=computation)
+            except Halt:
+                break
+
     #
     # Opcode API
     #
@@ -570,6 +675,20 @@ class BaseComputation(Configurable, ComputationAPI):
         else:
             return cls._precompiles
 
+    @classmethod
+    def get_superinstruction_opcodes(cls) -> Dict[int, OpcodeAPI]:
+        # built on first use, once per computation class
+        if '_superinstruction_opcodes' not in cls.__dict__:
+            cls._superinstruction_opcodes = fuse_opcodes(cls.opcodes)
+        return cls._superinstruction_opcodes
+
+    @classmethod
+    def get_prepaid_opcodes(cls) -> Tuple[bytes, Dict[int, OpcodeAPI]]:
+        # built on first use, once per computation class
+        if '_prepaid_opcodes' not in cls.__dict__:
+            cls._prepaid_opcodes = prepaid_opcodes(cls.opcodes)
+        return cls._prepaid_opcodes
+
     def get_opcode_fn(self, opcode: int) -> OpcodeAPI:
         try:
             return self.opcodes[opcode]
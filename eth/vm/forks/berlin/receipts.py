@@ -63,9 +63,16 @@ class TypedReceipt(ReceiptAPI, ReceiptDecoderAPI):
 
         payload_codec = cls.get_payload_codec(type_id)
         inner_receipt = payload_codec.decode(payload)
-        return cls(type_id, inner_receipt)
+        receipt = cls(type_id, inner_receipt)
+        # Keep the bytes the receipt was decoded from, to store it as is
+        receipt._encoded = encoded
+        return receipt
 
     def encode(self) -> bytes:
+        return self._encoded
+
+    @cached_property
+    def _encoded(self) -> bytes:
         return self._type_byte + self._inner.encode()
 
     @classmethod
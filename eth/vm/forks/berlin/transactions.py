@@ -280,6 +280,10 @@ class TypedTransaction(SignedTransactionMethods, SignedTransactionAPI, Transacti
             raise ValidationError(f"Cannot build typed transaction with {hex(type_id)} >= 0x80")
 
     def encode(self) -> bytes:
+        return self._encoded
+
+    @cached_property
+    def _encoded(self) -> bytes:
         return self._type_byte + self._inner.encode()
 
     @classmethod
@@ -289,7 +293,10 @@ class TypedTransaction(SignedTransactionMethods, SignedTransactionAPI, Transacti
 
         payload_codec = cls.get_payload_codec(type_id)
         inner_transaction = payload_codec.decode(payload)
-        return cls(type_id, inner_transaction)
+        transaction = cls(type_id, inner_transaction)
+        # Keep the bytes the transaction was decoded from, to store and hash it as is
+        transaction._encoded = encoded
+        return transaction
 
     @classmethod
     def serialize(cls, obj: 'TypedTransaction') -> DecodedZeroOrOneLayerRLP:
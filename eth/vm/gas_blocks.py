@@ -0,0 +1,69 @@
+"""
+Gas block metering: charging the static gas of a run of opcodes once, on entry.
+
+:class:`~eth.vm.code_analysis.CodeAnalysis` splits the code into gas blocks, whose head
+is a run of opcodes with an entirely static gas cost (see
+:data:`~eth.vm.code_analysis.STATIC_GAS_OPCODES`). When execution enters a gas block with
+enough gas for its whole head, the summed static cost is consumed at once and the head runs
+through opcodes that don't charge their static cost again. Opcodes with dynamic costs
+(memory expansion, SSTORE, CALL, ...) are metered when they run, as usual.
+
+If the gas left is not enough for the whole head, the block is metered opcode by opcode, so
+that out-of-gas is raised by the exact opcode that runs out, as it would be without gas
+blocks.
+"""
+from typing import (
+    Dict,
+    Optional,
+    Tuple,
+)
+
+from eth.abc import (
+    OpcodeAPI,
+)
+from eth.vm.code_analysis import (
+    NOT_STATIC_GAS,
+    STATIC_GAS_OPCODES,
+)
+from eth.vm.opcode import (
+    Opcode,
+)
+
+
+def _without_static_gas(opcode_fn: OpcodeAPI) -> Optional[OpcodeAPI]:
+    # Opcodes made with as_opcode() wrap their logic in a function that consumes gas_cost
+    logic_fn = getattr(type(opcode_fn).__call__, '__wrapped__', None)
+    if logic_fn is None:
+        return None
+
+    props = {
+        '__call__': staticmethod(logic_fn),
+        'mnemonic': opcode_fn.mnemonic,
+        'gas_cost': opcode_fn.gas_cost,  # type: ignore
+    }
+    opcode_cls = type(f"prepaid:{opcode_fn.mnemonic}", (Opcode,), props)
+    return opcode_cls()
+
+
+def prepaid_opcodes(opcodes: Dict[int, OpcodeAPI]) -> Tuple[bytes, Dict[int, OpcodeAPI]]:
+    """
+    Return the static gas costs of ``opcodes``, in the format expected by
+    :meth:`~eth.vm.code_analysis.CodeAnalysis.get_gas_block_costs`, and the opcodes with a
+    static cost as callables which do not consume it.
+    """
+    static_gas_costs = bytearray([NOT_STATIC_GAS]) * 256
+    prepaid: Dict[int, OpcodeAPI] = {}
+
+    for opcode, opcode_fn in opcodes.items():
+        if opcode not in STATIC_GAS_OPCODES:
+            continue
+
+        prepaid_fn = _without_static_gas(opcode_fn)
+        gas_cost = opcode_fn.gas_cost  # type: ignore
+        if prepaid_fn is None or gas_cost >= NOT_STATIC_GAS:
+            continue
+
+        static_gas_costs[opcode] = gas_cost
+        prepaid[opcode] = prepaid_fn
+
+    return bytes(static_gas_costs), prepaid
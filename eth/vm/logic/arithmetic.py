@@ -17,50 +17,50 @@ def add(computation: BaseComputation) -> None:
     """
     Addition
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     result = (left + right) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def addmod(computation: BaseComputation) -> None:
     """
     Modulo Addition
     """
-    left, right, mod = computation.stack_pop_ints(3)
+    left, right, mod = computation.stack_pop3_ints()
 
     if mod == 0:
         result = 0
     else:
         result = (left + right) % mod
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def sub(computation: BaseComputation) -> None:
     """
     Subtraction
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     result = (left - right) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def mod(computation: BaseComputation) -> None:
     """
     Modulo
     """
-    value, mod = computation.stack_pop_ints(2)
+    value, mod = computation.stack_pop2_ints()
 
     if mod == 0:
         result = 0
     else:
         result = value % mod
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def smod(computation: BaseComputation) -> None:
@@ -69,7 +69,7 @@ def smod(computation: BaseComputation) -> None:
     """
     value, mod = map(
         unsigned_to_signed,
-        computation.stack_pop_ints(2),
+        computation.stack_pop2_ints(),
     )
 
     pos_or_neg = -1 if value < 0 else 1
@@ -79,45 +79,45 @@ def smod(computation: BaseComputation) -> None:
     else:
         result = (abs(value) % abs(mod) * pos_or_neg) & constants.UINT_256_MAX
 
-    computation.stack_push_int(signed_to_unsigned(result))
+    computation.stack_push_int_unchecked(signed_to_unsigned(result))
 
 
 def mul(computation: BaseComputation) -> None:
     """
     Multiplication
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     result = (left * right) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def mulmod(computation: BaseComputation) -> None:
     """
     Modulo Multiplication
     """
-    left, right, mod = computation.stack_pop_ints(3)
+    left, right, mod = computation.stack_pop3_ints()
 
     if mod == 0:
         result = 0
     else:
         result = (left * right) % mod
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def div(computation: BaseComputation) -> None:
     """
     Division
     """
-    numerator, denominator = computation.stack_pop_ints(2)
+    numerator, denominator = computation.stack_pop2_ints()
 
     if denominator == 0:
         result = 0
     else:
         result = (numerator // denominator) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def sdiv(computation: BaseComputation) -> None:
@@ -126,7 +126,7 @@ def sdiv(computation: BaseComputation) -> None:
     """
     numerator, denominator = map(
         unsigned_to_signed,
-        computation.stack_pop_ints(2),
+        computation.stack_pop2_ints(),
     )
 
     pos_or_neg = -1 if numerator * denominator < 0 else 1
@@ -136,7 +136,7 @@ def sdiv(computation: BaseComputation) -> None:
     else:
         result = (pos_or_neg * (abs(numerator) // abs(denominator)))
 
-    computation.stack_push_int(signed_to_unsigned(result))
+    computation.stack_push_int_unchecked(signed_to_unsigned(result))
 
 
 @curry
@@ -144,7 +144,7 @@ def exp(computation: BaseComputation, gas_per_byte: int) -> None:
     """
     Exponentiation
     """
-    base, exponent = computation.stack_pop_ints(2)
+    base, exponent = computation.stack_pop2_ints()
 
     bit_size = exponent.bit_length()
     byte_size = ceil8(bit_size) // 8
@@ -161,14 +161,14 @@ def exp(computation: BaseComputation, gas_per_byte: int) -> None:
         reason="EXP: exponent bytes",
     )
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def signextend(computation: BaseComputation) -> None:
     """
     Signed Extend
     """
-    bits, value = computation.stack_pop_ints(2)
+    bits, value = computation.stack_pop2_ints()
 
     if bits <= 31:
         testbit = bits * 8 + 7
@@ -180,42 +180,42 @@ def signextend(computation: BaseComputation) -> None:
     else:
         result = value
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def shl(computation: BaseComputation) -> None:
     """
     Bitwise left shift
     """
-    shift_length, value = computation.stack_pop_ints(2)
+    shift_length, value = computation.stack_pop2_ints()
 
     if shift_length >= 256:
         result = 0
     else:
         result = (value << shift_length) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def shr(computation: BaseComputation) -> None:
     """
     Bitwise right shift
     """
-    shift_length, value = computation.stack_pop_ints(2)
+    shift_length, value = computation.stack_pop2_ints()
 
     if shift_length >= 256:
         result = 0
     else:
         result = (value >> shift_length) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def sar(computation: BaseComputation) -> None:
     """
     Arithmetic bitwise right shift
     """
-    shift_length, value = computation.stack_pop_ints(2)
+    shift_length, value = computation.stack_pop2_ints()
     value = unsigned_to_signed(value)
 
     if shift_length >= 256:
@@ -223,4 +223,4 @@ def sar(computation: BaseComputation) -> None:
     else:
         result = (value >> shift_length) & constants.UINT_256_MAX
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
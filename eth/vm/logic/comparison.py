@@ -12,28 +12,28 @@ def lt(computation: BaseComputation) -> None:
     """
     Lesser Comparison
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     if left < right:
         result = 1
     else:
         result = 0
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def gt(computation: BaseComputation) -> None:
     """
     Greater Comparison
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     if left > right:
         result = 1
     else:
         result = 0
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def slt(computation: BaseComputation) -> None:
@@ -42,7 +42,7 @@ def slt(computation: BaseComputation) -> None:
     """
     left, right = map(
         unsigned_to_signed,
-        computation.stack_pop_ints(2),
+        computation.stack_pop2_ints(),
     )
 
     if left < right:
@@ -50,7 +50,7 @@ def slt(computation: BaseComputation) -> None:
     else:
         result = 0
 
-    computation.stack_push_int(signed_to_unsigned(result))
+    computation.stack_push_int_unchecked(signed_to_unsigned(result))
 
 
 def sgt(computation: BaseComputation) -> None:
@@ -59,7 +59,7 @@ def sgt(computation: BaseComputation) -> None:
     """
     left, right = map(
         unsigned_to_signed,
-        computation.stack_pop_ints(2),
+        computation.stack_pop2_ints(),
     )
 
     if left > right:
@@ -67,21 +67,21 @@ def sgt(computation: BaseComputation) -> None:
     else:
         result = 0
 
-    computation.stack_push_int(signed_to_unsigned(result))
+    computation.stack_push_int_unchecked(signed_to_unsigned(result))
 
 
 def eq(computation: BaseComputation) -> None:
     """
     Equality
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     if left == right:
         result = 1
     else:
         result = 0
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def iszero(computation: BaseComputation) -> None:
@@ -95,40 +95,40 @@ def iszero(computation: BaseComputation) -> None:
     else:
         result = 0
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def and_op(computation: BaseComputation) -> None:
     """
     Bitwise And
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     result = left & right
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def or_op(computation: BaseComputation) -> None:
     """
     Bitwise Or
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     result = left | right
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def xor(computation: BaseComputation) -> None:
     """
     Bitwise XOr
     """
-    left, right = computation.stack_pop_ints(2)
+    left, right = computation.stack_pop2_ints()
 
     result = left ^ right
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def not_op(computation: BaseComputation) -> None:
@@ -139,18 +139,18 @@ def not_op(computation: BaseComputation) -> None:
 
     result = constants.UINT_256_MAX - value
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
 
 
 def byte_op(computation: BaseComputation) -> None:
     """
     Bitwise And
     """
-    position, value = computation.stack_pop_ints(2)
+    position, value = computation.stack_pop2_ints()
 
     if position >= 32:
         result = 0
     else:
         result = (value // pow(256, 31 - position)) % 256
 
-    computation.stack_push_int(result)
+    computation.stack_push_int_unchecked(result)
@@ -3,26 +3,20 @@ from eth.vm.computation import BaseComputation
 
 def mstore(computation: BaseComputation) -> None:
     start_position = computation.stack_pop1_int()
-    value = computation.stack_pop1_bytes()
-
-    padded_value = value.rjust(32, b'\x00')
-    normalized_value = padded_value[-32:]
+    value = computation.stack_pop1_int()
 
     computation.extend_memory(start_position, 32)
 
-    computation.memory_write(start_position, 32, normalized_value)
+    computation.memory_write_word(start_position, value)
 
 
 def mstore8(computation: BaseComputation) -> None:
     start_position = computation.stack_pop1_int()
-    value = computation.stack_pop1_bytes()
-
-    padded_value = value.rjust(1, b'\x00')
-    normalized_value = padded_value[-1:]
+    value = computation.stack_pop1_int()
 
     computation.extend_memory(start_position, 1)
 
-    computation.memory_write(start_position, 1, normalized_value)
+    computation.memory_write_byte(start_position, value & 0xff)
 
 
 def mload(computation: BaseComputation) -> None:
@@ -30,8 +24,7 @@ def mload(computation: BaseComputation) -> None:
 
     computation.extend_memory(start_position, 32)
 
-    value = computation.memory_read_bytes(start_position, 32)
-    computation.stack_push_bytes(value)
+    computation.stack_push_int(computation.memory_read_word(start_position))
 
 
 def msize(computation: BaseComputation) -> None:
@@ -8,18 +8,10 @@ def pop(computation: BaseComputation) -> None:
 
 
 def push_XX(computation: BaseComputation, size: int) -> None:
-    raw_value = computation.code.read(size)
-
     # This is a performance-sensitive area.
-    # Calling raw_value.ljust() when size == len(raw_value) is more expensive than
-    # calling len(raw_value) and raw_len is typically the correct size already,
-    # so this saves a bit of time:
-    raw_len = len(raw_value)
-    if raw_len == size:
-        computation.stack_push_bytes(raw_value)
-    else:
-        padded_value = raw_value.ljust(size, b'\x00')
-        computation.stack_push_bytes(padded_value)
+    # The code stream hands back PUSH data already decoded to an int by the code analysis,
+    # which is also the representation most consumers pop it as.
+    computation.stack_push_int(computation.code.read_push_int(size))
 
 
 push1 = functools.partial(push_XX, size=1)
@@ -1,4 +1,3 @@
-import itertools
 import logging
 
 from eth.validation import (
@@ -15,34 +14,47 @@ from eth.abc import MemoryAPI
 
 
 class Memory(MemoryAPI):
-    __slots__ = ['_bytes']
+    """
+    EVM memory, backed by a buffer whose capacity grows geometrically.
+
+    The logical size of the memory (the one that is paid for, and reported by MSIZE) is
+    tracked separately from the capacity of the buffer, so that extending the memory by a
+    word at a time doesn't reallocate the buffer every time. The buffer beyond the logical
+    size is always zero, since nothing can be written there.
+    """
+    __slots__ = ['_bytes', '_size']
     logger = logging.getLogger('eth.vm.memory.Memory')
 
     def __init__(self) -> None:
         self._bytes = bytearray()
+        self._size = 0
 
     def extend(self, start_position: int, size: int) -> None:
         if size == 0:
             return
 
         new_size = ceil32(start_position + size)
-        if new_size <= len(self):
+        if new_size <= self._size:
             return
 
-        size_to_extend = new_size - len(self)
-        try:
-            self._bytes.extend(itertools.repeat(0, size_to_extend))
-        except BufferError:
-            # we can't extend the buffer (which might involve relocating it) if a
-            # memoryview (which stores a pointer into the buffer) has been created by
-            # read() and not released. Callers of read() will never try to write to the
-            # buffer so we're not missing anything by making a new buffer and forgetting
-            # about the old one. We're keeping too much memory around but this is still a
-            # net savings over having read() return a new bytes() object every time.
-            self._bytes = self._bytes + bytearray(size_to_extend)
+        capacity = len(self._bytes)
+        if new_size > capacity:
+            size_to_extend = max(new_size, 2 * capacity) - capacity
+            try:
+                self._bytes.extend(bytes(size_to_extend))
+            except BufferError:
+                # we can't extend the buffer (which might involve relocating it) if a
+                # memoryview (which stores a pointer into the buffer) has been created by
+                # read() and not released. Callers of read() will never try to write to the
+                # buffer so we're not missing anything by making a new buffer and forgetting
+                # about the old one. We're keeping too much memory around but this is still a
+                # net savings over having read() return a new bytes() object every time.
+                self._bytes = self._bytes + bytearray(size_to_extend)
+
+        self._size = new_size
 
     def __len__(self) -> int:
-        return len(self._bytes)
+        return self._size
 
     def write(self, start_position: int, size: int, value: bytes) -> None:
         if size:
@@ -50,13 +62,21 @@ class Memory(MemoryAPI):
             validate_uint256(size)
             validate_is_bytes(value)
             validate_length(value, length=size)
-            validate_lte(start_position + size, maximum=len(self))
+            validate_lte(start_position + size, maximum=self._size)
+
+            self._bytes[start_position:start_position + size] = value
 
-            for idx, v in enumerate(value):
-                self._bytes[start_position + idx] = v
+    def write_word(self, start_position: int, value: int) -> None:
+        self._bytes[start_position:start_position + 32] = value.to_bytes(32, 'big')
+
+    def write_byte(self, start_position: int, value: int) -> None:
+        self._bytes[start_position] = value
 
     def read(self, start_position: int, size: int) -> memoryview:
         return memoryview(self._bytes)[start_position:start_position + size]
 
     def read_bytes(self, start_position: int, size: int) -> bytes:
-        return bytes(self._bytes[start_position:start_position + size])
+        return bytes(memoryview(self._bytes)[start_position:start_position + size])
+
+    def read_word(self, start_position: int) -> int:
+        return int.from_bytes(self._bytes[start_position:start_position + 32], 'big')
@@ -23,6 +23,9 @@ from eth.validation import (
 from eth.abc import StackAPI
 
 
+STACK_DEPTH_LIMIT = 1024
+
+
 def _busted_type(item_type: type, value: Union[int, bytes]) -> ValidationError:
     return ValidationError(
         "Stack must always be bytes or int, "
@@ -62,6 +65,12 @@ class Stack(StackAPI):
 
         self._append((int, value))
 
+    def push_int_unchecked(self, value: int) -> None:
+        if len(self.values) > 1023:
+            raise FullStack('Stack limit reached')
+
+        self._append((int, value))
+
     def push_bytes(self, value: bytes) -> None:
         if len(self.values) > 1023:
             raise FullStack('Stack limit reached')
@@ -112,6 +121,14 @@ class Stack(StackAPI):
             _, popped = self._pop_typed()
             return popped
 
+    def pop2_ints(self) -> Tuple[int, int]:
+        pop1_int = self.pop1_int
+        return pop1_int(), pop1_int()
+
+    def pop3_ints(self) -> Tuple[int, int, int]:
+        pop1_int = self.pop1_int
+        return pop1_int(), pop1_int(), pop1_int()
+
     def pop_any(self, num_items: int) -> Tuple[Union[int, bytes], ...]:
         #
         # Note: This function is optimized for speed over readability.
@@ -221,3 +238,138 @@ class Stack(StackAPI):
 
     def __str__(self) -> str:
         return str(list(self._stack_items_str()))
+
+
+class IntStack(StackAPI):
+    """
+    VM Stack that only holds canonical ints.
+
+    Items live in a list of ``STACK_DEPTH_LIMIT`` slots that is allocated once, with
+    ``_top`` the number of items on the stack. Bytes are converted to ints when they are
+    pushed, so values popped as bytes have no leading zero bytes.
+    """
+    __slots__ = ['_items', '_top']
+    logger = logging.getLogger('eth.vm.stack.IntStack')
+
+    def __init__(self) -> None:
+        self._items: List[int] = [0] * STACK_DEPTH_LIMIT
+        self._top = 0
+
+    def __len__(self) -> int:
+        return self._top
+
+    @property
+    def values(self) -> List[Tuple[type, int]]:
+        return [(int, value) for value in self._items[:self._top]]
+
+    def push_int(self, value: int) -> None:
+        top = self._top
+        if top >= STACK_DEPTH_LIMIT:
+            raise FullStack('Stack limit reached')
+
+        validate_stack_int(value)
+
+        self._items[top] = value
+        self._top = top + 1
+
+    def push_int_unchecked(self, value: int) -> None:
+        top = self._top
+        if top >= STACK_DEPTH_LIMIT:
+            raise FullStack('Stack limit reached')
+
+        self._items[top] = value
+        self._top = top + 1
+
+    def push_bytes(self, value: bytes) -> None:
+        top = self._top
+        if top >= STACK_DEPTH_LIMIT:
+            raise FullStack('Stack limit reached')
+
+        validate_stack_bytes(value)
+
+        self._items[top] = big_endian_to_int(value)
+        self._top = top + 1
+
+    def pop1_bytes(self) -> bytes:
+        top = self._top - 1
+        if top < 0:
+            raise InsufficientStack("Wanted 1 stack item as bytes, had none")
+
+        self._top = top
+        return int_to_big_endian(self._items[top])
+
+    def pop1_int(self) -> int:
+        top = self._top - 1
+        if top < 0:
+            raise InsufficientStack("Wanted 1 stack item as int, had none")
+
+        self._top = top
+        return self._items[top]
+
+    def pop1_any(self) -> int:
+        top = self._top - 1
+        if top < 0:
+            raise InsufficientStack("Wanted 1 stack item, had none")
+
+        self._top = top
+        return self._items[top]
+
+    def pop2_ints(self) -> Tuple[int, int]:
+        top = self._top
+        if top < 2:
+            raise InsufficientStack("Wanted 2 stack items, only had %d", top)
+
+        self._top = top - 2
+        items = self._items
+        return items[top - 1], items[top - 2]
+
+    def pop3_ints(self) -> Tuple[int, int, int]:
+        top = self._top
+        if top < 3:
+            raise InsufficientStack("Wanted 3 stack items, only had %d", top)
+
+        self._top = top - 3
+        items = self._items
+        return items[top - 1], items[top - 2], items[top - 3]
+
+    def pop_ints(self, num_items: int) -> Tuple[int, ...]:
+        top = self._top
+        if num_items > top:
+            raise InsufficientStack(
+                "Wanted %d stack items, only had %d",
+                num_items,
+                top,
+            )
+
+        new_top = top - num_items
+        self._top = new_top
+        return tuple(reversed(self._items[new_top:top]))
+
+    def pop_any(self, num_items: int) -> Tuple[int, ...]:
+        return self.pop_ints(num_items)
+
+    def pop_bytes(self, num_items: int) -> Tuple[bytes, ...]:
+        return tuple(int_to_big_endian(value) for value in self.pop_ints(num_items))
+
+    def swap(self, position: int) -> None:
+        top = self._top - 1
+        idx = top - position
+        if idx < 0:
+            raise InsufficientStack(f"Insufficient stack items for SWAP{position}")
+
+        items = self._items
+        items[top], items[idx] = items[idx], items[top]
+
+    def dup(self, position: int) -> None:
+        top = self._top
+        if top >= STACK_DEPTH_LIMIT:
+            raise FullStack('Stack limit reached')
+
+        if not 0 < position <= top:
+            raise InsufficientStack(f"Insufficient stack items for DUP{position}")
+
+        self._items[top] = self._items[top - position]
+        self._top = top + 1
+
+    def __str__(self) -> str:
+        return str([hex(value) for value in self._items[:self._top]])
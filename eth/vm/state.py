@@ -1,6 +1,8 @@
 import contextlib
 from typing import (
+    Iterable,
     Iterator,
+    Sequence,
     Tuple,
     Type,
 )
@@ -212,6 +214,16 @@ class BaseState(Configurable, StateAPI):
     def persist(self) -> MetaWitnessAPI:
         return self._account_db.persist()
 
+    def prefetch(self, accounts: Iterable[Tuple[Address, Sequence[int]]]) -> None:
+        self._account_db.prefetch(accounts)
+
+    def fork(self) -> StateAPI:
+        forked_state = self.__class__.__new__(self.__class__)
+        forked_state._db = self._db
+        forked_state.execution_context = self.execution_context
+        forked_state._account_db = self._account_db.fork()
+        return forked_state
+
     #
     # Access self.prev_hashes (Read-only)
     #
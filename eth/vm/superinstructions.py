@@ -0,0 +1,174 @@
+"""
+Superinstructions: common opcode sequences executed as a single fused callable.
+
+The sequences are found once per code hash by :class:`~eth.vm.code_analysis.CodeAnalysis`.
+At run time, the opcode that starts a sequence is replaced by a callable that charges the
+static gas of the whole sequence at once and then executes it without going back through
+the interpreter loop for every opcode.
+
+Fusion must never change the outcome of a computation. Whenever executing the sequence
+opcode by opcode could fail part-way (not enough gas for the static cost, a stack that is
+too short or too deep), the fused callable falls back to the original opcode, so that
+errors are still raised by the exact opcode that causes them.
+"""
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+)
+
+from eth.abc import (
+    OpcodeAPI,
+)
+from eth.exceptions import (
+    InvalidInstruction,
+    InvalidJumpDestination,
+)
+from eth.vm.opcode import (
+    Opcode,
+)
+from eth.vm.opcode_values import (
+    DUP1,
+    EQ,
+    JUMPDEST,
+    JUMPI,
+    MSTORE,
+    POP,
+    PUSH1,
+    SWAP1,
+)
+
+if TYPE_CHECKING:
+    from eth.vm.computation import BaseComputation  # noqa: F401
+
+
+STACK_LIMIT = 1024
+
+SuperinstructionFn = Callable[['BaseComputation'], None]
+
+
+def _as_superinstruction(opcode_fn: OpcodeAPI, logic_fn: SuperinstructionFn) -> OpcodeAPI:
+    props = {
+        '__call__': staticmethod(logic_fn),
+        'mnemonic': opcode_fn.mnemonic,
+        'gas_cost': opcode_fn.gas_cost,  # type: ignore
+    }
+    opcode_cls = type(f"superinstruction:{opcode_fn.mnemonic}", (Opcode,), props)
+    return opcode_cls()
+
+
+def push1_push1_mstore(push1: OpcodeAPI, static_gas: int) -> OpcodeAPI:
+    """
+    ``PUSH1 value; PUSHn offset; MSTORE``
+    """
+    def push1_push1_mstore_fn(computation: 'BaseComputation') -> None:
+        code = computation.code
+        operands = code.superinstructions.get(code.program_counter - 1)
+        if (
+            operands is None
+            or computation.stack_size() > STACK_LIMIT - 2
+            or computation.get_gas_remaining() < static_gas
+        ):
+            push1(computation=computation)
+            return
+
+        value, start_position, next_pc = operands
+        computation.consume_gas(static_gas, "PUSH1 PUSHn MSTORE")
+        code.program_counter = next_pc
+
+        computation.extend_memory(start_position, 32)
+        computation.memory_write_word(start_position, value)
+
+    return _as_superinstruction(push1, push1_push1_mstore_fn)
+
+
+def dup1_push_eq_push_jumpi(dup1: OpcodeAPI, static_gas: int) -> OpcodeAPI:
+    """
+    ``DUP1; PUSHn selector; EQ; PUSHn destination; JUMPI``, the function dispatcher
+    emitted by the Solidity compiler.
+    """
+    def dup1_push_eq_push_jumpi_fn(computation: 'BaseComputation') -> None:
+        code = computation.code
+        operands = code.superinstructions.get(code.program_counter - 1)
+        if (
+            operands is None
+            or not 0 < computation.stack_size() <= STACK_LIMIT - 2
+            or computation.get_gas_remaining() < static_gas
+        ):
+            dup1(computation=computation)
+            return
+
+        selector, jump_dest, next_pc = operands
+        computation.consume_gas(static_gas, "DUP1 PUSHn EQ PUSHn JUMPI")
+
+        # The stack is left as it was found, so pop and restore the duplicated value
+        value = computation.stack_pop1_int()
+        computation.stack_push_int(value)
+
+        if value == selector:
+            code.program_counter = jump_dest
+
+            next_opcode = code.peek()
+
+            if next_opcode != JUMPDEST:
+                raise InvalidJumpDestination("Invalid Jump Destination")
+
+            if not code.is_valid_opcode(jump_dest):
+                raise InvalidInstruction("Jump resulted in invalid instruction")
+        else:
+            code.program_counter = next_pc
+
+    return _as_superinstruction(dup1, dup1_push_eq_push_jumpi_fn)
+
+
+def swap1_pop(swap1: OpcodeAPI, static_gas: int) -> OpcodeAPI:
+    """
+    ``SWAP1; POP``
+    """
+    def swap1_pop_fn(computation: 'BaseComputation') -> None:
+        code = computation.code
+        operands = code.superinstructions.get(code.program_counter - 1)
+        if (
+            operands is None
+            or computation.stack_size() < 2
+            or computation.get_gas_remaining() < static_gas
+        ):
+            swap1(computation=computation)
+            return
+
+        next_pc, = operands
+        computation.consume_gas(static_gas, "SWAP1 POP")
+        code.program_counter = next_pc
+
+        computation.stack_swap(1)
+        computation.stack_pop1_any()
+
+    return _as_superinstruction(swap1, swap1_pop_fn)
+
+
+def fuse_opcodes(opcodes: Dict[int, OpcodeAPI]) -> Dict[int, OpcodeAPI]:
+    """
+    Return a copy of ``opcodes`` in which the opcodes that start a fusable sequence are
+    replaced by their superinstruction. The static gas of each sequence is taken from
+    ``opcodes``, so the fused table charges exactly what the original one would.
+    """
+    def static_gas(*sequence: int) -> int:
+        return sum(opcodes[opcode].gas_cost for opcode in sequence)  # type: ignore
+
+    fused_opcodes = dict(opcodes)
+
+    # All PUSHn opcodes have the same static cost, so PUSH1 stands in for any of them.
+    fused_opcodes[PUSH1] = push1_push1_mstore(
+        opcodes[PUSH1],
+        static_gas(PUSH1, PUSH1, MSTORE),
+    )
+    fused_opcodes[DUP1] = dup1_push_eq_push_jumpi(
+        opcodes[DUP1],
+        static_gas(DUP1, PUSH1, EQ, PUSH1, JUMPI),
+    )
+    fused_opcodes[SWAP1] = swap1_pop(
+        opcodes[SWAP1],
+        static_gas(SWAP1, POP),
+    )
+
+    return fused_opcodes
@@ -1,12 +1,25 @@
+import threading
 from collections import deque
-from typing import Any, Dict, Deque
+from typing import Any, ContextManager, Dict, Deque, List, Optional, Tuple, Union
 
-import rlp
+from eth_typing import BlockNumber, Hash32
 from eth_utils import encode_hex, decode_hex
 from rlp.sedes import Binary, big_endian_int, binary
 
-from eth.abc import VirtualMachineAPI
-from eth.chains.base import ChainAPI
+from eth._utils.address import generate_contract_address
+from eth.abc import (
+    BlockAPI,
+    BlockHeaderAPI,
+    ComputationAPI,
+    LogAPI,
+    MiningChainAPI,
+    ReceiptAPI,
+    SignedTransactionAPI,
+    StateAPI,
+    VirtualMachineAPI,
+)
+from eth.db.log_index import IndexedLog, LogIndexDB
+from eth.exceptions import TransactionNotFound
 from eth.vm.message import Message
 from eth.vm.spoof import SpoofTransaction
 
@@ -15,119 +28,297 @@ from web3.providers.base import BaseProvider
 from web3.types import RPCEndpoint, RPCResponse
 
 
-class Transaction(rlp.Serializable):
-    fields = [
-        ("nonce", big_endian_int),
-        ("gas_price", big_endian_int),
-        ("gas", big_endian_int),
-        ("to", Binary.fixed_length(20, allow_empty=True)),
-        ("value", big_endian_int),
-        ("data", binary),
-        ("v", big_endian_int),
-        ("r", big_endian_int),
-        ("s", big_endian_int),
-    ]
+class BlockProductionPolicy:
+    """
+    When the transactions sent with eth_sendRawTransaction are sealed into a block.
+
+    A block is sealed as soon as one of the enabled limits is reached: ``max_transactions``
+    pending transactions, ``interval`` seconds since the first pending transaction, or, with
+    ``fill_gas``, when the block has no room left for another transaction. Whatever the
+    policy, a transaction that would overflow the block gas limit starts a new block.
+    """
+
+    def __init__(self,
+                 max_transactions: Optional[int] = None,
+                 interval: Optional[float] = None,
+                 fill_gas: bool = False) -> None:
+        if max_transactions is None and interval is None and not fill_gas:
+            raise ValueError("A block production policy needs at least one limit")
+        if max_transactions is not None and max_transactions < 1:
+            raise ValueError(f"max_transactions must be positive, got {max_transactions}")
+        if interval is not None and interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+
+        self.max_transactions = max_transactions
+        self.interval = interval
+        self.fill_gas = fill_gas
+
+    @classmethod
+    def per_transaction(cls) -> 'BlockProductionPolicy':
+        return cls(max_transactions=1)
+
+    @classmethod
+    def every_n_transactions(cls, n: int) -> 'BlockProductionPolicy':
+        return cls(max_transactions=n)
+
+    @classmethod
+    def every_interval(cls, seconds: float) -> 'BlockProductionPolicy':
+        return cls(interval=seconds)
+
+    @classmethod
+    def gas_limit_fill(cls) -> 'BlockProductionPolicy':
+        return cls(fill_gas=True)
+
+
+# the cheapest transaction there is, a block with less gas left than this is full
+TX_BASE_GAS = 21000
+
+# methods which only read the chain; each call builds its own state from the head
+READ_ONLY_METHODS = frozenset((
+    'eth_call',
+    'eth_chainId',
+    'eth_gasPrice',
+    'eth_getCode',
+    'eth_getLogs',
+    'eth_getTransactionCount',
+    'eth_getTransactionReceipt',
+))
+
+
+def format_log(raw_log: Union[LogAPI, IndexedLog],
+               log_index: int,
+               tx_index: int,
+               tx_hash: Hash32,
+               block_hash: Hash32,
+               block_number: BlockNumber) -> Dict[str, Any]:
+    return {
+        'removed': False,
+        'logIndex': hex(log_index),
+        'transactionIndex': hex(tx_index),
+        'transactionHash': encode_hex(tx_hash),
+        'blockHash': encode_hex(block_hash),
+        'blockNumber': hex(block_number),
+        'address': encode_hex(raw_log.address),
+        'data': encode_hex(raw_log.data),
+        # each topic is a number
+        'topics': list(f"0x{topic:064x}" for topic in raw_log.topics),
+    }
+
+
+def format_receipt(tx: SignedTransactionAPI,
+                   tx_index: int,
+                   receipt: ReceiptAPI,
+                   previous_gas_used: int,
+                   first_log_index: int,
+                   header: BlockHeaderAPI) -> Dict[str, Any]:
+    base_fee = getattr(header, 'base_fee_per_gas', 0)
+    gas_price = min(tx.max_fee_per_gas, base_fee + tx.max_priority_fee_per_gas)
+
+    if tx.to:
+        contract_address = None
+    else:
+        contract_address = encode_hex(generate_contract_address(tx.sender, tx.nonce))
+
+    # receipts since byzantium have a status code instead of the state root
+    status = '0x0' if receipt.state_root == b'' else '0x1'
+
+    return {
+        'transactionHash': encode_hex(tx.hash),
+        'transactionIndex': hex(tx_index),
+        'blockHash': encode_hex(header.hash),
+        'blockNumber': hex(header.block_number),
+        'from': encode_hex(tx.sender),
+        'to': encode_hex(tx.to) if tx.to else None,
+        'cumulativeGasUsed': receipt.gas_used,
+        'gasUsed': hex(receipt.gas_used - previous_gas_used),
+        'contractAddress': contract_address,
+        'logs': [
+            format_log(raw_log, log_index, tx_index, tx.hash, header.hash, header.block_number)
+            for log_index, raw_log in enumerate(receipt.logs, first_log_index)
+        ],
+        'logsBloom': "{:0512x}".format(receipt.bloom),
+        'type': hex(tx.type_id or 0),
+        'status': status,
+        'effectiveGasPrice': hex(gas_price),
+    }
 
 
 class LocalWeb3(Web3):
-    def __init__(self, chain: ChainAPI):
-        super().__init__( provider=LocalWeb3Provider(chain) )
-
+    def __init__(self, chain: MiningChainAPI, block_policy: BlockProductionPolicy = None):
+        super().__init__( provider=LocalWeb3Provider(chain, block_policy) )
 
 
 class LocalWeb3Provider(BaseProvider):
 
-    def __init__(self, chain: ChainAPI):
+    def __init__(self, chain: MiningChainAPI, block_policy: BlockProductionPolicy = None):
         self.chain = chain
         self.vm: VirtualMachineAPI = chain.get_vm()
         self._id = 0
-        self.receipt_hashes: Deque = deque()
-        self.receipts: Dict = dict()
+        self.receipt_hashes: Deque[Hash32] = deque()
+        self.receipts: Dict[Hash32, Dict[str, Any]] = dict()
+        # older receipts and all the logs are read from the chain database. The blocks already
+        # in the chain are indexed here, before any request is served; then each sealed block
+        # is indexed under the write lock, and so are the blocks imported into the chain
+        # outside of the provider, before eth_getLogs reads from the index.
+        self.log_index = LogIndexDB(chain)
+        self.log_index.update()
+
+        if block_policy is None:
+            block_policy = BlockProductionPolicy.per_transaction()
+        self.block_policy = block_policy
+
+        # transactions applied to the pending block, with their receipt and computation
+        self.pending: List[Tuple[SignedTransactionAPI, ReceiptAPI, ComputationAPI]] = []
+        self._seal_timer: Optional[threading.Timer] = None
+        # every request holds one of these locks, and the interval timer holds the write lock
+        # to seal, so a block is never sealed in the middle of a request. They are the same
+        # lock here; the concurrent server replaces them with the two sides of its read-write
+        # lock, so that the methods in READ_ONLY_METHODS can run in parallel.
+        lock = threading.RLock()
+        self.write_lock: ContextManager[Any] = lock
+        self.read_lock: ContextManager[Any] = lock
+        # the VM at the pending header, whose state is forked for eth_call and eth_estimateGas
+        self._head_vm: Optional[VirtualMachineAPI] = None
 
     def isConnected(self) -> bool:
             return True
 
-
-    ###################################################################################
-    ##
-    ##  recent transaction receipts are cahced in memory(only keep latest 100 records)
-    ##
-    ###################################################################################
+    def fork_head_state(self) -> StateAPI:
+        """
+        A copy-on-write fork of the state at the pending header, to run calls on and drop.
+        The forks share the caches of one state, which is built again once the header changes.
+        """
+        header = self.chain.header
+        head_vm = self._head_vm
+        if head_vm is None or head_vm.get_header() is not header:
+            head_vm = self.chain.get_vm(header)
+            self._head_vm = head_vm
+        return head_vm.state.fork()
+
+    #
+    # recent transaction receipts are cached in memory (only the latest 100 are kept)
+    #
     def get_receipt(self, tx_hash):
         if isinstance(tx_hash, str):
             tx_hash = decode_hex(tx_hash)
 
         result = self.receipts.get(tx_hash)
+        if result is None:
+            result = self.get_receipt_from_chain(tx_hash)
         return result
 
+    def get_receipt_from_chain(self, tx_hash: Hash32) -> Optional[Dict[str, Any]]:
+        try:
+            block_number, tx_index = self.chain.get_canonical_transaction_index(tx_hash)
+        except TransactionNotFound:
+            return None
+
+        header = self.chain.get_canonical_block_header_by_number(block_number)
+        vm_class = self.chain.get_vm_class_for_block_number(block_number)
+        receipts = self.chain.chaindb.get_receipts(header, vm_class.get_receipt_builder())
+        receipt = receipts[tx_index]
+        tx = self.chain.get_canonical_transaction_by_index(block_number, tx_index)
+
+        first_log_index = sum(len(previous.logs) for previous in receipts[:tx_index])
+        previous_gas_used = receipts[tx_index - 1].gas_used if tx_index else 0
+        return format_receipt(tx, tx_index, receipt, previous_gas_used, first_log_index, header)
+
+    #
+    # pending transactions are sealed into a block according to the block_policy
+    #
+    def add_pending_transaction(self, tx: SignedTransactionAPI) -> ComputationAPI:
+        policy = self.block_policy
+        header = self.chain.header
+        if self.pending and header.gas_used + tx.gas > header.gas_limit:
+            # whatever the policy, a transaction that doesn't fit goes in the next block
+            self.seal_block()
 
-    def add_receipt(self, tx_index, tx, receipt, computation, block):
+        new_block, receipt, computation = self.chain.apply_transaction(tx)
+        self.pending.append((tx, receipt, computation))
+
+        if policy.max_transactions is not None and len(self.pending) >= policy.max_transactions:
+            self.seal_block()
+        elif policy.fill_gas and new_block.header.gas_limit - receipt.gas_used < TX_BASE_GAS:
+            self.seal_block()
+        elif policy.interval is not None and self._seal_timer is None:
+            self._seal_timer = threading.Timer(policy.interval, self._seal_on_timer)
+            self._seal_timer.daemon = True
+            self._seal_timer.start()
+
+        return computation
+
+    def seal_block(self) -> BlockAPI:
+        """
+        Mine the pending transactions into a block, and make their receipts available.
+        """
+        if self._seal_timer is not None:
+            self._seal_timer.cancel()
+            self._seal_timer = None
+
+        block = self.chain.mine_block()
+        self.log_index.update()
+        pending, self.pending = self.pending, []
+        previous_gas_used, first_log_index = 0, 0
+        for tx_index, (tx, receipt, computation) in enumerate(pending):
+            self.add_receipt(tx_index, tx, receipt, block, previous_gas_used, first_log_index)
+            previous_gas_used = receipt.gas_used
+            first_log_index += len(receipt.logs)
+        return block
+
+    def update_log_index(self) -> None:
+        """
+        Index the canonical blocks which are missing from the log index, e.g. the blocks
+        imported into the chain without going through the provider.
+        """
+        if not self.log_index.is_up_to_date():
+            with self.write_lock:
+                self.log_index.update()
+
+    def _seal_on_timer(self) -> None:
+        with self.write_lock:
+            # the block may have been sealed by another limit before we got the lock
+            if self._seal_timer is threading.current_thread():
+                self.seal_block()
+
+    def add_receipt(self,
+                    tx_index: int,
+                    tx: SignedTransactionAPI,
+                    receipt: ReceiptAPI,
+                    block: BlockAPI,
+                    previous_gas_used: int = 0,
+                    first_log_index: int = 0) -> None:
         hash_bytes = tx.hash
-        tx_hash = encode_hex(hash_bytes)
-        tx_index = hex(tx_index)
-        block_hash = encode_hex(block.hash)
-        block_num = hex(block.number)
-
-        logs = []
-        for i, raw_log in enumerate(receipt.logs):
-            # each topic is a number
-            topics = list(f"0x{topic:064x}" for topic in raw_log.topics)
-            logs.append({
-                'removed': False,
-                'logIndex': hex(i),
-                'transactionIndex': tx_index,
-                'transactionHash': tx_hash,
-                'blockHash': block_hash,
-                'blockNumber': block_num,
-                'address': encode_hex(raw_log.address),
-                'data': encode_hex(raw_log.data),
-                'topics': topics
-            })
-
-        receipt = {
-            'transactionHash': tx_hash,
-            'transactionIndex': tx_index,
-            'blockHash': block_hash,
-            'blockNumber': block_num,
-            'from': encode_hex(computation.msg.sender),
-            'to': encode_hex(computation.msg.to),
-            'cumulativeGasUsed': receipt.gas_used,
-            'gasUsed': hex(computation.get_gas_used()),
-            'contractAddress': encode_hex(computation.msg.storage_address),
-            'logs': logs,
-            'logsBloom': "{:0512x}".format(receipt.bloom),
-            # not sure what does the type and status field means, just use constants
-            'type': '0x0',
-            'status': '0x1',
-            'effectiveGasPrice': hex(block.header.base_fee_per_gas),
-        }
-
+        formatted_receipt = format_receipt(
+            tx, tx_index, receipt, previous_gas_used, first_log_index, block.header,
+        )
 
         self.receipt_hashes.append(hash_bytes)
-        self.receipts[hash_bytes] = receipt
+        self.receipts[hash_bytes] = formatted_receipt
 
         # remove oldest cache if size reaches limit.
         if len(self.receipt_hashes) > 100:
             oldest_hash = self.receipt_hashes.popleft()
             self.receipts.pop(oldest_hash, None)
 
-
-
     def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
         func = getattr(self, method, None)
         if not callable(func):
             raise NotImplementedError(f"(LocalWeb3Provider) method {method} did not implemented yet.")
 
-        response: RPCResponse = func(params)
-        return response
+        if method == 'eth_getLogs':
+            # indexing writes to the database, so it happens before the read lock is taken
+            self.update_log_index()
 
+        lock = self.read_lock if method in READ_ONLY_METHODS else self.write_lock
+        with lock:
+            response: RPCResponse = func(params)
+        return response
 
     @property
     def nextId(self):
         self._id += 1
         return self._id
 
-
     # params:  <class 'tuple'>:
     #   ({'from': '0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1', 'data': '0x*********'},)
     def eth_estimateGas(self, params: Any):
@@ -163,12 +354,9 @@ class LocalWeb3Provider(BaseProvider):
         )
         tx = SpoofTransaction(raw_tx, from_= from_)
 
-        # state = self.chain.get_vm().state
-        state = self.vm.state
-        snapshot = state.snapshot()
+        state = self.fork_head_state()
         # state.set_balance(from_, 2**256-1)
         computation = state.apply_transaction(tx)
-        state.revert(snapshot)
 
         if computation.is_success:
             gas_estimation: int = allow_gas - computation._gas_meter.gas_remaining
@@ -181,8 +369,6 @@ class LocalWeb3Provider(BaseProvider):
                 'error':( f"VM Exception while processing transaction ({error_type}):'{error_info}'" )
             }
 
-
-
     # request_data = {bytes} b'{"jsonrpc": "2.0", "method": "eth_gasPrice", "params": [], "id": 150}'
     # response = {dict} <class 'dict'>: {'jsonrpc': '2.0', 'id': 150, 'result': '0x3f2379d4'}
     def eth_gasPrice(self, params: Any):
@@ -191,37 +377,21 @@ class LocalWeb3Provider(BaseProvider):
         gas_price = self.vm.get_header().base_fee_per_gas
         return {'jsonrpc': '2.0', 'id': self.nextId, 'result': hex(gas_price)}
 
-
     def eth_chainId(self, params: Any):
         # params:
         #   <class 'tuple'>: ()
         # chainId = self.chain.chain_id
         return {'jsonrpc': '2.0', 'id': self.nextId, 'result': hex(1337)}
 
-
-
     # method = {str} 'eth_sendRawTransaction'
     # params = {list} <class 'list'>: ['0x******']
     def eth_sendRawTransaction(self, params: Any):
 
         detail = decode_hex(params[0])
-        tx = rlp.decode(detail, Transaction)
-        tx = self.vm.get_transaction_builder().new_transaction(
-            tx.nonce,
-            tx.gas_price,
-            tx.gas,
-            tx.to,
-            tx.value,
-            tx.data,
-            tx.v,
-            tx.r,
-            tx.s,
-        )
-        # self.chain.mine_block()
-        new_block, receipt, computation = self.chain.apply_transaction(tx)
-
-        self.chain.mine_block()
-        self.add_receipt(0, tx, receipt, computation, new_block)
+        # decoded by the VM, so that the transaction keeps the raw bytes for its hash
+        tx = self.vm.get_transaction_builder().decode(detail)
+        with self.write_lock:
+            computation = self.add_pending_transaction(tx)
 
         if computation.is_success:
             return {'jsonrpc': '2.0', 'id': self.nextId, 'result': encode_hex(tx.hash)}
@@ -233,7 +403,6 @@ class LocalWeb3Provider(BaseProvider):
                 'error':( f"VM Exception while processing transaction ({error_type}):'{error_info}'" )
             }
 
-
     # params = {list} <class 'list'>: ['0xc6c234b439a2d39ad08081ad5ea3e41f94335fb6e42511563bed5863f5b62f4a']
     # response = {dict} <class 'dict'>: {'jsonrpc': '2.0', 'id': 147, 'result': {'transactionHash':
     #   '0xc6c234b439a2d39ad08081ad5ea3e41f94335fb6e42511563bed5863f5b62f4a', 'transactionIndex': '0x0',
@@ -243,7 +412,6 @@ class LocalWeb3Provider(BaseProvider):
         # receipt = self.chain.get_transaction_receipt(decode_hex(hash))
         return {'jsonrpc': '2.0', 'id': self.nextId, 'result': self.get_receipt(hash)}
 
-
     # params = {list} <class 'list'>: ['0x90F8bf6A479f320ead074411a4B0e7944Ea8c9C1', 'latest']
     # response = {dict} <class 'dict'>: {'jsonrpc': '2.0', 'id': 148, 'result': '0x15'}
     def eth_getTransactionCount(self, params: Any):
@@ -251,13 +419,12 @@ class LocalWeb3Provider(BaseProvider):
         count = self.chain.get_vm().state.get_nonce(decode_hex(address))
         return {'jsonrpc': '2.0', 'id': self.nextId, 'result': hex(count)}
 
-
     # "params": [{"to": "0xb09bCc172050fBd4562da8b229Cf3E45Dc3045A6",
     #               "data": "0x70a0823100000000000000000000000090f8bf6a479f320ead074411a4b0e7944ea8c9c1"}, "latest"],
     # response = {dict} <class 'dict'>: {'jsonrpc': '2.0', 'id': 154,
     # 'result': '0x0000000000000000000000000000000000000000000014ea0fb67c9a6f140000'}
     def eth_call(self, params: Any):
-        param, state = params[0], self.chain.get_vm().state
+        param, state = params[0], self.fork_head_state()
         to = decode_hex(param["to"])
         data = decode_hex(param['data'])
         code = state.get_code(to)
@@ -275,10 +442,68 @@ class LocalWeb3Provider(BaseProvider):
         computation = state.computation_class.apply_computation( state,  message, transaction_context)
         return {'jsonrpc': '2.0', 'id': self.nextId, 'result': encode_hex(computation.output)}
 
+    # params = [{"fromBlock": "0x1", "toBlock": "latest", "address": "0x...", "topics": [...]}]
+    def eth_getLogs(self, params: Any) -> RPCResponse:
+        log_filter = params[0] if params else {}
+
+        if log_filter.get('blockHash') is not None:
+            block_hash = Hash32(decode_hex(log_filter['blockHash']))
+            header = self.chain.get_block_header_by_hash(block_hash)
+            if self.chain.get_canonical_block_hash(header.block_number) != block_hash:
+                return {'jsonrpc': '2.0', 'id': self.nextId, 'result': []}
+            from_block = to_block = header.block_number
+        else:
+            from_block = self._get_block_number(log_filter.get('fromBlock', 'latest'))
+            to_block = self._get_block_number(log_filter.get('toBlock', 'latest'))
+
+        addresses = log_filter.get('address') or []
+        if isinstance(addresses, str):
+            addresses = [addresses]
+
+        topics = []
+        for topic_filter in log_filter.get('topics') or []:
+            if isinstance(topic_filter, str):
+                topic_filter = [topic_filter]
+            # null or an empty list match any topic
+            topics.append([int(topic, 16) for topic in topic_filter] if topic_filter else None)
+
+        logs = self.log_index.get_logs(
+            from_block,
+            to_block,
+            [decode_hex(address) for address in addresses],
+            topics,
+            update=False,
+        )
+        result = [
+            format_log(
+                log,
+                log.log_index,
+                log.transaction_index,
+                log.transaction_hash,
+                log.block_hash,
+                log.block_number,
+            )
+            for log in logs
+        ]
+        return {'jsonrpc': '2.0', 'id': self.nextId, 'result': result}
+
+    def _get_block_number(self, block_tag: str) -> BlockNumber:
+        if block_tag == 'earliest':
+            return BlockNumber(0)
+        elif block_tag in ('latest', 'pending', 'safe', 'finalized'):
+            return self.chain.get_canonical_head().block_number
+        else:
+            return BlockNumber(int(block_tag, 16))
+
+    # seal the pending transactions now, or mine an empty block if there are none
+    def evm_mine(self, params: Any) -> RPCResponse:
+        with self.write_lock:
+            block = self.seal_block()
+        return {'jsonrpc': '2.0', 'id': self.nextId, 'result': encode_hex(block.hash)}
 
     def eth_getCode(self, params: Any):
         # print("getting code: ", params)
         addr = params[0]
         addr_bytes = decode_hex(addr)
-        code = self.chain.vm.state.get_code(addr_bytes)
+        code = self.chain.get_vm().state.get_code(addr_bytes)
         return { 'jsonrpc': '2.0', 'id': self.nextId, 'result': encode_hex(code) }
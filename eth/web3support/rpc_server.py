@@ -1,23 +1,33 @@
 import json
+import logging
+import threading
+import time
 import traceback
 from cgi import parse_header, parse_multipart
 from http.server import BaseHTTPRequestHandler
 from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Optional, Type
+from urllib.parse import parse_qs
 
-from eth.chains.base import Chain
-from eth.web3support.local import LocalWeb3Provider
+from eth.abc import MiningChainAPI
+from eth.web3support.local import BlockProductionPolicy, LocalWeb3Provider
+
+from web3.types import RPCEndpoint
 
 
 class Web3RPCServer:
-    def __init__(self, chain: Chain):
+    def __init__(self, chain: MiningChainAPI, block_policy: BlockProductionPolicy = None):
         global local_provider
         self.chain = chain
+        self.block_policy = block_policy
 
     def start(self, port):
         server_address = ('', port)
 
         server = HTTPServer(server_address, RequestHandler)
-        RequestHandler.local_provider = LocalWeb3Provider(self.chain)
+        RequestHandler.local_provider = LocalWeb3Provider(self.chain, self.block_policy)
 
         print("starting server at:", port)
         server.serve_forever()
@@ -75,7 +85,7 @@ def parse_POST(request):
         length = int(request.headers['content-length'])
         postvars = parse_qs(
             request.rfile.read(length),
-            keep_blank_values=1)
+            keep_blank_values=True)
     elif ctype == 'application/json':
         length = int(request.headers['content-length'])
         content = request.rfile.read(length).decode()
@@ -88,4 +98,257 @@ def parse_POST(request):
     else:
         postvars = {}
 
-    return postvars
\ No newline at end of file
+    return postvars
+
+
+#
+# Concurrent server: read-only methods are served in parallel, writes one at a time
+#
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+class _LockSide:
+    """
+    One side of a :class:`ReadWriteLock`, as a context manager.
+    """
+
+    def __init__(self, acquire: Callable[[], None], release: Callable[[], None]) -> None:
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self) -> None:
+        self.acquire()
+
+    def __exit__(self,
+                 exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.release()
+
+
+class ReadWriteLock:
+    """
+    Any number of readers or a single writer. Waiting writers block new readers, so a
+    steady stream of eth_call can't starve eth_sendRawTransaction. The thread holding
+    the write lock may acquire it again.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+
+        self.read_lock = _LockSide(self.acquire_read, self.release_read)
+        self.write_lock = _LockSide(self.acquire_write, self.release_write)
+
+    def acquire_read(self) -> None:
+        with self._condition:
+            while self._writer is not None or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._write_depth -= 1
+            if self._write_depth == 0:
+                self._writer = None
+                self._condition.notify_all()
+
+
+class RequestMetrics:
+    """
+    Request count and latency per JSON-RPC method.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # method -> [count, errors, total seconds, max seconds]
+        self._stats: Dict[str, List[float]] = {}
+
+    def record(self, method: str, seconds: float, is_error: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = [0, 0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += is_error
+            stats[2] += seconds
+            stats[3] = max(stats[3], seconds)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                method: {
+                    'count': int(count),
+                    'errors': int(errors),
+                    'mean_ms': total * 1000 / count,
+                    'max_ms': max_seconds * 1000,
+                }
+                for method, (count, errors, total, max_seconds) in self._stats.items()
+            }
+
+
+class JSONRPCDispatcher:
+    """
+    Dispatch decoded JSON-RPC payloads, single requests or batch arrays, to
+    :meth:`LocalWeb3Provider.make_request`.
+    """
+    logger = logging.getLogger('eth.web3support.rpc_server.JSONRPCDispatcher')
+
+    def __init__(self, local_provider: LocalWeb3Provider) -> None:
+        self.local_provider = local_provider
+        self.lock = ReadWriteLock()
+        # the provider takes the read or the write side for each request
+        local_provider.read_lock = self.lock.read_lock
+        local_provider.write_lock = self.lock.write_lock
+        self.metrics = RequestMetrics()
+
+    def handle_payload(self, payload: Any) -> Any:
+        """
+        Return the response to ``payload``, or None if there is nothing to send back
+        (only notifications were received).
+        """
+        if isinstance(payload, list):
+            if not payload:
+                return _error_response(None, INVALID_REQUEST, "empty batch")
+            responses = [self.handle_request(request) for request in payload]
+            return [response for response in responses if response is not None] or None
+        else:
+            return self.handle_request(payload)
+
+    def handle_request(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error_response(None, INVALID_REQUEST, "invalid request")
+
+        method = request['method']
+        params = request.get('params', [])
+
+        start = time.perf_counter()
+        try:
+            response = self._call(method, params)
+        except NotImplementedError as exc:
+            response = _error_response(request.get('id'), METHOD_NOT_FOUND, str(exc))
+        except Exception as exc:
+            self.logger.exception("Error while handling %s", method)
+            response = _error_response(request.get('id'), INTERNAL_ERROR, repr(exc))
+        self.metrics.record(method, time.perf_counter() - start, 'error' in response)
+
+        if 'id' not in request:
+            # a notification, which gets no response
+            return None
+
+        # the provider numbers its own responses, answer with the id of the request
+        response = dict(response)
+        response['id'] = request['id']
+        return response
+
+    def _call(self, method: str, params: Any) -> Dict[str, Any]:
+        return self.local_provider.make_request(RPCEndpoint(method), params)
+
+
+def _error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ConcurrentRequestHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connection open between requests
+    protocol_version = 'HTTP/1.1'
+    dispatcher: JSONRPCDispatcher = None
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('content-length', 0))
+        content = self.rfile.read(length)
+        try:
+            payload = json.loads(content)
+        except ValueError:
+            response = _error_response(None, PARSE_ERROR, "parse error")
+        else:
+            response = self.dispatcher.handle_payload(payload)
+        self._send_json(response)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip('/') == '/metrics':
+            self._send_json(self.dispatcher.metrics.as_dict())
+        else:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def _send_json(self, value: Any) -> None:
+        if value is None:
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = bytes(json.dumps(value), "utf-8")
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # disable log
+    def log_message(self, format: str, *args: Any) -> None:
+        return
+
+
+class ConcurrentWeb3RPCServer:
+    """
+    A JSON-RPC server which handles every connection in its own thread, with
+    keep-alive and batch requests. Read-only methods run concurrently, each against
+    a state built from the chain head; every other method runs alone. Per-method
+    latencies are served at ``GET /metrics``.
+    """
+    logger = logging.getLogger('eth.web3support.rpc_server.ConcurrentWeb3RPCServer')
+
+    def __init__(self, chain: MiningChainAPI, block_policy: BlockProductionPolicy = None) -> None:
+        self.chain = chain
+        self.dispatcher = JSONRPCDispatcher(LocalWeb3Provider(chain, block_policy))
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        return self.dispatcher.metrics
+
+    def make_server(self, host: str, port: int) -> HTTPServer:
+        handler_class = type(
+            'ConcurrentRequestHandler',
+            (ConcurrentRequestHandler,),
+            {'dispatcher': self.dispatcher},
+        )
+        return ThreadingHTTPServer((host, port), handler_class)
+
+    def start(self, port: int) -> None:
+        server = self.make_server('', port)
+        self.logger.info("starting concurrent server at: %d", port)
+        server.serve_forever()
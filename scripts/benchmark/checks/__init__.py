@@ -9,3 +9,19 @@ from .import_empty_blocks import (  # noqa: F401
 from .simple_value_transfers import (  # noqa: F401
     SimpleValueTransferBenchmark,
 )
+
+from .build_block_incrementally import (  # noqa: F401
+    BuildBlockIncrementallyBenchmark,
+)
+
+from .make_state_root import (  # noqa: F401
+    MakeStateRootBenchmark,
+)
+
+from .nested_calls import (  # noqa: F401
+    NestedCallsBenchmark,
+)
+
+from .validate_header_chain import (  # noqa: F401
+    ValidateHeaderChainBenchmark,
+)
@@ -0,0 +1,89 @@
+import logging
+
+from eth.chains.base import (
+    MiningChain,
+)
+from eth.tools.factories.transaction import (
+    new_transaction
+)
+
+from .base_benchmark import (
+    BaseBenchmark,
+)
+from _utils.chain_plumbing import (
+    ALL_VM,
+    DEFAULT_GENESIS_STATE,
+    FUNDED_ADDRESS,
+    FUNDED_ADDRESS_PRIVATE_KEY,
+    GENESIS_PARAMS,
+    SECOND_ADDRESS,
+    get_chain,
+)
+from _utils.reporting import (
+    DefaultStat,
+)
+
+# Enough gas for the largest block below
+GAS_LIMIT = 30000000
+
+
+class BuildBlockIncrementallyBenchmark(BaseBenchmark):
+    """
+    Build blocks of growing size one transaction at a time with
+    ``MiningChain.apply_transaction``, as a JSON-RPC server does. The time per
+    transaction (and so the tx / second column) should not depend on the block size.
+    """
+
+    def __init__(self, block_sizes=(50, 100, 200, 400, 800)) -> None:
+        self.block_sizes = block_sizes
+
+    @property
+    def name(self) -> str:
+        return 'Incremental block building'
+
+    def execute(self) -> DefaultStat:
+        total_stat = DefaultStat()
+        genesis_params = dict(GENESIS_PARAMS, gas_limit=GAS_LIMIT)
+
+        for num_tx in self.block_sizes:
+            for chain in get_chain(ALL_VM[-1], DEFAULT_GENESIS_STATE, genesis_params):
+                transactions = self.make_transactions(chain, num_tx)
+
+                value = self.as_timed_result(lambda: self.build_block(chain, transactions))
+
+                stat = DefaultStat(
+                    caption=f'{num_tx} tx per block',
+                    total_blocks=1,
+                    total_tx=num_tx,
+                    total_seconds=value.duration,
+                    total_gas=value.wrapped_value.header.gas_used,
+                )
+                total_stat = total_stat.cumulate(stat)
+                self.print_stat_line(stat)
+
+        return total_stat
+
+    def make_transactions(self, chain: MiningChain, num_tx: int):
+        vm = chain.get_vm()
+        nonce = vm.state.get_nonce(FUNDED_ADDRESS)
+        return [
+            new_transaction(
+                vm=vm,
+                private_key=FUNDED_ADDRESS_PRIVATE_KEY,
+                from_=FUNDED_ADDRESS,
+                to=SECOND_ADDRESS,
+                amount=100,
+                data=b'',
+                nonce=nonce + index,
+            )
+            for index in range(num_tx)
+        ]
+
+    def build_block(self, chain: MiningChain, transactions):
+        for tx in transactions:
+            _, _, computation = chain.apply_transaction(tx)
+            computation.raise_if_error()
+
+        block = chain.mine_block()
+        logging.debug(f'Built block {block}')
+        return block
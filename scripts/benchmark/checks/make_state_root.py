@@ -0,0 +1,73 @@
+import itertools
+
+from eth.db.account import (
+    AccountDB,
+)
+from eth.db.atomic import (
+    AtomicDB,
+)
+
+from .base_benchmark import (
+    BaseBenchmark,
+)
+from _utils.reporting import (
+    DefaultStat,
+)
+
+
+# (caption, accounts changed per block, slots written per account, number of blocks)
+STATE_ROOT_SHAPES = (
+    # The shape of DOSContractSstoreUint64Benchmark: a single contract appends to an
+    # array, writing the array length and one packed slot in every block
+    ('1 acct x 2 slots', 1, 2, 1000),
+    ('100 acct x 10 slots', 100, 10, 20),
+    ('1000 acct x 4 slots', 1000, 4, 5),
+)
+
+
+class MakeStateRootBenchmark(BaseBenchmark):
+    """
+    Write storage slots and persist the state, as at the end of every block, to measure
+    the computation of the storage and state roots, without running any EVM code. Each
+    storage write is counted as a transaction.
+    """
+
+    def __init__(self, shapes=STATE_ROOT_SHAPES) -> None:
+        self.shapes = shapes
+
+    @property
+    def name(self) -> str:
+        return 'State root computation'
+
+    def execute(self) -> DefaultStat:
+        total_stat = DefaultStat()
+
+        for caption, num_accounts, num_slots, num_blocks in self.shapes:
+            value = self.as_timed_result(
+                lambda: self.persist_blocks(num_accounts, num_slots, num_blocks)
+            )
+
+            stat = DefaultStat(
+                caption=caption,
+                total_blocks=num_blocks,
+                total_tx=num_accounts * num_slots * num_blocks,
+                total_seconds=value.duration,
+            )
+            total_stat = total_stat.cumulate(stat)
+            self.print_stat_line(stat)
+
+        return total_stat
+
+    def persist_blocks(self, num_accounts: int, num_slots: int, num_blocks: int) -> None:
+        db = AtomicDB()
+        state_root = AccountDB(db).state_root
+        slot_counter = itertools.count()
+
+        for _ in range(num_blocks):
+            account_db = AccountDB(db, state_root)
+            for account_index in range(num_accounts):
+                address = account_index.to_bytes(20, 'big')
+                for slot in itertools.islice(slot_counter, num_slots):
+                    account_db.set_storage(address, slot, slot + 1)
+            account_db.persist()
+            state_root = account_db.state_root
@@ -0,0 +1,95 @@
+from eth.db.account import (
+    AccountDB,
+)
+from eth.db.atomic import (
+    AtomicDB,
+)
+
+from .base_benchmark import (
+    BaseBenchmark,
+)
+from _utils.reporting import (
+    DefaultStat,
+)
+
+
+CONTRACT_ADDRESS = b'\xcc' * 20
+
+# (caption, call depth, calls at the deepest level, whether the outermost call reverts)
+CALL_TREE_SHAPES = (
+    # A chain of calls down to the maximum call depth, e.g. a router going through pools
+    ('1024-deep calls', 1024, 1, False),
+    ('1024-deep calls, reverted', 1024, 1, True),
+    # One call making many calls in a row, e.g. a multicall
+    ('1024 calls in a row', 1, 1024, False),
+    ('1024 calls in a row, reverted', 1, 1024, True),
+)
+
+
+class NestedCallsBenchmark(BaseBenchmark):
+    """
+    Record, commit and discard the checkpoints of a tree of calls on the account database,
+    the way the computations of nested CALLs do, to measure the journals without running
+    any EVM code. Every call writes the balance of its own account and a slot of a shared
+    contract, so the account journal and a storage journal both take every checkpoint.
+    Each call tree is counted as a block, and each call as a transaction.
+    """
+
+    def __init__(self, shapes=CALL_TREE_SHAPES, num_trees: int = 20) -> None:
+        self.shapes = shapes
+        self.num_trees = num_trees
+
+    @property
+    def name(self) -> str:
+        return 'Nested call checkpoints'
+
+    def execute(self) -> DefaultStat:
+        total_stat = DefaultStat()
+
+        for caption, depth, num_leaf_calls, is_reverted in self.shapes:
+            account_db = AccountDB(AtomicDB())
+            value = self.as_timed_result(
+                lambda: self.apply_call_trees(account_db, depth, num_leaf_calls, is_reverted)
+            )
+
+            stat = DefaultStat(
+                caption=caption,
+                total_blocks=self.num_trees,
+                total_tx=(depth + num_leaf_calls - 1) * self.num_trees,
+                total_seconds=value.duration,
+            )
+            total_stat = total_stat.cumulate(stat)
+            self.print_stat_line(stat)
+
+        return total_stat
+
+    def apply_call_trees(self,
+                         account_db: AccountDB,
+                         depth: int,
+                         num_leaf_calls: int,
+                         is_reverted: bool) -> None:
+        for _ in range(self.num_trees):
+            checkpoints = []
+            for level in range(depth):
+                checkpoints.append(account_db.record())
+                self.make_call(account_db, level)
+
+            for leaf_call in range(depth, depth + num_leaf_calls - 1):
+                checkpoint = account_db.record()
+                self.make_call(account_db, leaf_call)
+                account_db.commit(checkpoint)
+
+            outer_checkpoint = checkpoints[0]
+            for checkpoint in reversed(checkpoints[1:]):
+                account_db.commit(checkpoint)
+            if is_reverted:
+                account_db.discard(outer_checkpoint)
+            else:
+                account_db.commit(outer_checkpoint)
+            account_db.lock_changes()
+
+    @staticmethod
+    def make_call(account_db: AccountDB, call_index: int) -> None:
+        address = call_index.to_bytes(20, 'big')
+        account_db.set_balance(address, account_db.get_balance(address) + 1)
+        account_db.set_storage(CONTRACT_ADDRESS, call_index, call_index + 1)
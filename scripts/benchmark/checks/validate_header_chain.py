@@ -0,0 +1,81 @@
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+from eth.chains.mainnet import (
+    MAINNET_GENESIS_HEADER,
+    MainnetChain,
+)
+from eth.db.atomic import (
+    AtomicDB,
+)
+
+from .base_benchmark import (
+    BaseBenchmark,
+)
+from _utils.reporting import (
+    DefaultStat,
+)
+
+
+# (caption, executor class, number of workers)
+EXECUTORS = (
+    ('serial', None, 0),
+    ('4 threads', ThreadPoolExecutor, 4),
+    ('4 processes', ProcessPoolExecutor, 4),
+)
+
+
+class ValidateHeaderChainBenchmark(BaseBenchmark):
+    """
+    Validate a chain of mainnet headers after the genesis, as in a headers-first sync, in the
+    calling thread and then in worker pools. Each header is counted as a block.
+
+    The headers aren't mined, so their seals are not checked: this measures the checks of
+    the header rules, and the cost of sending the headers to the workers.
+    """
+
+    def __init__(self, num_headers: int = 100000, executors=EXECUTORS) -> None:
+        self.num_headers = num_headers
+        self.executors = executors
+
+    @property
+    def name(self) -> str:
+        return 'Header chain validation'
+
+    def execute(self) -> DefaultStat:
+        total_stat = DefaultStat()
+        headers = self.build_headers()
+
+        for caption, executor_class, num_workers in self.executors:
+            chain = MainnetChain.from_genesis_header(AtomicDB(), MAINNET_GENESIS_HEADER)
+            if executor_class is None:
+                value = self.as_timed_result(lambda: self.validate_headers(chain, headers))
+            else:
+                with executor_class(num_workers) as executor:
+                    chain.header_validation_executor = executor
+                    value = self.as_timed_result(lambda: self.validate_headers(chain, headers))
+
+            stat = DefaultStat(
+                caption=caption,
+                total_blocks=self.num_headers,
+                total_seconds=value.duration,
+            )
+            total_stat = total_stat.cumulate(stat)
+            self.print_stat_line(stat)
+
+        return total_stat
+
+    def build_headers(self):
+        headers = []
+        parent = MAINNET_GENESIS_HEADER
+        for _ in range(self.num_headers):
+            vm_class = MainnetChain.get_vm_class_for_block_number(parent.block_number + 1)
+            parent = vm_class.create_header_from_parent(parent, timestamp=parent.timestamp + 15)
+            headers.append(parent)
+        return tuple(headers)
+
+    @staticmethod
+    def validate_headers(chain: MainnetChain, headers) -> None:
+        chain.validate_chain(MAINNET_GENESIS_HEADER, headers, seal_check_random_sample_rate=0)
@@ -8,9 +8,13 @@ from eth._utils.version import (
 )
 
 from checks import (
+    BuildBlockIncrementallyBenchmark,
     ImportEmptyBlocksBenchmark,
+    MakeStateRootBenchmark,
     MineEmptyBlocksBenchmark,
+    NestedCallsBenchmark,
     SimpleValueTransferBenchmark,
+    ValidateHeaderChainBenchmark,
 )
 
 from checks.erc20_interact import (
@@ -79,6 +83,10 @@ def run() -> None:
         ImportEmptyBlocksBenchmark(),
         SimpleValueTransferBenchmark(TO_EXISTING_ADDRESS_CONFIG),
         SimpleValueTransferBenchmark(TO_NON_EXISTING_ADDRESS_CONFIG),
+        BuildBlockIncrementallyBenchmark(),
+        MakeStateRootBenchmark(),
+        NestedCallsBenchmark(),
+        ValidateHeaderChainBenchmark(),
         ERC20DeployBenchmark(),
         ERC20TransferBenchmark(),
         ERC20ApproveBenchmark(),
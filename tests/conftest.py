@@ -21,6 +21,8 @@ from eth.consensus import PowConsensus
 from eth.consensus.noproof import NoProofConsensus
 from eth.db.atomic import AtomicDB
 from eth.rlp.headers import BlockHeader
+from eth.vm.base import VM as BaseVM
+from eth.vm.computation import BaseComputation
 from eth.vm.forks import (
     FrontierVM,
     HomesteadVM,
@@ -35,6 +37,7 @@ from eth.vm.forks import (
     LondonVM,
     ArrowGlacierVM,
 )
+from eth.vm.stack import IntStack
 
 #
 #  Setup DEBUG2 level logging.
@@ -261,6 +264,40 @@ def chain_without_block_validation_from_vm(request, base_db, genesis_state):
 
 def pytest_addoption(parser):
     parser.addoption("--fork", type=str, required=False)
+    parser.addoption(
+        "--superinstructions",
+        action="store_true",
+        help="Execute with fused opcode sequences enabled in every computation class",
+    )
+    parser.addoption(
+        "--gas-blocks",
+        action="store_true",
+        help="Execute with static gas charged per gas block in every computation class",
+    )
+    parser.addoption(
+        "--int-stack",
+        action="store_true",
+        help="Execute with the int-only IntStack as the stack of every computation class",
+    )
+    parser.addoption(
+        "--prefetch-accesses",
+        action="store_true",
+        help="Prefetch the accounts and slots the transactions are known to use in every VM",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _int_stack(request, monkeypatch):
+    # Every computation class inherits its stack class from the base class, unless it was
+    # configured otherwise, so this swaps the stack in every fork at once.
+    if request.config.getoption('int_stack'):
+        monkeypatch.setattr(BaseComputation, 'stack_class', IntStack)
+
+
+@pytest.fixture(autouse=True)
+def _prefetch_accesses(request, monkeypatch):
+    if request.config.getoption('prefetch_accesses'):
+        monkeypatch.setattr(BaseVM, 'prefetch_transaction_accesses', True)
 
 
 @to_tuple
@@ -1,6 +1,7 @@
 import pytest
 
 from eth.chains.base import MiningChain
+from eth.db.trie import make_trie_root_and_nodes
 from eth.tools.factories.transaction import (
     new_transaction
 )
@@ -72,3 +73,34 @@ def test_building_block_incrementally_with_multiple_transactions(
 
     for expected, actual in zip(txns, mined_block.transactions):
         assert expected == actual
+
+
+def test_building_block_incrementally_matches_full_tries(
+        chain,
+        funded_address,
+        funded_address_private_key):
+    for index in range(12):
+        if index == 5:
+            # replacing the pending header must not lose the pending transactions
+            chain.set_header_timestamp(chain.header.timestamp + 1)
+
+        tx = new_transaction(
+            chain.get_vm(),
+            from_=funded_address,
+            to=ADDRESS_1010,
+            private_key=funded_address_private_key,
+        )
+        new_block, _, computation = chain.apply_transaction(tx)
+        computation.raise_if_error()
+
+    receipts = new_block.get_receipts(chain.chaindb)
+    assert len(new_block.transactions) == len(receipts) == 12
+
+    tx_root, _ = make_trie_root_and_nodes(new_block.transactions)
+    receipt_root, _ = make_trie_root_and_nodes(receipts)
+    assert new_block.header.transaction_root == tx_root
+    assert new_block.header.receipt_root == receipt_root
+
+    mined_block = chain.mine_block()
+    assert mined_block.transactions == new_block.transactions
+    assert mined_block.get_receipts(chain.chaindb) == receipts
@@ -0,0 +1,117 @@
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+import threading
+
+import pytest
+
+from eth_utils import ValidationError
+
+from eth.chains.base import MiningChain
+from eth.tools.builder.chain import api
+from eth.tools.factories.transaction import new_transaction
+
+
+RECIPIENT = b'\xbb' * 20
+
+
+def _build_chain(funded_address, funded_address_initial_balance):
+    return api.build(
+        MiningChain,
+        api.london_at(0),
+        api.disable_pow_check(),
+        api.genesis(params={'gas_limit': 3141592}, state={
+            funded_address: {
+                'balance': funded_address_initial_balance,
+                'nonce': 0,
+                'code': b'',
+                'storage': {},
+            },
+        }),
+    )
+
+
+@pytest.fixture
+def source_chain(funded_address, funded_address_initial_balance, funded_address_private_key):
+    chain = _build_chain(funded_address, funded_address_initial_balance)
+    for block_index in range(8):
+        for _ in range(block_index % 3):
+            tx = new_transaction(
+                chain.get_vm(),
+                funded_address,
+                RECIPIENT,
+                private_key=funded_address_private_key,
+            )
+            chain.apply_transaction(tx)
+        chain.mine_block()
+    return chain
+
+
+@pytest.fixture
+def blocks(source_chain):
+    return tuple(
+        source_chain.get_canonical_block_by_number(block_number)
+        for block_number in range(1, source_chain.get_canonical_head().block_number + 1)
+    )
+
+
+@pytest.fixture
+def chain(funded_address, funded_address_initial_balance):
+    return _build_chain(funded_address, funded_address_initial_balance)
+
+
+def _is_import_running():
+    return any(
+        thread.name == 'eth.chains.base.Chain.import_blocks'
+        for thread in threading.enumerate()
+    )
+
+
+def test_import_blocks(chain, source_chain, blocks, monkeypatch):
+    vm_class = chain.get_vm_class(blocks[0].header)
+    monkeypatch.setattr(vm_class, 'min_parallel_sender_recoveries', 1)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        monkeypatch.setattr(vm_class, 'sender_recovery_executor', executor)
+        results = tuple(chain.import_blocks(blocks))
+
+    assert tuple(result.imported_block for result in results) == blocks
+    assert tuple(result.new_canonical_blocks for result in results) == tuple(
+        (block,) for block in blocks
+    )
+    assert chain.get_canonical_head() == source_chain.get_canonical_head()
+    assert chain.header.parent_hash == blocks[-1].hash
+    assert not _is_import_running()
+
+
+def test_import_blocks_stops_at_invalid_block(chain, blocks):
+    invalid_header = blocks[3].header.copy(timestamp=blocks[2].header.timestamp)
+    invalid_blocks = blocks[:3] + (blocks[3].copy(header=invalid_header),) + blocks[4:]
+
+    imported_blocks = []
+    with pytest.raises(ValidationError, match='timestamp'):
+        for result in chain.import_blocks(invalid_blocks):
+            imported_blocks.append(result.imported_block)
+
+    assert tuple(imported_blocks) == blocks[:3]
+    assert chain.get_canonical_head() == blocks[2].header
+    assert not _is_import_running()
+
+
+def test_import_blocks_backpressure(chain, blocks):
+    chain.max_pending_imports = 2
+    read_blocks = []
+
+    def read_blocks_from_source():
+        for block in blocks:
+            read_blocks.append(block)
+            yield block
+
+    results = chain.import_blocks(read_blocks_from_source())
+    assert next(results).imported_block == blocks[0]
+    # one block is imported, two are waiting and one is waiting for room in the queue
+    assert len(read_blocks) <= 4 < len(blocks)
+
+    # stopping the import stops the worker
+    results.close()
+    assert not _is_import_running()
+    assert chain.get_canonical_head() == blocks[0].header
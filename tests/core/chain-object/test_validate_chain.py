@@ -0,0 +1,111 @@
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+import pytest
+
+from eth_utils import ValidationError
+
+from eth.chains.base import Chain
+from eth.consensus.pow import PowConsensus
+from eth.db.atomic import AtomicDB
+from eth.vm.forks import (
+    FrontierVM,
+    HomesteadVM,
+)
+
+
+# The VM classes must be picklable, to be sent to the workers of a ProcessPoolExecutor
+TwoForkChain = Chain.configure(
+    __name__='TwoForkChain',
+    vm_configuration=((0, FrontierVM), (5, HomesteadVM)),
+    chain_id=1337,
+)
+
+GENESIS_PARAMS = {
+    'difficulty': 131072,
+    'gas_limit': 3141592,
+    'timestamp': 1500000000,
+}
+
+
+def _build_headers(genesis, num_headers):
+    headers = []
+    parent = genesis
+    for _ in range(num_headers):
+        vm_class = TwoForkChain.get_vm_class_for_block_number(parent.block_number + 1)
+        parent = vm_class.create_header_from_parent(parent, timestamp=parent.timestamp + 15)
+        headers.append(parent)
+    return tuple(headers)
+
+
+@pytest.fixture
+def chain():
+    return TwoForkChain.from_genesis(AtomicDB(), GENESIS_PARAMS)
+
+
+@pytest.fixture
+def genesis(chain):
+    return chain.get_canonical_head()
+
+
+@pytest.fixture
+def headers(genesis):
+    return _build_headers(genesis, 12)
+
+
+@pytest.fixture(params=(None, ThreadPoolExecutor, ProcessPoolExecutor))
+def header_validation_executor(request, chain):
+    if request.param is None:
+        yield None
+    else:
+        with request.param(2) as executor:
+            chain.header_validation_executor = executor
+            chain.min_parallel_header_validations = 0
+            chain.header_validation_chunk_size = 2
+            yield executor
+
+
+def test_validate_chain(chain, genesis, headers, header_validation_executor):
+    chain.validate_chain(genesis, headers, seal_check_random_sample_rate=0)
+
+    invalid_header = headers[7].copy(extra_data=b'\x00' * 33)
+    with pytest.raises(ValidationError, match="is not a valid child"):
+        chain.validate_chain(genesis, headers[:7] + (invalid_header,), 0)
+
+    with pytest.raises(ValidationError, match="Invalid header chain"):
+        chain.validate_chain(genesis, headers[:7] + headers[8:], 0)
+
+
+@pytest.mark.parametrize(
+    'seal_check_random_sample_rate, expected_num_seal_checks',
+    ((1, 12), (3, 4), (0, 0)),
+)
+def test_validate_chain_seal_check_sampling(
+        chain,
+        genesis,
+        headers,
+        monkeypatch,
+        seal_check_random_sample_rate,
+        expected_num_seal_checks):
+
+    checked_headers = []
+    monkeypatch.setattr(
+        PowConsensus,
+        'validate_seal',
+        lambda self, header: checked_headers.append(header),
+    )
+    built_vms = []
+    get_vm = chain.get_vm
+    monkeypatch.setattr(chain, 'get_vm', lambda header: built_vms.append(header) or get_vm(header))
+
+    chain.header_validation_executor = ThreadPoolExecutor(2)
+    chain.min_parallel_header_validations = 0
+    with chain.header_validation_executor:
+        chain.validate_chain(genesis, headers, seal_check_random_sample_rate)
+
+    assert len(checked_headers) == expected_num_seal_checks
+    assert set(checked_headers) <= set(headers)
+    # a single VM is built for each fork
+    assert built_vms == [headers[0], headers[4]]
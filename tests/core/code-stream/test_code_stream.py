@@ -13,6 +13,7 @@ from eth_utils import ValidationError
 from eth_utils.toolz import drop
 
 from eth.vm import opcode_values
+from eth.vm.code_analysis import get_code_analysis
 from eth.vm.code_stream import CodeStream
 from eth.tools._utils.slow_code_stream import SlowCodeStream
 
@@ -234,3 +235,44 @@ def test_new_vs_reference_code_stream_read_during_iter(read_idx, read_len, bytec
             assert latest.program_counter >= len(reference)
         else:
             assert latest.program_counter == reference.program_counter
+
+
+def test_code_analysis_is_shared_between_streams_of_same_code():
+    code = b'\x60\x01\x5b\x00'
+    assert get_code_analysis(code) is get_code_analysis(bytes(code))
+    assert CodeStream(code)._valid_opcodes is CodeStream(bytes(code))._valid_opcodes
+
+
+@pytest.mark.parametrize(
+    'code_bytes, expected_values, expected_pc',
+    (
+        (b'\x60\x02', (2,), 2),
+        (b'\x61\x01\x02\x60\x03', (0x0102, 3), 5),
+        # PUSH data running past the end of the code is right-padded with zero bytes
+        (b'\x62\x01', (0x010000,), 4),
+        (b'\x7f' + b'\xff' * 32, (2 ** 256 - 1,), 33),
+    ),
+)
+def test_read_push_int_returns_decoded_push_data(code_bytes, expected_values, expected_pc):
+    code_stream = CodeStream(code_bytes)
+    values = []
+    for opcode in code_stream:
+        if opcode_values.PUSH1 <= opcode <= opcode_values.PUSH32:
+            values.append(code_stream.read_push_int(opcode - opcode_values.PUSH1 + 1))
+    assert tuple(values) == expected_values
+    assert code_stream.program_counter == expected_pc
+
+
+@given(
+    read_idx=st.integers(min_value=0, max_value=130),
+    read_len=st.integers(min_value=1, max_value=32),
+    bytecode=st.binary(max_size=128),
+)
+def test_read_push_int_vs_reference_code_stream_read(read_idx, read_len, bytecode):
+    reference = SlowCodeStream(bytecode)
+    latest = CodeStream(bytecode)
+    reference.program_counter = read_idx
+    latest.program_counter = read_idx
+    expected = int.from_bytes(reference.read(read_len).ljust(read_len, b'\x00'), 'big')
+    assert latest.read_push_int(read_len) == expected
+    assert latest.program_counter == read_idx + read_len
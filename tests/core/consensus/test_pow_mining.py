@@ -1,14 +1,23 @@
+from collections import OrderedDict
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 import pytest
 import random
 import threading
 import time
 
+from eth_utils import ValidationError
+from pyethash import mkcache_bytes
+
 from eth.chains.base import MiningChain
 from eth.chains.mainnet import MAINNET_VMS
 from eth.consensus.pow import (
     CACHE_MAX_ITEMS,
     EPOCH_LENGTH,
     check_pow,
+    check_pow_batch,
     get_cache,
 )
 from eth.tools.mining import POWMiningMixin
@@ -63,6 +72,42 @@ def test_pow_across_epochs(ropsten_epoch_headers):
     _concurrently_run_to_completion(check, CACHE_MAX_ITEMS + 5)
 
 
+@pytest.fixture
+def ethash_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('ETHASH_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr('eth.consensus.pow.cache_by_epoch', OrderedDict())
+    return tmp_path
+
+
+def test_cache_dir(ethash_cache_dir, monkeypatch):
+    cache = get_cache(EPOCH_LENGTH + 1)
+    assert (ethash_cache_dir / 'cache-1').exists()
+    assert cache[:] == mkcache_bytes(EPOCH_LENGTH)
+
+    # another process reads the cache from the file, instead of generating it again
+    monkeypatch.setattr('eth.consensus.pow.cache_by_epoch', OrderedDict())
+    monkeypatch.setattr('eth.consensus.pow._make_cache', None)
+    assert get_cache(EPOCH_LENGTH)[:] == cache[:]
+
+
+@pytest.mark.parametrize('executor_class', (None, ThreadPoolExecutor, ProcessPoolExecutor))
+def test_check_pow_batch(ropsten_epoch_headers, ethash_cache_dir, executor_class):
+    if executor_class is None:
+        executor = None
+    else:
+        executor = executor_class(2)
+
+    headers = tuple(ropsten_epoch_headers)
+    check_pow_batch(headers, executor)
+
+    invalid_header = headers[-1].copy(nonce=b'\x00' * 8)
+    with pytest.raises(ValidationError):
+        check_pow_batch(headers[:-1] + (invalid_header,), executor)
+
+    if executor is not None:
+        executor.shutdown()
+
+
 @pytest.mark.parametrize(
     'base_vm_class',
     MAINNET_VMS,
@@ -72,3 +72,44 @@ def test_read_returns_correct_bytes_from_memory(memory32):
     assert memory32.read(start_position=5, size=4) == b'1010'
     assert memory32.read(start_position=6, size=4) != b'1010'
     assert memory32.read(start_position=5, size=5) != b'1010'
+
+
+def test_extend_grows_capacity_geometrically(memory):
+    memory.extend(start_position=0, size=32)
+    memory.extend(start_position=32, size=32)
+    memory.extend(start_position=64, size=32)
+
+    assert len(memory) == 96
+    assert len(memory._bytes) == 128
+    assert memory.read_bytes(start_position=0, size=128) == bytes(128)
+
+
+def test_extend_while_a_read_view_is_alive(memory32):
+    memory32.write(start_position=0, size=4, value=b'1010')
+    view = memory32.read(start_position=0, size=4)
+
+    memory32.extend(start_position=32, size=32)
+    memory32.write(start_position=0, size=4, value=b'0101')
+
+    assert len(memory32) == 64
+    assert view == b'1010'
+    assert memory32.read_bytes(start_position=0, size=4) == b'0101'
+
+
+def test_write_rejects_values_beyond_memory_size_within_capacity(memory):
+    memory.extend(start_position=0, size=64)
+    memory.extend(start_position=0, size=96)
+    assert len(memory._bytes) > 96
+
+    with pytest.raises(ValidationError):
+        memory.write(start_position=94, size=4, value=b'1010')
+
+
+def test_word_and_byte_access(memory):
+    memory.extend(start_position=0, size=64)
+
+    memory.write_word(start_position=1, value=2**256 - 1)
+    memory.write_byte(start_position=0, value=0x42)
+
+    assert memory.read_bytes(start_position=0, size=34) == b'\x42' + b'\xff' * 32 + b'\x00'
+    assert memory.read_word(start_position=0) == int.from_bytes(b'\x42' + b'\xff' * 31, 'big')
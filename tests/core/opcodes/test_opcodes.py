@@ -33,6 +33,7 @@ from eth.vm import (
     opcode_values
 )
 from eth.vm.chain_context import ChainContext
+from eth.vm.computation import BaseComputation
 from eth.vm.forks import (
     FrontierVM,
     HomesteadVM,
@@ -50,6 +51,10 @@ from eth.vm.message import (
     Message,
 )
 from eth.vm.spoof import SpoofTransaction
+from eth.vm.stack import (
+    IntStack,
+    Stack,
+)
 
 
 NORMALIZED_ADDRESS_A = "0x0f572e5295c57f15886f9b263e2f6d2d6c7b5ec6"
@@ -170,16 +175,23 @@ def test_base_fee():
 
 
 @pytest.mark.parametrize(
-    'opcode_value, expected',
+    'stack_class, opcode_value, expected',
     (
-        (opcode_values.COINBASE, b'\0' * 20),
-        # (opcode_values.TIMESTAMP, 1556826898),
-        (opcode_values.NUMBER, 0),
-        (opcode_values.DIFFICULTY, 17179869184),
-        (opcode_values.GASLIMIT, 5000),
+        (Stack, opcode_values.COINBASE, b'\0' * 20),
+        # (Stack, opcode_values.TIMESTAMP, 1556826898),
+        (Stack, opcode_values.NUMBER, 0),
+        (Stack, opcode_values.DIFFICULTY, 17179869184),
+        (Stack, opcode_values.GASLIMIT, 5000),
+        # IntStack holds every item as an int
+        (IntStack, opcode_values.COINBASE, 0),
+        (IntStack, opcode_values.NUMBER, 0),
+        (IntStack, opcode_values.DIFFICULTY, 17179869184),
+        (IntStack, opcode_values.GASLIMIT, 5000),
     )
 )
-def test_nullary_opcodes(VM, opcode_value, expected):
+def test_nullary_opcodes(VM, monkeypatch, stack_class, opcode_value, expected):
+    # the stack is set explicitly, so that the expectations also hold under --int-stack
+    monkeypatch.setattr(BaseComputation, 'stack_class', stack_class)
     computation = run_general_computation(VM)
     computation.opcodes[opcode_value](computation)
 
@@ -189,15 +201,20 @@ def test_nullary_opcodes(VM, opcode_value, expected):
 
 
 @pytest.mark.parametrize(
-    'val1, expected',
+    'stack_class, val1, expected',
     (
-        (0, b''),
-        (1, b''),
-        (255, b''),
-        (256, b''),
+        (Stack, 0, b''),
+        (Stack, 1, b''),
+        (Stack, 255, b''),
+        (Stack, 256, b''),
+        (IntStack, 0, 0),
+        (IntStack, 1, 0),
+        (IntStack, 255, 0),
+        (IntStack, 256, 0),
     )
 )
-def test_blockhash(VM, val1, expected):
+def test_blockhash(VM, monkeypatch, stack_class, val1, expected):
+    monkeypatch.setattr(BaseComputation, 'stack_class', stack_class)
     computation = run_general_computation(VM)
     computation.stack_push_int(val1)
     computation.opcodes[opcode_values.BLOCKHASH](computation)
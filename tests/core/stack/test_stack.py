@@ -5,6 +5,7 @@ from eth_utils import (
 )
 
 from eth.vm.stack import (
+    IntStack,
     Stack,
 )
 from eth.exceptions import (
@@ -18,6 +19,16 @@ def stack():
     return Stack()
 
 
+@pytest.fixture
+def int_stack():
+    return IntStack()
+
+
+@pytest.fixture(params=(Stack, IntStack))
+def any_stack(request):
+    return request.param()
+
+
 @pytest.mark.parametrize(
     ("value,is_valid"),
     (
@@ -154,3 +165,104 @@ def test_swap_raises_InsufficientStack_appropriately(stack):
 def test_dup_raises_InsufficientStack_appropriately(stack):
     with pytest.raises(InsufficientStack):
         stack.dup(0)
+
+
+@pytest.mark.parametrize(
+    ("value,is_valid"),
+    (
+        (-1, False),
+        (0, True),
+        (2**256 - 1, True),
+        (2**256, False),
+        (b'\x00\x09', True),
+        (b'\x01' * 33, False),
+    )
+)
+def test_int_stack_only_pushes_valid_values(int_stack, value, is_valid):
+    push = int_stack.push_bytes if isinstance(value, bytes) else int_stack.push_int
+    if is_valid:
+        push(value)
+        assert len(int_stack) == 1
+    else:
+        with pytest.raises(ValidationError):
+            push(value)
+        assert len(int_stack) == 0
+
+
+@pytest.mark.parametrize(
+    ("value, push_method, pop_method, expect_result"),
+    (
+        (1, 'push_int', 'pop_ints', (1, )),
+        (1, 'push_int', 'pop_any', (1, )),
+        (1, 'push_int', 'pop_bytes', (b'\x01', )),
+        (1, 'push_int', 'pop1_int', 1),
+        (1, 'push_int', 'pop1_any', 1),
+        (1, 'push_int', 'pop1_bytes', b'\x01'),
+        (b'\x00\x09', 'push_bytes', 'pop_ints', (9, )),
+        (b'\x00\x09', 'push_bytes', 'pop_any', (9, )),
+        (b'\x00\x09', 'push_bytes', 'pop_bytes', (b'\x09', )),
+        (b'\x00\x09', 'push_bytes', 'pop1_int', 9),
+        (b'\x00\x09', 'push_bytes', 'pop1_any', 9),
+        (b'\x00\x09', 'push_bytes', 'pop1_bytes', b'\x09'),
+    )
+)
+def test_int_stack_canonicalizes_to_ints(int_stack, value, push_method, pop_method, expect_result):
+    getattr(int_stack, push_method)(value)
+
+    pop = getattr(int_stack, pop_method)
+
+    if '1' in pop_method:
+        assert pop() == expect_result
+    else:
+        assert pop(1) == expect_result
+
+
+def test_int_stack_does_not_exceed_1024_items(int_stack):
+    for num in range(1024):
+        int_stack.push_int_unchecked(num)
+    assert len(int_stack) == 1024
+
+    for push in (int_stack.push_int, int_stack.push_int_unchecked, int_stack.push_bytes):
+        with pytest.raises(FullStack):
+            push(1)
+    with pytest.raises(FullStack):
+        int_stack.dup(1)
+
+
+def test_pop_multiple_ints(any_stack):
+    for num in range(4):
+        any_stack.push_int(num)
+
+    assert any_stack.pop2_ints() == (3, 2)
+    assert any_stack.pop_ints(2) == (1, 0)
+
+    for num in range(4):
+        any_stack.push_int_unchecked(num)
+
+    assert any_stack.pop3_ints() == (3, 2, 1)
+    assert len(any_stack) == 1
+
+    with pytest.raises(InsufficientStack):
+        any_stack.pop2_ints()
+    with pytest.raises(InsufficientStack):
+        any_stack.pop3_ints()
+
+
+def test_int_stack_swap_and_dup(int_stack):
+    for num in range(5):
+        int_stack.push_int(num)
+    int_stack.swap(3)
+    assert int_stack.values == [(int, value) for value in (0, 4, 2, 3, 1)]
+    int_stack.dup(5)
+    assert int_stack.values == [(int, value) for value in (0, 4, 2, 3, 1, 0)]
+
+    with pytest.raises(InsufficientStack):
+        int_stack.swap(6)
+    with pytest.raises(InsufficientStack):
+        int_stack.dup(7)
+
+
+@pytest.mark.parametrize('method, args', (('pop1_int', ()), ('swap', (0, )), ('dup', (0, ))))
+def test_int_stack_raises_InsufficientStack_when_empty(int_stack, method, args):
+    with pytest.raises(InsufficientStack):
+        getattr(int_stack, method)(*args)
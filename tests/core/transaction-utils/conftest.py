@@ -69,3 +69,13 @@ def txn_fixture(request):
 @pytest.fixture(params=range(len(TYPED_TRANSACTION_FIXTURES)))
 def typed_txn_fixture(request):
     return TYPED_TRANSACTION_FIXTURES[request.param]
+
+
+@pytest.fixture
+def all_txn_fixtures():
+    return TRANSACTION_FIXTURES
+
+
+@pytest.fixture
+def all_typed_txn_fixtures():
+    return TYPED_TRANSACTION_FIXTURES
@@ -135,6 +135,7 @@ def test_EIP2930_receipt_decode(is_legacy, is_rlp_encoded):
 
         re_encoded = receipt.encode()
         assert encoded == re_encoded
+        assert receipt.encode() is re_encoded
 
     assert receipt.state_root == expected_vals['state_root']
     assert receipt.gas_used == expected_vals['gas_used']
@@ -1,3 +1,4 @@
+from eth_hash.auto import keccak
 from eth_utils import (
     ValidationError,
     decode_hex,
@@ -128,3 +129,24 @@ def test_EIP2930_transaction_inferred_attributes(typed_txn_fixture, is_rlp_encod
     assert transaction.hash == decode_hex(typed_txn_fixture['hash'])
     assert transaction.intrinsic_gas == typed_txn_fixture['intrinsic_gas']
     assert transaction.get_intrinsic_gas() == typed_txn_fixture['intrinsic_gas']
+
+
+@pytest.mark.parametrize('vm_class', [BerlinVM, LondonVM])
+def test_transaction_keeps_encoding_and_hash(vm_class, all_txn_fixtures, all_typed_txn_fixtures):
+    transaction_builder = vm_class.get_transaction_builder()
+    for fixture in all_txn_fixtures + all_typed_txn_fixtures:
+        signed_txn = decode_hex(fixture['signed'])
+        transaction = transaction_builder.decode(signed_txn)
+
+        # the bytes it was decoded from are kept, to be stored and hashed as they are
+        assert transaction.encode() == signed_txn
+        assert transaction.encode() is transaction.encode()
+        assert transaction.hash == keccak(signed_txn)
+        assert transaction.hash is transaction.hash
+
+        # a copy is encoded once, and then keeps its encoding
+        transaction_copy = transaction.copy(nonce=transaction.nonce + 1)
+        encoded_copy = transaction_copy.encode()
+        assert encoded_copy != signed_txn
+        assert transaction_copy.encode() is encoded_copy
+        assert transaction_copy.hash == keccak(encoded_copy)
@@ -1,3 +1,8 @@
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
 import pytest
 
 import rlp
@@ -22,9 +27,13 @@ from eth.vm.forks.spurious_dragon.transactions import (
 from eth.vm.forks.berlin.transactions import (
     BerlinTransactionBuilder,
 )
+from eth.vm.forks.london.transactions import (
+    LondonTransactionBuilder,
+)
 
 from eth._utils.transactions import (
     extract_transaction_sender,
+    recover_transaction_senders,
     validate_transaction_signature,
 )
 
@@ -128,3 +137,55 @@ def test_unsigned_to_eip155_signed_transaction(txn_fixture, transaction_class):
 
     assert is_same_address(signed_txn.sender, key.public_key.to_canonical_address())
     assert signed_txn.chain_id == txn_fixture['chainId']
+
+
+@pytest.mark.parametrize('executor_class', (ThreadPoolExecutor, ProcessPoolExecutor))
+def test_recover_transaction_senders(executor_class, all_txn_fixtures, all_typed_txn_fixtures):
+    transactions = [
+        rlp.decode(decode_hex(fixture['signed']), sedes=SpuriousDragonTransaction)
+        for fixture in all_txn_fixtures
+    ] + [
+        BerlinTransactionBuilder.deserialize(decode_hex(fixture['signed']))
+        for fixture in all_typed_txn_fixtures
+    ]
+    london_key = keys.PrivateKey(b'\x01' * 32)
+    transactions.append(LondonTransactionBuilder.new_unsigned_dynamic_fee_transaction(
+        1, 0, 1, 2, 21000, b'\xaa' * 20, 0, b'', (),
+    ).as_signed_transaction(london_key))
+    invalid_transaction = transactions[0].copy(r=0)
+    transactions.append(invalid_transaction)
+
+    with executor_class(max_workers=2) as executor:
+        recover_transaction_senders(transactions, executor, chunk_size=2)
+
+    for transaction in transactions[:-1]:
+        assert 'sender' in vars(transaction)
+        assert transaction.sender == extract_transaction_sender(transaction)
+        assert transaction.is_signature_valid
+    assert transactions[-2].sender == london_key.public_key.to_canonical_address()
+    assert 'sender' not in vars(invalid_transaction)
+    assert not invalid_transaction.is_signature_valid
+
+
+def test_validate_checks_signature_unless_recovered_senders_verified_it(monkeypatch):
+    key = keys.PrivateKey(b'\x01' * 32)
+    transaction = LondonTransactionBuilder.new_unsigned_dynamic_fee_transaction(
+        1, 0, 1, 2, 21000, b'\xaa' * 20, 0, b'', (),
+    ).as_signed_transaction(key)
+    checks = []
+    check_signature_validity = transaction.check_signature_validity
+    monkeypatch.setattr(
+        type(transaction),
+        'check_signature_validity',
+        lambda self: checks.append(check_signature_validity()),
+    )
+
+    # reading the sender doesn't verify the signature
+    assert transaction.sender == key.public_key.to_canonical_address()
+    transaction.validate()
+    assert len(checks) == 1
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        recover_transaction_senders([transaction], executor)
+    transaction.validate()
+    assert len(checks) == 1
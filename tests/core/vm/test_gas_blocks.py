@@ -0,0 +1,123 @@
+import pytest
+
+from eth_utils import (
+    big_endian_to_int,
+    decode_hex,
+)
+
+from eth.consensus import ConsensusContext
+from eth.db.atomic import AtomicDB
+from eth.db.chain import ChainDB
+from eth.vm.chain_context import ChainContext
+from eth.vm.code_analysis import CodeAnalysis
+from eth.vm.forks import (
+    BerlinVM,
+    LondonVM,
+)
+from eth.vm.message import Message
+
+
+SENDER = b'\x11' * 20
+RECIPIENT = b'\x22' * 20
+
+# PUSH1 0x03
+# 0x02: JUMPDEST; PUSH1 0x01; SWAP1; SUB; DUP1; PUSH1 0x02; JUMPI
+# PUSH1 0x20; PUSH1 0x00; MSTORE; GAS; PUSH1 0x00; SSTORE; PUSH1 0x20; PUSH1 0x00; RETURN
+LOOP = '0x6003 5b600190038060025 7 60206000525a600055 60206000f3'
+
+# PUSH1 0x01; PUSH1 0x02; ADD -- the code ends inside a gas block
+ENDS_IN_GAS_BLOCK = '0x6001600201'
+
+# PUSH1 0x01; ADD; PUSH1 0x02
+STACK_UNDERFLOW = '0x6001016002'
+
+# PUSH1 0x01; INVALID; PUSH1 0x02
+INVALID_OPCODE = '0x6001fe6002'
+
+# PUSH1 0x05; JUMP; STOP; STOP; STOP
+BAD_JUMP = '0x600556000000'
+
+# PUSH1 0x01; BASEFEE; PUSH1 0x02 -- BASEFEE is only valid since London
+BASEFEE = '0x6001486002'
+
+
+def _code(hex_code):
+    return decode_hex(hex_code.replace(' ', ''))
+
+
+def _run(vm_class, use_gas_blocks, code, gas):
+    db = AtomicDB()
+    genesis_header = vm_class.create_genesis_header(difficulty=1, timestamp=0)
+    vm = vm_class(genesis_header, ChainDB(db), ChainContext(1), ConsensusContext(db))
+    state = vm.state
+
+    computation_class = state.computation_class.configure(
+        __name__='GasBlockComputation',
+        use_gas_blocks=use_gas_blocks,
+    )
+    message = Message(
+        gas=gas,
+        to=RECIPIENT,
+        sender=SENDER,
+        value=0,
+        data=b'',
+        code=code,
+    )
+    transaction_context = state.get_transaction_context_class()(1, SENDER)
+    return computation_class.apply_computation(state, message, transaction_context)
+
+
+def _outcome(computation):
+    stack = [
+        big_endian_to_int(value) if isinstance(value, bytes) else value
+        for _, value in computation._stack.values
+    ]
+    error = type(computation.error) if computation.is_error else None
+    return (
+        error,
+        computation.output,
+        computation.get_gas_remaining(),
+        computation.code.program_counter,
+        stack,
+    )
+
+
+def test_code_analysis_finds_gas_blocks():
+    analysis = CodeAnalysis(_code(LOOP))
+    assert analysis.gas_blocks == {
+        0: _code('0x60'),
+        2: _code('0x5b6090038060 57'),
+        11: _code('0x6060'),
+        17: _code('0x60'),
+        20: _code('0x6060'),
+    }
+
+
+def test_gas_block_costs_stop_at_opcodes_without_static_cost():
+    analysis = CodeAnalysis(_code(BASEFEE))
+    static_gas_costs = bytearray([0xff]) * 256
+    static_gas_costs[0x60] = 3
+    assert analysis.get_gas_block_costs(bytes(static_gas_costs)) == {0: (3, 1)}
+
+    static_gas_costs[0x48] = 2
+    assert analysis.get_gas_block_costs(bytes(static_gas_costs)) == {0: (8, 3)}
+
+
+@pytest.mark.parametrize('vm_class', (BerlinVM, LondonVM))
+@pytest.mark.parametrize(
+    'code',
+    (
+        LOOP,
+        ENDS_IN_GAS_BLOCK,
+        STACK_UNDERFLOW,
+        INVALID_OPCODE,
+        BAD_JUMP,
+        BASEFEE,
+    ),
+)
+@pytest.mark.parametrize('gas', tuple(range(0, 130, 2)) + (3000, 30000))
+def test_gas_blocks_match_opcode_by_opcode_metering(vm_class, code, gas):
+    expected = _run(vm_class, False, _code(code), gas)
+    actual = _run(vm_class, True, _code(code), gas)
+
+    assert _outcome(actual) == _outcome(expected)
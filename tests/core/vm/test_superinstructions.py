@@ -0,0 +1,120 @@
+import pytest
+
+from eth_utils import (
+    big_endian_to_int,
+    decode_hex,
+)
+
+from eth.consensus import ConsensusContext
+from eth.db.atomic import AtomicDB
+from eth.db.chain import ChainDB
+from eth.vm.chain_context import ChainContext
+from eth.vm.code_analysis import CodeAnalysis
+from eth.vm.forks import LondonVM
+from eth.vm.forks.london.computation import LondonComputation
+from eth.vm.message import Message
+
+
+FusedLondonComputation = LondonComputation.configure(
+    __name__='FusedLondonComputation',
+    use_superinstructions=True,
+)
+
+SENDER = b'\x11' * 20
+RECIPIENT = b'\x22' * 20
+
+# PUSH1 0x80; PUSH1 0x40; MSTORE; PUSH1 0x20; PUSH1 0x40; RETURN
+FREE_MEMORY_POINTER = '0x60806040526020 6040f3'
+
+# PUSH1 0x00; CALLDATALOAD; PUSH1 0xe0; SHR
+# DUP1; PUSH4 0xa9059cbb; EQ; PUSH1 0x1b; JUMPI
+# DUP1; PUSH4 0x70a08231; EQ; PUSH1 0x1f; JUMPI
+# STOP
+# 0x1b: JUMPDEST; PUSH1 0x01; STOP
+# 0x1f: JUMPDEST; PUSH1 0x02; SWAP1; POP; PUSH1 0x00; MSTORE; PUSH1 0x20; PUSH1 0x00; RETURN
+DISPATCHER = (
+    '0x600035' '60e01c'
+    '8063a9059cbb14601b57'
+    '806370a08231146 01f57'
+    '00'
+    '5b600100'
+    '5b60029050600052 60206000f3'
+)
+
+# PUSH1 0x00; DUP1; PUSH4 0x00000000; EQ; PUSH1 0x0c; JUMPI; STOP -- jumps onto a STOP
+BAD_DESTINATION = '0x6000 8063000000001460 0c57 00'
+
+# Same as above, but jumps onto a 0x5b byte that is PUSH1 data
+DESTINATION_IN_PUSH_DATA = '0x6000 8063000000001460 0e57 00 605b 00'
+
+# PUSH1 0x01; SWAP1; POP -- not enough stack items for the SWAP1
+SHORT_STACK = '0x60019050'
+
+
+def _code(hex_code):
+    return decode_hex(hex_code.replace(' ', ''))
+
+
+def _setup_state():
+    db = AtomicDB()
+    genesis_header = LondonVM.create_genesis_header(difficulty=1, timestamp=0)
+    vm = LondonVM(genesis_header, ChainDB(db), ChainContext(1), ConsensusContext(db))
+    return vm.state
+
+
+def _run(computation_class, code, data, gas):
+    state = _setup_state()
+    message = Message(
+        gas=gas,
+        to=RECIPIENT,
+        sender=SENDER,
+        value=0,
+        data=data,
+        code=code,
+    )
+    transaction_context = state.get_transaction_context_class()(1, SENDER)
+    return computation_class.apply_computation(state, message, transaction_context)
+
+
+def _outcome(computation):
+    stack = [
+        big_endian_to_int(value) if isinstance(value, bytes) else value
+        for _, value in computation._stack.values
+    ]
+    error = type(computation.error) if computation.is_error else None
+    return (
+        error,
+        computation.output,
+        computation.get_gas_remaining(),
+        computation.code.program_counter,
+        stack,
+    )
+
+
+def test_code_analysis_finds_superinstructions():
+    analysis = CodeAnalysis(_code(DISPATCHER))
+    assert analysis.superinstructions == {
+        6: (0xa9059cbb, 0x1b, 16),
+        16: (0x70a08231, 0x1f, 26),
+        34: (36,),
+    }
+
+
+@pytest.mark.parametrize(
+    'code, data',
+    (
+        (FREE_MEMORY_POINTER, b''),
+        (DISPATCHER, decode_hex('0xa9059cbb')),
+        (DISPATCHER, decode_hex('0x70a08231')),
+        (DISPATCHER, decode_hex('0xdeadbeef')),
+        (BAD_DESTINATION, b''),
+        (DESTINATION_IN_PUSH_DATA, b''),
+        (SHORT_STACK, b''),
+    ),
+)
+@pytest.mark.parametrize('gas', tuple(range(0, 120, 3)) + (1000000,))
+def test_superinstructions_match_opcode_by_opcode_execution(code, data, gas):
+    expected = _run(LondonComputation, _code(code), data, gas)
+    actual = _run(FusedLondonComputation, _code(code), data, gas)
+
+    assert _outcome(actual) == _outcome(expected)
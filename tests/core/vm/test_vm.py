@@ -1,3 +1,7 @@
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+
 import pytest
 
 import rlp
@@ -115,6 +119,63 @@ def test_import_block(chain, funded_address, funded_address_private_key):
     assert block.transactions == (tx, )
 
 
+def test_import_block_recovers_senders_in_parallel(chain,
+                                                   funded_address,
+                                                   funded_address_private_key):
+    vm = chain.get_vm()
+    nonce = vm.state.get_nonce(funded_address)
+    transactions = [
+        new_transaction(vm, funded_address, b'\xaa' * 20, 1, funded_address_private_key, nonce=n)
+        for n in range(nonce, nonce + 3)
+    ]
+    new_block, _, _ = chain.build_block_with_transactions(transactions)
+
+    # decode the block again, so the senders are not cached yet
+    block = rlp.decode(rlp.encode(new_block), sedes=vm.get_block_class())
+    assert not any('sender' in vars(transaction) for transaction in block.transactions)
+
+    validation_vm = chain.get_vm(chain.create_header_from_parent(chain.get_canonical_head()))
+    validation_vm.min_parallel_sender_recoveries = 2
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        validation_vm.sender_recovery_executor = executor
+        imported_block, _ = validation_vm.import_block(block)
+
+    assert imported_block.transactions == new_block.transactions
+    assert imported_block.header.gas_used == new_block.header.gas_used
+    assert all('sender' in vars(transaction) for transaction in block.transactions)
+
+
+def test_import_block_prefetches_accesses(chain,
+                                          funded_address,
+                                          funded_address_private_key,
+                                          monkeypatch):
+    vm = chain.get_vm()
+    recipient = b'\xaa' * 20
+    tx = new_transaction(vm, funded_address, recipient, 1, funded_address_private_key)
+    new_block, _, _ = chain.build_block_with_transactions([tx])
+    block = rlp.decode(rlp.encode(new_block), sedes=vm.get_block_class())
+
+    validation_vm = chain.get_vm(chain.create_header_from_parent(chain.get_canonical_head()))
+    prefetched = []
+    monkeypatch.setattr(
+        type(validation_vm.state),
+        'prefetch',
+        lambda state, accounts: prefetched.append(tuple(accounts)),
+    )
+
+    validation_vm.prefetch_transaction_accesses = False
+    validation_vm.import_block(block)
+    assert prefetched == []
+
+    validation_vm = chain.get_vm(chain.create_header_from_parent(chain.get_canonical_head()))
+    validation_vm.prefetch_transaction_accesses = True
+    imported_block, _ = validation_vm.import_block(block)
+
+    assert imported_block.header.gas_used == new_block.header.gas_used
+    assert len(prefetched) == 1
+    assert {address for address, _ in prefetched[0]} >= {funded_address, recipient}
+
+
 def test_validate_header_succeeds_but_pow_fails(pow_consensus_chain, noproof_consensus_chain):
     # Create two "structurally valid" blocks that are not backed by PoW
     block1 = noproof_consensus_chain.mine_block()
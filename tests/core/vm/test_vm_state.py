@@ -180,3 +180,20 @@ def test_lock_state(state):
 
     state.lock_changes()
     assert state.get_storage(ADDRESS, 1, from_journal=False) == 2
+
+
+def test_apply_transaction_on_fork(chain_without_block_validation, funded_address):
+    vm = chain_without_block_validation.get_vm()
+    state = vm.state
+    tx = new_transaction(vm, from_=funded_address, to=ADDRESS, amount=10)
+    funded_balance = state.get_balance(funded_address)
+
+    fork = state.fork()
+    assert fork.block_number == state.block_number
+    computation = fork.apply_transaction(tx)
+    assert computation.is_success
+    assert fork.get_balance(ADDRESS) == 10
+
+    assert state.get_balance(ADDRESS) == 0
+    assert state.get_balance(funded_address) == funded_balance
+    assert state.get_nonce(funded_address) == 0
@@ -0,0 +1,23 @@
+import pytest
+
+from eth import constants
+from eth.chains.base import MiningChain
+from eth.consensus.noproof import NoProofConsensus
+from eth.vm.forks import LondonVM
+
+
+@pytest.fixture
+def chain(base_db, genesis_state):
+    klass = MiningChain.configure(
+        __name__='LocalProviderTestChain',
+        vm_configuration=(
+            (constants.GENESIS_BLOCK_NUMBER, LondonVM.configure(consensus_class=NoProofConsensus)),
+        ),
+        chain_id=1337,
+    )
+    genesis_params = {
+        'difficulty': constants.GENESIS_DIFFICULTY,
+        'gas_limit': 3141592,
+        'timestamp': 1501851927,
+    }
+    return klass.from_genesis(base_db, genesis_params, genesis_state)
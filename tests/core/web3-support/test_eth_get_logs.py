@@ -0,0 +1,232 @@
+import pytest
+
+from eth_utils import (
+    encode_hex,
+    int_to_big_endian,
+)
+from eth_utils.toolz import assoc
+
+from eth.tools.factories.transaction import new_transaction
+
+pytest.importorskip('web3')
+
+from eth.web3support.local import (  # noqa: E402
+    BlockProductionPolicy,
+    LocalWeb3Provider,
+)
+
+
+# PUSH1 0x00; CALLDATALOAD; PUSH1 0x00; PUSH1 0x00; LOG1 -- log the first word of calldata
+LOG_CALLDATA = bytes.fromhex('600035' '6000' '6000' 'a1')
+# PUSH1 0x00; CALLDATALOAD; PUSH1 0x20; CALLDATALOAD; PUSH1 0x00; PUSH1 0x00; LOG2
+# -- log the second word of calldata, then the first
+LOG_TWO_TOPICS = bytes.fromhex('600035' '602035' '6000' '6000' 'a2')
+
+CONTRACT_A = b'\xaa' * 20
+CONTRACT_B = b'\xbb' * 20
+
+
+@pytest.fixture
+def genesis_state(base_genesis_state):
+    state = assoc(
+        base_genesis_state,
+        CONTRACT_A,
+        {'balance': 0, 'nonce': 0, 'code': LOG_CALLDATA, 'storage': {}},
+    )
+    return assoc(
+        state,
+        CONTRACT_B,
+        {'balance': 0, 'nonce': 0, 'code': LOG_TWO_TOPICS, 'storage': {}},
+    )
+
+
+def _topic_hex(topic):
+    return f"0x{topic:064x}"
+
+
+def _new_transaction(chain, funded_address, private_key, to, *topics):
+    return new_transaction(
+        chain.get_vm(),
+        funded_address,
+        to,
+        private_key=private_key,
+        data=b''.join(int_to_big_endian(topic).rjust(32, b'\0') for topic in topics),
+    )
+
+
+@pytest.fixture
+def send(funded_address, funded_address_private_key):
+    def send(provider, to, *topics):
+        tx = _new_transaction(
+            provider.chain, funded_address, funded_address_private_key, to, *topics,
+        )
+        provider.make_request('eth_sendRawTransaction', [encode_hex(tx.encode())])
+        return tx
+    return send
+
+
+@pytest.fixture
+def provider(chain, send):
+    """
+    A provider with these blocks:
+
+    1. A(1)
+    2. B(7, 1), A(2)
+    3. no logs
+    4. A(3)
+    """
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_n_transactions(2))
+    send(provider, CONTRACT_A, 1)
+    provider.make_request('evm_mine', [])
+    send(provider, CONTRACT_B, 1, 7)
+    send(provider, CONTRACT_A, 2)
+    provider.make_request('evm_mine', [])
+    send(provider, CONTRACT_A, 3)
+    provider.make_request('evm_mine', [])
+    assert chain.get_canonical_head().block_number == 4
+    return provider
+
+
+def _get_logs(provider, **log_filter):
+    response = provider.make_request('eth_getLogs', [log_filter])
+    return response['result']
+
+
+def _summary(logs):
+    return [
+        (int(log['blockNumber'], 16), log['address'], tuple(int(t, 16) for t in log['topics']))
+        for log in logs
+    ]
+
+
+A = encode_hex(CONTRACT_A)
+B = encode_hex(CONTRACT_B)
+
+
+def test_get_logs_result_format(chain, provider):
+    block = chain.get_canonical_block_by_number(2)
+    logs = _get_logs(provider, fromBlock='0x2', toBlock='0x2')
+
+    assert logs == [
+        {
+            'removed': False,
+            'logIndex': '0x0',
+            'transactionIndex': '0x0',
+            'transactionHash': encode_hex(block.transactions[0].hash),
+            'blockHash': encode_hex(block.hash),
+            'blockNumber': '0x2',
+            'address': B,
+            'data': '0x',
+            'topics': [_topic_hex(7), _topic_hex(1)],
+        },
+        {
+            'removed': False,
+            # the index of the log in the block, not in the transaction
+            'logIndex': '0x1',
+            'transactionIndex': '0x1',
+            'transactionHash': encode_hex(block.transactions[1].hash),
+            'blockHash': encode_hex(block.hash),
+            'blockNumber': '0x2',
+            'address': A,
+            'data': '0x',
+            'topics': [_topic_hex(2)],
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    'log_filter, expected',
+    (
+        ({}, [(4, A, (3, ))]),
+        ({'fromBlock': 'earliest'}, [(1, A, (1, )), (2, B, (7, 1)), (2, A, (2, )), (4, A, (3, ))]),
+        ({'fromBlock': '0x2', 'toBlock': '0x3'}, [(2, B, (7, 1)), (2, A, (2, ))]),
+        ({'fromBlock': '0x3', 'toBlock': '0x3'}, []),
+        ({'fromBlock': '0x1', 'toBlock': 'latest'}, [
+            (1, A, (1, )), (2, B, (7, 1)), (2, A, (2, )), (4, A, (3, )),
+        ]),
+        # blocks past the head are ignored
+        ({'fromBlock': '0x4', 'toBlock': '0x10'}, [(4, A, (3, ))]),
+        ({'fromBlock': '0x5', 'toBlock': '0x10'}, []),
+    ),
+)
+def test_get_logs_block_range(provider, log_filter, expected):
+    assert _summary(_get_logs(provider, **log_filter)) == expected
+
+
+def test_get_logs_by_block_hash(chain, provider):
+    block_hash = encode_hex(chain.get_canonical_block_hash(2))
+    assert _summary(_get_logs(provider, blockHash=block_hash)) == [
+        (2, B, (7, 1)), (2, A, (2, )),
+    ]
+
+
+@pytest.mark.parametrize(
+    'log_filter, expected',
+    (
+        ({'address': B}, [(2, B, (7, 1))]),
+        ({'address': [A]}, [(1, A, (1, )), (2, A, (2, )), (4, A, (3, ))]),
+        ({'address': [A, B]}, [(1, A, (1, )), (2, B, (7, 1)), (2, A, (2, )), (4, A, (3, ))]),
+        ({'address': encode_hex(b'\xcc' * 20)}, []),
+        ({'topics': [_topic_hex(1)]}, [(1, A, (1, ))]),
+        ({'topics': [[_topic_hex(1), _topic_hex(3)]]}, [(1, A, (1, )), (4, A, (3, ))]),
+        # null matches any topic, but the log must have a topic at that position
+        ({'topics': [None, _topic_hex(1)]}, [(2, B, (7, 1))]),
+        ({'topics': [[], _topic_hex(1)]}, [(2, B, (7, 1))]),
+        ({'topics': [None, None, None]}, []),
+        ({'address': A, 'topics': [_topic_hex(7)]}, []),
+        ({'address': B, 'topics': [_topic_hex(7)]}, [(2, B, (7, 1))]),
+    ),
+)
+def test_get_logs_filters(provider, log_filter, expected):
+    log_filter = assoc(log_filter, 'fromBlock', 'earliest')
+    assert _summary(_get_logs(provider, **log_filter)) == expected
+
+
+def _fail_update():
+    raise AssertionError("eth_getLogs must not index blocks")
+
+
+def test_get_logs_reads_the_index_without_updating_it(provider, send, monkeypatch):
+    # each sealed block is indexed when it is sealed, under the write lock, so there is
+    # nothing left to index when the logs are read
+    log_index_update = provider.log_index.update
+    monkeypatch.setattr(provider.log_index, 'update', _fail_update)
+    assert len(_get_logs(provider, fromBlock='earliest')) == 4
+
+    monkeypatch.setattr(provider.log_index, 'update', log_index_update)
+    send(provider, CONTRACT_B, 8, 8)
+    provider.make_request('evm_mine', [])
+    monkeypatch.setattr(provider.log_index, 'update', _fail_update)
+    assert _summary(_get_logs(provider, fromBlock='0x5')) == [(5, B, (8, 8))]
+
+
+def test_provider_indexes_existing_blocks(
+        chain,
+        funded_address,
+        funded_address_private_key,
+        monkeypatch):
+    # blocks mined before the provider was created
+    for topic in (1, 2):
+        tx = _new_transaction(chain, funded_address, funded_address_private_key, CONTRACT_A, topic)
+        chain.apply_transaction(tx)
+        chain.mine_block()
+
+    provider = LocalWeb3Provider(chain)
+    monkeypatch.setattr(provider.log_index, 'update', _fail_update)
+    assert _summary(_get_logs(provider, fromBlock='earliest')) == [
+        (1, A, (1, )), (2, A, (2, )),
+    ]
+
+
+def test_get_logs_indexes_blocks_imported_outside_the_provider(
+        chain,
+        provider,
+        funded_address,
+        funded_address_private_key):
+    tx = _new_transaction(chain, funded_address, funded_address_private_key, CONTRACT_A, 9)
+    chain.apply_transaction(tx)
+    chain.mine_block()
+    assert not provider.log_index.is_up_to_date()
+
+    assert _summary(_get_logs(provider, fromBlock='0x5')) == [(5, A, (9, ))]
+    assert provider.log_index.is_up_to_date()
@@ -0,0 +1,241 @@
+import threading
+import time
+
+import pytest
+
+from eth_utils import encode_hex
+
+from eth._utils.address import force_bytes_to_address
+from eth.tools.factories.transaction import new_transaction
+
+pytest.importorskip('web3')
+
+from eth.web3support.local import (  # noqa: E402
+    BlockProductionPolicy,
+    LocalWeb3Provider,
+)
+from eth.web3support.rpc_server import JSONRPCDispatcher  # noqa: E402
+
+
+RECIPIENT = force_bytes_to_address(b'\x10\x10')
+
+# long enough for the sealing timer to fire, on a busy machine
+TIMEOUT = 5
+INTERVAL = 0.05
+
+
+def _send_transaction(provider, from_, private_key, gas=21000):
+    tx = new_transaction(
+        provider.chain.get_vm(),
+        from_,
+        RECIPIENT,
+        amount=1,
+        private_key=private_key,
+        gas=gas,
+    )
+    response = provider.make_request('eth_sendRawTransaction', [encode_hex(tx.encode())])
+    assert response['result'] == encode_hex(tx.hash)
+    return tx
+
+
+def _get_receipt(provider, tx):
+    return provider.make_request('eth_getTransactionReceipt', [encode_hex(tx.hash)])['result']
+
+
+def _head_number(provider):
+    return provider.chain.get_canonical_head().block_number
+
+
+@pytest.fixture
+def sender(funded_address, funded_address_private_key):
+    return funded_address, funded_address_private_key
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    (
+        {},
+        {'max_transactions': 0},
+        {'interval': 0},
+        {'interval': -1.0},
+    ),
+)
+def test_block_production_policy_validation(kwargs):
+    with pytest.raises(ValueError):
+        BlockProductionPolicy(**kwargs)
+
+
+def test_automine_seals_every_transaction(chain, sender):
+    provider = LocalWeb3Provider(chain)
+
+    first_tx = _send_transaction(provider, *sender)
+    assert _head_number(provider) == 1
+    second_tx = _send_transaction(provider, *sender)
+    assert _head_number(provider) == 2
+
+    for block_number, tx in ((1, first_tx), (2, second_tx)):
+        block = chain.get_canonical_block_by_number(block_number)
+        assert block.transactions == (tx,)
+
+        receipt = _get_receipt(provider, tx)
+        assert receipt['blockNumber'] == hex(block_number)
+        assert receipt['blockHash'] == encode_hex(block.hash)
+        assert receipt['transactionIndex'] == '0x0'
+    assert provider.pending == []
+
+
+def test_batch_size_seals_every_n_transactions(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_n_transactions(3))
+
+    txs = [_send_transaction(provider, *sender) for _ in range(2)]
+    # applied to the pending block, but not sealed yet
+    assert _head_number(provider) == 0
+    assert len(provider.pending) == 2
+    assert [_get_receipt(provider, tx) for tx in txs] == [None, None]
+
+    txs.append(_send_transaction(provider, *sender))
+    assert _head_number(provider) == 1
+    assert provider.pending == []
+
+    block = chain.get_canonical_block_by_number(1)
+    assert block.transactions == tuple(txs)
+    receipts = [_get_receipt(provider, tx) for tx in txs]
+    assert [receipt['transactionIndex'] for receipt in receipts] == ['0x0', '0x1', '0x2']
+    assert {receipt['blockHash'] for receipt in receipts} == {encode_hex(block.hash)}
+    # the gas of each transaction, not the cumulative gas of the block
+    assert {receipt['gasUsed'] for receipt in receipts} == {hex(21000)}
+
+
+def test_interval_seals_after_the_first_pending_transaction(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_interval(INTERVAL))
+
+    first_tx = _send_transaction(provider, *sender)
+    timer = provider._seal_timer
+    second_tx = _send_transaction(provider, *sender)
+    assert provider._seal_timer is timer
+    assert _head_number(provider) == 0
+
+    timer.join(TIMEOUT)
+    assert _head_number(provider) == 1
+    assert chain.get_canonical_block_by_number(1).transactions == (first_tx, second_tx)
+    assert provider.pending == []
+    assert provider._seal_timer is None
+
+    # no pending transaction, no timer and no empty block
+    time.sleep(INTERVAL * 4)
+    assert _head_number(provider) == 1
+
+
+def test_evm_mine_seals_before_the_interval(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_interval(60))
+
+    tx = _send_transaction(provider, *sender)
+    timer = provider._seal_timer
+    assert timer is not None
+
+    response = provider.make_request('evm_mine', [])
+    assert _head_number(provider) == 1
+    assert response['result'] == encode_hex(chain.get_canonical_head().hash)
+    assert _get_receipt(provider, tx)['blockNumber'] == '0x1'
+    # the timer of the sealed block was cancelled
+    assert provider._seal_timer is None
+    timer.join(TIMEOUT)
+    assert not timer.is_alive()
+
+
+def test_evm_mine_without_pending_transactions_mines_an_empty_block(chain):
+    provider = LocalWeb3Provider(chain)
+    provider.make_request('evm_mine', [])
+    assert _head_number(provider) == 1
+    assert chain.get_canonical_block_by_number(1).transactions == ()
+
+
+def test_transaction_overflowing_the_gas_limit_starts_a_new_block(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_n_transactions(10))
+    gas_limit = chain.header.gas_limit
+
+    first_tx = _send_transaction(provider, *sender)
+    # one more gas than what is left after the first transaction
+    second_tx = _send_transaction(provider, *sender, gas=gas_limit - 21000 + 1)
+
+    assert _head_number(provider) == 1
+    assert chain.get_canonical_block_by_number(1).transactions == (first_tx,)
+    assert [tx for tx, _, _ in provider.pending] == [second_tx]
+
+
+def test_timer_waits_for_the_write_lock(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_interval(INTERVAL))
+
+    with provider.write_lock:
+        _send_transaction(provider, *sender)
+        timer = provider._seal_timer
+
+        # the timer fires, but can't seal while a writer holds the lock
+        time.sleep(INTERVAL * 4)
+        assert timer.is_alive()
+        assert _head_number(provider) == 0
+
+    timer.join(TIMEOUT)
+    assert _head_number(provider) == 1
+
+
+def test_timer_waits_for_a_reading_request(chain, sender, monkeypatch):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_interval(INTERVAL))
+    _send_transaction(provider, *sender)
+    timer = provider._seal_timer
+
+    # a read-only request which is still reading the chain when the timer fires
+    reading = threading.Event()
+    done_reading = threading.Event()
+
+    def eth_getCode(params):
+        reading.set()
+        done_reading.wait(TIMEOUT)
+        return {'jsonrpc': '2.0', 'id': 0, 'result': '0x'}
+
+    monkeypatch.setattr(provider, 'eth_getCode', eth_getCode)
+    request = threading.Thread(target=provider.make_request, args=('eth_getCode', []))
+    request.start()
+    assert reading.wait(TIMEOUT)
+
+    time.sleep(INTERVAL * 4)
+    assert timer.is_alive()
+    assert _head_number(provider) == 0
+
+    done_reading.set()
+    request.join(TIMEOUT)
+    timer.join(TIMEOUT)
+    assert _head_number(provider) == 1
+
+
+def test_timer_does_not_seal_a_block_sealed_while_it_waited(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_interval(INTERVAL))
+
+    with provider.write_lock:
+        _send_transaction(provider, *sender)
+        timer = provider._seal_timer
+        time.sleep(INTERVAL * 4)
+        assert timer.is_alive()
+
+        # sealed by evm_mine while the timer waits for the lock
+        provider.make_request('evm_mine', [])
+        assert _head_number(provider) == 1
+
+    timer.join(TIMEOUT)
+    # the stale timer didn't seal an empty block
+    assert _head_number(provider) == 1
+
+
+def test_timer_waits_for_the_readers_of_the_concurrent_server(chain, sender):
+    provider = LocalWeb3Provider(chain, BlockProductionPolicy.every_interval(INTERVAL * 10))
+    dispatcher = JSONRPCDispatcher(provider)
+
+    _send_transaction(provider, *sender)
+    timer = provider._seal_timer
+    with dispatcher.lock.read_lock:
+        time.sleep(INTERVAL * 20)
+        assert timer.is_alive()
+        assert _head_number(provider) == 0
+
+    timer.join(TIMEOUT)
+    assert _head_number(provider) == 1
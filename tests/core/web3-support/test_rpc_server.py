@@ -0,0 +1,276 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('web3')
+
+from eth.web3support.local import LocalWeb3Provider  # noqa: E402
+from eth.web3support.rpc_server import (  # noqa: E402
+    INTERNAL_ERROR,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    ConcurrentWeb3RPCServer,
+    JSONRPCDispatcher,
+    ReadWriteLock,
+    RequestMetrics,
+)
+
+
+# long enough for a thread which isn't blocked to get the lock
+TIMEOUT = 5
+# long enough to be confident that a blocked thread stays blocked
+BLOCKED_TIMEOUT = 0.1
+
+
+def _acquire_in_thread(acquire, release=None, release_event=None):
+    """
+    Acquire a lock in another thread, and return an event set once it's acquired. With a
+    ``release_event``, the lock is released with ``release`` once the event is set.
+    """
+    acquired = threading.Event()
+
+    def run():
+        acquire()
+        acquired.set()
+        if release_event is not None:
+            release_event.wait(TIMEOUT)
+            release()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return acquired
+
+
+@pytest.fixture
+def dispatcher(chain):
+    return JSONRPCDispatcher(LocalWeb3Provider(chain))
+
+
+def _request(method, request_id=1, params=()):
+    request = {'jsonrpc': '2.0', 'method': method, 'params': list(params)}
+    if request_id is not None:
+        request['id'] = request_id
+    return request
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+    with lock.read_lock:
+        assert _acquire_in_thread(lock.acquire_read).wait(TIMEOUT)
+
+
+def test_writer_waits_for_readers():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    write_acquired = _acquire_in_thread(lock.acquire_write)
+    assert not write_acquired.wait(BLOCKED_TIMEOUT)
+
+    lock.release_read()
+    assert write_acquired.wait(TIMEOUT)
+
+
+def test_readers_wait_for_writer():
+    lock = ReadWriteLock()
+    lock.acquire_write()
+    read_acquired = _acquire_in_thread(lock.acquire_read)
+    assert not read_acquired.wait(BLOCKED_TIMEOUT)
+
+    lock.release_write()
+    assert read_acquired.wait(TIMEOUT)
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    release_write = threading.Event()
+    write_acquired = _acquire_in_thread(lock.acquire_write, lock.release_write, release_write)
+    assert not write_acquired.wait(BLOCKED_TIMEOUT)
+
+    # a reader arriving after the writer waits behind it, even though a reader holds the lock
+    read_acquired = _acquire_in_thread(lock.acquire_read)
+    assert not read_acquired.wait(BLOCKED_TIMEOUT)
+
+    lock.release_read()
+    assert write_acquired.wait(TIMEOUT)
+    assert not read_acquired.wait(BLOCKED_TIMEOUT)
+
+    release_write.set()
+    assert read_acquired.wait(TIMEOUT)
+
+
+def test_write_lock_is_reentrant():
+    lock = ReadWriteLock()
+    with lock.write_lock:
+        with lock.write_lock:
+            pass
+        # still held by this thread
+        assert not _acquire_in_thread(lock.acquire_read).wait(BLOCKED_TIMEOUT)
+
+
+def test_request_metrics():
+    metrics = RequestMetrics()
+    metrics.record('eth_call', 0.001)
+    metrics.record('eth_call', 0.003, is_error=True)
+    metrics.record('eth_chainId', 0.002)
+
+    stats = metrics.as_dict()
+    assert stats.keys() == {'eth_call', 'eth_chainId'}
+    assert stats['eth_call']['count'] == 2
+    assert stats['eth_call']['errors'] == 1
+    assert stats['eth_call']['mean_ms'] == pytest.approx(2)
+    assert stats['eth_call']['max_ms'] == pytest.approx(3)
+    assert stats['eth_chainId']['errors'] == 0
+
+
+def test_dispatch_single_request(dispatcher):
+    response = dispatcher.handle_payload(_request('eth_chainId', request_id='abc'))
+    # the id of the request is echoed, not the one numbered by the provider
+    assert response == {'jsonrpc': '2.0', 'id': 'abc', 'result': hex(1337)}
+
+
+def test_dispatch_batch(dispatcher):
+    responses = dispatcher.handle_payload([
+        _request('eth_chainId', request_id=1),
+        # a notification, which gets no response
+        _request('eth_chainId', request_id=None),
+        _request('eth_getCode', request_id=2, params=['0x' + '00' * 20, 'latest']),
+    ])
+    assert responses == [
+        {'jsonrpc': '2.0', 'id': 1, 'result': hex(1337)},
+        {'jsonrpc': '2.0', 'id': 2, 'result': '0x'},
+    ]
+
+
+def test_dispatch_notifications_only(dispatcher):
+    assert dispatcher.handle_payload([_request('eth_chainId', request_id=None)]) is None
+    assert dispatcher.handle_payload(_request('eth_chainId', request_id=None)) is None
+
+
+@pytest.mark.parametrize(
+    'payload, expected_id, expected_code',
+    (
+        ([], None, INVALID_REQUEST),
+        ('eth_chainId', None, INVALID_REQUEST),
+        ({'jsonrpc': '2.0', 'id': 1}, None, INVALID_REQUEST),
+        (_request('eth_doesNotExist', request_id=3), 3, METHOD_NOT_FOUND),
+        # the missing params make the provider raise
+        (_request('eth_getCode', request_id=4), 4, INTERNAL_ERROR),
+    ),
+)
+def test_dispatch_errors(dispatcher, payload, expected_id, expected_code):
+    response = dispatcher.handle_payload(payload)
+    assert response['jsonrpc'] == '2.0'
+    assert response['id'] == expected_id
+    assert response['error']['code'] == expected_code
+    assert 'result' not in response
+
+
+def test_dispatch_error_in_batch(dispatcher):
+    responses = dispatcher.handle_payload([
+        _request('eth_doesNotExist', request_id=1),
+        _request('eth_chainId', request_id=2),
+    ])
+    assert [response['id'] for response in responses] == [1, 2]
+    assert responses[0]['error']['code'] == METHOD_NOT_FOUND
+    assert responses[1]['result'] == hex(1337)
+
+
+def test_dispatch_records_metrics(dispatcher):
+    dispatcher.handle_payload([
+        _request('eth_chainId', request_id=1),
+        _request('eth_chainId', request_id=2),
+        _request('eth_doesNotExist', request_id=3),
+    ])
+    stats = dispatcher.metrics.as_dict()
+    assert stats['eth_chainId']['count'] == 2
+    assert stats['eth_chainId']['errors'] == 0
+    assert stats['eth_doesNotExist']['count'] == 1
+    assert stats['eth_doesNotExist']['errors'] == 1
+    assert stats['eth_doesNotExist']['max_ms'] >= stats['eth_doesNotExist']['mean_ms'] > 0
+
+
+@pytest.mark.parametrize(
+    'method, is_read_only',
+    (
+        ('eth_chainId', True),
+        ('eth_getCode', True),
+        ('evm_mine', False),
+        ('eth_sendRawTransaction', False),
+    ),
+)
+def test_dispatch_locks(dispatcher, monkeypatch, method, is_read_only):
+    lock = dispatcher.lock
+    seen = []
+
+    def record_lock_state(params):
+        seen.append((lock._readers, lock._writer))
+        return {'jsonrpc': '2.0', 'id': 0, 'result': None}
+
+    monkeypatch.setattr(dispatcher.local_provider, method, record_lock_state)
+    dispatcher.handle_payload(_request(method))
+
+    if is_read_only:
+        assert seen == [(1, None)]
+    else:
+        assert seen == [(0, threading.get_ident())]
+
+
+def test_provider_shares_the_write_lock(dispatcher):
+    assert dispatcher.local_provider.write_lock is dispatcher.lock.write_lock
+
+
+@pytest.fixture
+def server_address(chain):
+    server = ConcurrentWeb3RPCServer(chain).make_server('127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _post(connection, body):
+    connection.request('POST', '/', body=body, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def test_server_keeps_connection_alive(server_address):
+    connection = http.client.HTTPConnection(*server_address, timeout=TIMEOUT)
+    try:
+        status, body = _post(connection, json.dumps(_request('eth_chainId', request_id=1)))
+        assert status == 200
+        assert json.loads(body) == {'jsonrpc': '2.0', 'id': 1, 'result': hex(1337)}
+
+        # same connection
+        status, body = _post(connection, json.dumps([
+            _request('eth_chainId', request_id=2),
+            _request('eth_chainId', request_id=3),
+        ]))
+        assert status == 200
+        assert [response['id'] for response in json.loads(body)] == [2, 3]
+
+        status, body = _post(connection, json.dumps(_request('eth_chainId', request_id=None)))
+        assert status == 204
+        assert body == b''
+
+        status, body = _post(connection, b'{not json')
+        assert status == 200
+        assert json.loads(body)['error']['code'] == PARSE_ERROR
+
+        connection.request('GET', '/metrics')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())['eth_chainId']['count'] == 4
+
+        connection.request('GET', '/')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+    finally:
+        connection.close()
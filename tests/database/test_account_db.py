@@ -1,3 +1,5 @@
+import random
+
 import pytest
 
 from eth_hash.auto import keccak
@@ -11,10 +13,17 @@ from eth.db.backends.memory import MemoryDB
 from eth.db.account import (
     AccountDB,
 )
+from eth.db.cache import (
+    CodeCache,
+    StorageSlotCache,
+)
 
 from eth.constants import (
     EMPTY_SHA3,
 )
+from eth._utils.padding import (
+    pad32,
+)
 
 
 ADDRESS = b'\xaa' * 20
@@ -325,3 +334,256 @@ def test_meta_witness_reset_stats_refilled(account_db):
     #   the code for this account must be listed in the witness
     assert THIRD_ADDRESS in meta_witness.account_bytecodes_queried
     assert meta_witness.get_slots_queried(THIRD_ADDRESS) == frozenset()
+
+
+@pytest.fixture
+def code_cache(monkeypatch):
+    code_cache = CodeCache()
+    monkeypatch.setattr(AccountDB, 'code_cache', code_cache)
+    return code_cache
+
+
+def test_code_cache_is_shared_between_account_dbs(base_db, code_cache):
+    account_db = AccountDB(base_db)
+    account_db.set_code(ADDRESS, b'code')
+
+    # code that was just written is served by the journal, not the cache
+    assert account_db.get_code(ADDRESS) == b'code'
+    assert len(code_cache) == 0
+    account_db.persist()
+
+    first_db = AccountDB(base_db, account_db.state_root)
+    assert first_db.get_code(ADDRESS) == b'code'
+    assert (code_cache.hits, code_cache.misses) == (0, 1)
+    assert keccak(b'code') in code_cache
+
+    second_db = AccountDB(base_db, account_db.state_root)
+    assert second_db.get_code(ADDRESS) == b'code'
+    assert (code_cache.hits, code_cache.misses) == (1, 1)
+
+
+def test_code_cache_hits_are_part_of_the_witness(base_db, code_cache):
+    account_db = AccountDB(base_db)
+    account_db.set_code(ADDRESS, b'code')
+    account_db.persist()
+
+    AccountDB(base_db, account_db.state_root).get_code(ADDRESS)
+
+    cached_db = AccountDB(base_db, account_db.state_root)
+    cached_db.get_code(ADDRESS)
+    assert code_cache.hits == 1
+
+    meta_witness = cached_db.persist()
+    assert ADDRESS in meta_witness.account_bytecodes_queried
+    assert keccak(b'code') in meta_witness.hashes
+
+
+def test_code_cache_byte_budget():
+    code_cache = CodeCache(max_bytes=10)
+    code_cache.add(keccak(b'first'), b'first')
+    code_cache.add(keccak(b'second'), b'second')
+
+    assert keccak(b'first') not in code_cache
+    assert code_cache.get(keccak(b'second')) == b'second'
+    assert code_cache.size_bytes == 6
+
+    code_cache.add(keccak(b'much too long'), b'much too long')
+    assert len(code_cache) == 1
+
+    code_cache.clear()
+    assert (len(code_cache), code_cache.size_bytes, code_cache.hits) == (0, 0, 0)
+
+
+@pytest.fixture
+def storage_slot_cache(monkeypatch):
+    storage_slot_cache = StorageSlotCache()
+    monkeypatch.setattr(AccountDB, 'storage_slot_cache', storage_slot_cache)
+    return storage_slot_cache
+
+
+def test_storage_slot_cache_is_shared_across_blocks(base_db, storage_slot_cache):
+    account_db = AccountDB(base_db)
+    account_db.set_storage(ADDRESS, 1, 2)
+    account_db.set_storage(ADDRESS, 3, 4)
+    account_db.persist()
+    assert (ADDRESS, account_db._get_storage_root(ADDRESS), keccak(pad32(b'\x01'))) in (
+        storage_slot_cache
+    )
+
+    # the slots written in the last block are cached, the others are cached when read
+    first_db = AccountDB(base_db, account_db.state_root)
+    assert first_db.get_storage(ADDRESS, 1) == 2
+    assert first_db.get_storage(ADDRESS, 5) == 0
+    assert (storage_slot_cache.hits, storage_slot_cache.misses) == (1, 1)
+
+    # the next block changes another slot, the cached slots move to the new storage root
+    first_db.set_storage(ADDRESS, 3, 6)
+    first_db.persist()
+    second_db = AccountDB(base_db, first_db.state_root)
+    assert second_db.get_storage(ADDRESS, 1) == 2
+    assert second_db.get_storage(ADDRESS, 3) == 6
+    assert second_db.get_storage(ADDRESS, 5) == 0
+    assert (storage_slot_cache.hits, storage_slot_cache.misses) == (4, 1)
+
+    # the storage is wiped and rewritten in the same block, only the new slots are kept
+    second_db.delete_storage(ADDRESS)
+    second_db.set_storage(ADDRESS, 5, 7)
+    second_db.persist()
+    third_db = AccountDB(base_db, second_db.state_root)
+    assert third_db.get_storage(ADDRESS, 1) == 0
+    assert third_db.get_storage(ADDRESS, 5) == 7
+    assert (storage_slot_cache.hits, storage_slot_cache.misses) == (5, 2)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_storage_slot_cache_matches_tries(storage_slot_cache, seed):
+    rng = random.Random(seed)
+    dbs = (AtomicDB(), AtomicDB())
+    state_roots = [AccountDB(db).state_root for db in dbs]
+
+    for _ in range(8):
+        account_db, uncached_db = (AccountDB(db, root) for db, root in zip(dbs, state_roots))
+        uncached_db.storage_slot_cache = None
+        for _ in range(20):
+            address = bytes([rng.randrange(3)]) * 20
+            slot = rng.randrange(6)
+            operation = rng.randrange(6)
+            if operation == 0:
+                account_db.delete_storage(address)
+                uncached_db.delete_storage(address)
+            elif operation == 1:
+                value = rng.randrange(3)
+                account_db.set_storage(address, slot, value)
+                uncached_db.set_storage(address, slot, value)
+            elif operation == 2:
+                account_db.lock_changes()
+                uncached_db.lock_changes()
+            else:
+                assert account_db.get_storage(address, slot) == uncached_db.get_storage(
+                    address,
+                    slot,
+                )
+
+        account_db.persist()
+        uncached_db.persist()
+        state_roots = [account_db.state_root, uncached_db.state_root]
+        assert state_roots[0] == state_roots[1]
+
+    assert storage_slot_cache.hits > 0
+
+
+def test_storage_slot_cache_byte_budget():
+    storage_slot_cache = StorageSlotCache(max_bytes=300)
+    first_root, second_root = b'\x01' * 32, b'\x02' * 32
+    storage_slot_cache.add(ADDRESS, first_root, {b'\x0a' * 32: b'\x01', b'\x0b' * 32: b'\x02'})
+    storage_slot_cache.add(OTHER_ADDRESS, first_root, {b'\x0a' * 32: b'\x03'})
+
+    # the whole least recently used storage is evicted
+    assert (ADDRESS, first_root, b'\x0a' * 32) not in storage_slot_cache
+    assert storage_slot_cache.get(OTHER_ADDRESS, first_root, b'\x0a' * 32) == b'\x03'
+    assert (len(storage_slot_cache), storage_slot_cache.evictions) == (1, 2)
+
+    storage_slot_cache.move(OTHER_ADDRESS, first_root, second_root, {b'\x0b' * 32: b''})
+    assert storage_slot_cache.get(OTHER_ADDRESS, first_root, b'\x0a' * 32) is None
+    assert storage_slot_cache.get(OTHER_ADDRESS, second_root, b'\x0a' * 32) == b'\x03'
+    assert storage_slot_cache.get(OTHER_ADDRESS, second_root, b'\x0b' * 32) == b''
+    assert storage_slot_cache.size_bytes == 241
+
+    storage_slot_cache.clear()
+    assert (len(storage_slot_cache), storage_slot_cache.size_bytes) == (0, 0)
+
+
+def test_fork_reads_through_pending_changes(account_db):
+    account_db.set_balance(ADDRESS, 10)
+    account_db.set_code(ADDRESS, b'code')
+    account_db.set_storage(ADDRESS, 1, 2)
+    account_db.persist()
+    account_db.set_storage(ADDRESS, 1, 3)
+    account_db.set_storage(OTHER_ADDRESS, 4, 5)
+    account_db.set_nonce(OTHER_ADDRESS, 1)
+
+    fork = account_db.fork()
+    assert fork.get_balance(ADDRESS) == 10
+    assert fork.get_code(ADDRESS) == b'code'
+    assert fork.get_storage(ADDRESS, 1) == 3
+    assert fork.get_storage(OTHER_ADDRESS, 4) == 5
+    assert fork.get_nonce(OTHER_ADDRESS) == 1
+
+    # the pending changes of the parent are the original values of the fork
+    fork.set_storage(ADDRESS, 1, 6)
+    assert fork.get_storage(ADDRESS, 1, from_journal=False) == 3
+
+
+def test_fork_changes_are_not_seen_by_parent(account_db):
+    account_db.set_balance(ADDRESS, 10)
+    account_db.set_storage(ADDRESS, 1, 2)
+    account_db.set_storage(OTHER_ADDRESS, 1, 2)
+    state_root = account_db.make_state_root()
+
+    fork = account_db.fork()
+    fork.set_balance(ADDRESS, 20)
+    fork.set_storage(ADDRESS, 1, 3)
+    fork.set_code(OTHER_ADDRESS, b'code')
+    fork.delete_account(OTHER_ADDRESS)
+    assert fork.get_balance(ADDRESS) == 20
+    assert fork.get_storage(ADDRESS, 1) == 3
+    assert fork.get_storage(OTHER_ADDRESS, 1) == 0
+    assert not fork.account_exists(OTHER_ADDRESS)
+
+    checkpoint = fork.record()
+    fork.set_balance(ADDRESS, 30)
+    fork.discard(checkpoint)
+    assert fork.get_balance(ADDRESS) == 20
+
+    assert account_db.get_balance(ADDRESS) == 10
+    assert account_db.get_storage(ADDRESS, 1) == 2
+    assert account_db.get_storage(OTHER_ADDRESS, 1) == 2
+    assert account_db.get_code(OTHER_ADDRESS) == b''
+    assert account_db.make_state_root() == state_root
+
+    with pytest.raises(ValidationError):
+        fork.make_state_root()
+    with pytest.raises(ValidationError):
+        fork.persist()
+
+
+def test_fork_of_fork(account_db):
+    account_db.set_storage(ADDRESS, 1, 2)
+    fork = account_db.fork()
+    fork.set_storage(ADDRESS, 2, 3)
+    fork.lock_changes()
+
+    fork_of_fork = fork.fork()
+    assert fork_of_fork.get_storage(ADDRESS, 1) == 2
+    assert fork_of_fork.get_storage(ADDRESS, 2) == 3
+    fork_of_fork.set_storage(ADDRESS, 2, 4)
+    assert fork.get_storage(ADDRESS, 2) == 3
+    assert account_db.get_storage(ADDRESS, 2) == 0
+
+
+def test_prefetch_reads_accounts_and_slots_in_batches(base_db):
+    account_db = AccountDB(base_db)
+    account_db.set_balance(ADDRESS, 10)
+    account_db.set_storage(ADDRESS, 1, 2)
+    account_db.set_storage(ADDRESS, 3, 4)
+    account_db.persist()
+
+    class CountingDB(AtomicDB):
+        num_reads = 0
+
+        def __getitem__(self, key):
+            self.num_reads += 1
+            return super().__getitem__(key)
+
+    counting_db = CountingDB(base_db)
+    account_db = AccountDB(counting_db, account_db.state_root)
+    account_db.prefetch([(ADDRESS, (1, 3, 5)), (OTHER_ADDRESS, (1,))])
+    assert counting_db.num_reads == 0
+
+    assert account_db.get_balance(ADDRESS) == 10
+    assert account_db.get_storage(ADDRESS, 1) == 2
+    assert account_db.get_storage(ADDRESS, 3) == 4
+    assert account_db.get_storage(ADDRESS, 5) == 0
+    assert account_db.get_balance(OTHER_ADDRESS) == 0
+    assert account_db.get_storage(OTHER_ADDRESS, 1) == 0
+    assert counting_db.num_reads == 0
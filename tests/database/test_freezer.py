@@ -0,0 +1,215 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import pytest
+
+from eth.chains.base import MiningChain
+from eth.db.chain import ChainDB
+from eth.db.freezer import (
+    BlockFreezer,
+    FreezerTable,
+)
+from eth.tools.builder.chain import api
+from eth.tools.factories.transaction import new_transaction
+
+
+RECIPIENT = b'\xbb' * 20
+
+
+@pytest.fixture
+def chain(funded_address, funded_address_initial_balance):
+    return api.build(
+        MiningChain,
+        api.london_at(0),
+        api.disable_pow_check(),
+        api.genesis(params={'gas_limit': 3141592}, state={
+            funded_address: {
+                'balance': funded_address_initial_balance,
+                'nonce': 0,
+                'code': b'',
+                'storage': {},
+            },
+        }),
+    )
+
+
+def _mine_blocks(chain, funded_address, private_key, num_blocks):
+    for block_index in range(num_blocks):
+        for _ in range(block_index % 3):
+            tx = new_transaction(chain.get_vm(), funded_address, RECIPIENT, private_key=private_key)
+            chain.apply_transaction(tx)
+        chain.mine_block()
+
+
+def _read_blocks(chain):
+    blocks = []
+    for block_number in range(chain.get_canonical_head().block_number + 1):
+        block = chain.get_canonical_block_by_number(block_number)
+        receipts = block.get_receipts(chain.chaindb)
+        blocks.append((block, receipts))
+    return blocks
+
+
+def test_freezer_table(tmp_path):
+    table = FreezerTable(tmp_path, 'items', items_per_segment=3)
+    items = [bytes([index]) * index for index in range(8)]
+    for item in items:
+        table.append(item)
+        # items are readable as soon as they're appended
+        assert bytes(table[len(table) - 1]) == item
+    table.flush()
+    assert [bytes(table[index]) for index in range(len(table))] == items
+
+    with pytest.raises(IndexError):
+        table[8]
+
+    # reopened, and with a partly written item at the end
+    table.close()
+    with open(tmp_path / 'items.000002.dat', 'ab') as data_file:
+        data_file.write(b'partial')
+    table = FreezerTable(tmp_path, 'items', items_per_segment=3)
+    table.truncate(len(table))
+    table.append(b'next')
+    assert [bytes(table[index]) for index in range(len(table))] == items + [b'next']
+
+    table.truncate(2)
+    assert len(table) == 2
+    assert not (tmp_path / 'items.000002.idx').exists()
+    assert len(FreezerTable(tmp_path, 'items', items_per_segment=3)) == 2
+
+
+def _record_fsyncs(monkeypatch, path):
+    """
+    Record the names of the files in ``path`` which are synced, and '.' for ``path`` itself.
+    """
+    synced = []
+    fsync = os.fsync
+
+    def record_fsync(fd):
+        names_by_inode = {path.stat().st_ino: '.'}
+        names_by_inode.update((file.stat().st_ino, file.name) for file in path.iterdir())
+        synced.append(names_by_inode[os.fstat(fd).st_ino])
+        fsync(fd)
+
+    monkeypatch.setattr(os, 'fsync', record_fsync)
+    return synced
+
+
+def test_freezer_table_flush_syncs_to_disk(tmp_path, monkeypatch):
+    synced = _record_fsyncs(monkeypatch, tmp_path)
+    table = FreezerTable(tmp_path, 'items', items_per_segment=2)
+    table.append(b'a')
+    table.flush()
+    # the files, and the directory with the new files
+    assert synced == ['items.000000.dat', 'items.000000.idx', '.']
+
+    synced.clear()
+    table.flush()
+    table.append(b'b')
+    assert bytes(table[1]) == b'b'
+    assert synced == []
+    table.flush()
+    assert synced == ['items.000000.dat', 'items.000000.idx']
+
+    # the items of a segment are synced before the next segment is opened
+    synced.clear()
+    table.append(b'c')
+    table.append(b'd')
+    table.append(b'e')
+    assert synced == ['items.000001.dat', 'items.000001.idx', '.']
+    synced.clear()
+    table.flush()
+    assert synced == ['items.000002.dat', 'items.000002.idx', '.']
+
+
+def test_chain_reads_frozen_blocks(chain, funded_address, funded_address_private_key, tmp_path):
+    _mine_blocks(chain, funded_address, funded_address_private_key, 10)
+    expected_blocks = _read_blocks(chain)
+
+    freezer = BlockFreezer(tmp_path, blocks_per_segment=4)
+    chain.chaindb = ChainDB(
+        chain.chaindb.db,
+        freezer,
+        ancient_block_distance=3,
+        freeze_batch_size=4,
+    )
+    _mine_blocks(chain, funded_address, funded_address_private_key, 1)
+    # blocks are not frozen on import
+    assert freezer.frozen_count == 0
+
+    # blocks 0 to 8 are ancient, but only two full batches are frozen
+    assert chain.chaindb.freeze_ancient_blocks() == 8
+    assert freezer.frozen_count == 8
+    assert chain.chaindb.freeze_ancient_blocks() == 0
+
+    # the trie nodes of the frozen blocks stay in the database, they may be shared
+    frozen_block = expected_blocks[5][0]
+    assert frozen_block.transactions
+    assert frozen_block.header.transaction_root in chain.chaindb.db
+    shared_receipt_root = expected_blocks[6][0].header.receipt_root
+    assert expected_blocks[9][0].header.receipt_root == shared_receipt_root
+    assert shared_receipt_root in chain.chaindb.db
+
+    assert _read_blocks(chain)[:len(expected_blocks)] == expected_blocks
+    for block, _ in expected_blocks:
+        for index, transaction in enumerate(block.transactions):
+            transaction_class = chain.get_vm_class(block.header).get_transaction_builder()
+            assert chain.chaindb.get_transaction_by_index(
+                block.number,
+                index,
+                transaction_class,
+            ) == transaction
+
+    # the freezer is read again after a restart
+    freezer.close()
+    chain.chaindb = ChainDB(chain.chaindb.db, BlockFreezer(tmp_path, blocks_per_segment=4))
+    assert _read_blocks(chain)[:len(expected_blocks)] == expected_blocks
+
+
+def test_ancient_blocks_are_frozen_in_the_executor(
+        chain,
+        funded_address,
+        funded_address_private_key,
+        tmp_path,
+        monkeypatch):
+    _mine_blocks(chain, funded_address, funded_address_private_key, 4)
+
+    freezer = BlockFreezer(tmp_path)
+    flush = freezer.flush
+    counts_at_flush = []
+
+    def record_flush():
+        counts_at_flush.append(freezer.frozen_count)
+        flush()
+
+    monkeypatch.setattr(freezer, 'flush', record_flush)
+    with ThreadPoolExecutor(1) as executor:
+        chain.chaindb = ChainDB(
+            chain.chaindb.db,
+            freezer,
+            ancient_block_distance=2,
+            freeze_batch_size=2,
+            freeze_executor=executor,
+        )
+        _mine_blocks(chain, funded_address, funded_address_private_key, 1)
+
+    # blocks 0 to 3 are ancient, each batch is written to disk as it's frozen
+    assert freezer.frozen_count == 4
+    assert counts_at_flush == [2, 4]
+
+
+def test_freezer_drops_partly_frozen_block(tmp_path):
+    freezer = BlockFreezer(tmp_path)
+    freezer.append_block(0, b'\x01' * 32, b'header', [b'tx'], b'\xc0', [b'receipt'])
+    freezer.flush()
+    freezer.close()
+
+    # the process stopped after writing the header of the next block
+    with open(tmp_path / 'headers.000000.idx', 'ab') as index_file:
+        index_file.write((100).to_bytes(8, 'big'))
+
+    freezer = BlockFreezer(tmp_path)
+    assert freezer.frozen_count == 1
+    assert bytes(freezer.get_block(0).header) == b'header'
+    freezer.append_block(1, b'\x02' * 32, b'header-1', [], b'\xc0', [])
+    assert bytes(freezer.get_block(1).header) == b'header-1'
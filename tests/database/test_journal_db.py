@@ -692,6 +692,33 @@ def test_journal_db_commit_then_discard(journal_db):
     assert 1 not in journal_db
 
 
+def test_journal_db_deep_checkpoints(journal_db):
+    checkpoints = []
+    for depth in range(1024):
+        checkpoints.append(journal_db.record())
+        if depth == 512:
+            journal_db.clear()
+        journal_db[b'depth'] = depth.to_bytes(2, 'big')
+        journal_db[depth.to_bytes(2, 'big')] = b'value'
+
+    for checkpoint in reversed(checkpoints[600:]):
+        assert journal_db.has_checkpoint(checkpoint)
+        journal_db.commit(checkpoint)
+        assert not journal_db.has_checkpoint(checkpoint)
+    assert journal_db[b'depth'] == (1023).to_bytes(2, 'big')
+
+    journal_db.discard(checkpoints[513])
+    assert journal_db[b'depth'] == (512).to_bytes(2, 'big')
+    assert (511).to_bytes(2, 'big') not in journal_db
+    assert journal_db.has_clear()
+
+    journal_db.commit(checkpoints[1])
+    journal_db.discard(checkpoints[0])
+    assert not journal_db.has_clear()
+    assert b'depth' not in journal_db
+    assert journal_db.diff().pending_items() == ()
+
+
 class JournalComparison(RuleBasedStateMachine):
     """
     Compare an older version of JournalDB against a newer, optimized one.
@@ -1,7 +1,10 @@
 import pytest
 
+from eth_utils import ValidationError
+
 from eth.db.backends.memory import MemoryDB
 from eth.db.atomic import AtomicDB
+from eth.db.backends.level import LevelDB
 from eth.db import (
     get_db_backend,
 )
@@ -64,3 +67,25 @@ def test_delete(level_db, memory_db):
     level_db.delete(b'1')
     memory_db.delete(b'1')
     assert level_db.exists(b'1') == memory_db.exists(b'1')
+
+
+def test_level_db_options(tmpdir):
+    level_db = LevelDB(
+        tmpdir.mkdir("level_db_path"),
+        block_cache_size=1024 * 1024,
+        bloom_filter_bits=10,
+        compression=None,
+    )
+    level_db.set(b'1', b'1')
+    assert level_db.get(b'1') == b'1'
+
+
+def test_write_only_batch_cannot_be_read(level_db):
+    level_db.set(b'1', b'1')
+    with level_db.write_only_batch() as batch:
+        batch.set(b'2', b'2')
+        with pytest.raises(ValidationError):
+            batch[b'1']
+        with pytest.raises(ValidationError):
+            b'1' in batch
+    assert level_db.get(b'2') == b'2'
@@ -0,0 +1,201 @@
+import pytest
+
+from eth_utils import (
+    ValidationError,
+    int_to_big_endian,
+)
+
+from eth.chains.base import MiningChain
+from eth.db.log_index import LogIndexDB
+from eth.tools.builder.chain import api
+from eth.tools.factories.transaction import new_transaction
+
+
+# PUSH1 0x00; CALLDATALOAD; PUSH1 0x00; PUSH1 0x00; LOG1 -- log the first word of calldata
+LOG_CALLDATA = bytes.fromhex('600035' '6000' '6000' 'a1')
+# PUSH1 0x00; CALLDATALOAD; PUSH1 0x20; CALLDATALOAD; PUSH1 0x00; PUSH1 0x00; LOG2
+LOG_TWO_TOPICS = bytes.fromhex('600035' '602035' '6000' '6000' 'a2')
+
+CONTRACT_A = b'\xaa' * 20
+CONTRACT_B = b'\xbb' * 20
+
+
+@pytest.fixture
+def chain(funded_address, funded_address_initial_balance):
+    return api.build(
+        MiningChain,
+        api.london_at(0),
+        api.disable_pow_check(),
+        api.genesis(params={'gas_limit': 3141592}, state={
+            funded_address: {
+                'balance': funded_address_initial_balance,
+                'nonce': 0,
+                'code': b'',
+                'storage': {},
+            },
+            CONTRACT_A: {'balance': 0, 'nonce': 0, 'code': LOG_CALLDATA, 'storage': {}},
+            CONTRACT_B: {'balance': 0, 'nonce': 0, 'code': LOG_TWO_TOPICS, 'storage': {}},
+        }),
+    )
+
+
+def _topic_data(*topics):
+    return b''.join(int_to_big_endian(topic).rjust(32, b'\0') for topic in topics)
+
+
+def _mine_block(chain, funded_address, private_key, calls):
+    for to, topics in calls:
+        tx = new_transaction(
+            chain.get_vm(),
+            funded_address,
+            to,
+            private_key=private_key,
+            data=_topic_data(*topics),
+        )
+        _, _, computation = chain.apply_transaction(tx)
+        computation.raise_if_error()
+    return chain.mine_block()
+
+
+def _mine_test_blocks(chain, funded_address, private_key, num_blocks, first_topic=0):
+    for block_index in range(num_blocks):
+        topic = first_topic + block_index
+        if block_index % 5 == 4:
+            calls = []
+        elif block_index % 2:
+            calls = [(CONTRACT_A, (topic % 3, )), (CONTRACT_B, (7, topic % 3))]
+        else:
+            calls = [(CONTRACT_A, (topic % 3, ))]
+        _mine_block(chain, funded_address, private_key, calls)
+
+
+def _scan_logs(chain, from_block, to_block, addresses, topics):
+    # the logs matching the filter, by reading every block
+    logs = []
+    for block_number in range(from_block, to_block + 1):
+        block = chain.get_canonical_block_by_number(block_number)
+        log_index = 0
+        for transaction_index, receipt in enumerate(block.get_receipts(chain.chaindb)):
+            for log in receipt.logs:
+                address_match = not addresses or log.address in addresses
+                topics_match = len(topics) <= len(log.topics) and all(
+                    topic_filter is None or topic in topic_filter
+                    for topic, topic_filter in zip(log.topics, topics)
+                )
+                if address_match and topics_match:
+                    logs.append((
+                        block_number,
+                        block.transactions[transaction_index].hash,
+                        log_index,
+                        log.address,
+                        tuple(log.topics),
+                    ))
+                log_index += 1
+    return logs
+
+
+def _summary(indexed_logs):
+    return [
+        (log.block_number, log.transaction_hash, log.log_index, log.address, log.topics)
+        for log in indexed_logs
+    ]
+
+
+@pytest.mark.parametrize(
+    'from_block, to_block, addresses, topics',
+    (
+        (0, 12, (), ()),
+        (0, 12, (CONTRACT_A, ), ()),
+        (3, 9, (CONTRACT_B, ), ()),
+        (0, 12, (), ({1}, )),
+        (0, 12, (), ({0, 2}, )),
+        (0, 12, (), (None, {1})),
+        (0, 12, (CONTRACT_A, CONTRACT_B), ({7}, {2})),
+        (5, 5, (CONTRACT_A, ), ({5 % 3}, )),
+        (0, 12, (b'\xcc' * 20, ), ()),
+        (0, 12, (), ({1}, None, None)),
+    ),
+)
+def test_get_logs_matches_block_scan(
+        chain,
+        funded_address,
+        funded_address_private_key,
+        from_block,
+        to_block,
+        addresses,
+        topics):
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 12)
+    log_index = LogIndexDB(chain, bucket_size=4)
+
+    expected = _scan_logs(chain, from_block, to_block, addresses, topics)
+    actual = log_index.get_logs(from_block, to_block, addresses, topics)
+
+    assert _summary(actual) == expected
+    assert all(log.block_hash == chain.get_canonical_block_hash(log.block_number) for log in actual)
+
+
+def test_log_index_follows_new_blocks(chain, funded_address, funded_address_private_key):
+    log_index = LogIndexDB(chain, bucket_size=4)
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 3)
+    assert len(log_index.get_logs(0, addresses=(CONTRACT_A, ))) == 3
+
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 6, first_topic=3)
+    expected = _scan_logs(chain, 0, 9, (CONTRACT_A, ), ())
+    assert _summary(log_index.get_logs(0, addresses=(CONTRACT_A, ))) == expected
+
+    # the index is persisted in the chain database
+    assert _summary(LogIndexDB(chain, bucket_size=4).get_logs(0, 9, (CONTRACT_A, ))) == expected
+
+
+def test_log_index_rejects_other_bucket_size(chain):
+    LogIndexDB(chain, bucket_size=4).update()
+    with pytest.raises(ValidationError):
+        LogIndexDB(chain, bucket_size=8).update()
+
+
+def test_log_index_after_reorg(chain, funded_address, funded_address_private_key):
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 3)
+    fork_chain = api.build(chain, api.copy())
+
+    log_index = LogIndexDB(chain, bucket_size=4)
+    _mine_block(chain, funded_address, funded_address_private_key, [(CONTRACT_A, (11, ))])
+    assert len(log_index.get_logs(0, topics=({11}, ))) == 1
+
+    for topic in (12, 13):
+        calls = [(CONTRACT_B, (topic, 0))]
+        _mine_block(fork_chain, funded_address, funded_address_private_key, calls)
+    for block_number in (4, 5):
+        chain.import_block(fork_chain.get_canonical_block_by_number(block_number))
+    assert chain.get_canonical_head() == fork_chain.get_canonical_head()
+
+    assert log_index.get_logs(0, topics=({11}, )) == ()
+    assert _summary(log_index.get_logs(4)) == _scan_logs(chain, 4, 5, (), ())
+    assert _summary(log_index.get_logs(0)) == _scan_logs(chain, 0, 5, (), ())
+
+
+def test_get_logs_without_update(chain, funded_address, funded_address_private_key):
+    log_index = LogIndexDB(chain, bucket_size=4)
+    assert log_index.get_logs(0, update=False) == ()
+
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 3)
+    log_index.update()
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 3, first_topic=3)
+
+    # only the blocks indexed so far are searched
+    assert _summary(log_index.get_logs(0, update=False)) == _scan_logs(chain, 0, 3, (), ())
+    assert _summary(log_index.get_logs(0, 6, update=False)) == _scan_logs(chain, 0, 3, (), ())
+    assert _summary(log_index.get_logs(0)) == _scan_logs(chain, 0, 6, (), ())
+
+
+def test_log_index_is_up_to_date(chain, funded_address, funded_address_private_key):
+    log_index = LogIndexDB(chain, bucket_size=4)
+    assert not log_index.is_up_to_date()
+
+    log_index.update()
+    assert log_index.is_up_to_date()
+
+    _mine_test_blocks(chain, funded_address, funded_address_private_key, 2)
+    assert not log_index.is_up_to_date()
+
+    log_index.get_logs(0)
+    assert log_index.is_up_to_date()
@@ -0,0 +1,177 @@
+import random
+
+import pytest
+
+from eth.constants import BLANK_ROOT_HASH
+from eth.db.account import (
+    AccountDB,
+)
+from eth.db.atomic import AtomicDB
+from eth.db.backends.memory import MemoryDB
+from eth.db.snapshot import (
+    StateSnapshot,
+)
+
+
+ADDRESSES = tuple(bytes([index]) * 20 for index in range(1, 6))
+
+
+class SnapshotAccountDB(AccountDB):
+    use_snapshot = True
+
+
+@pytest.fixture
+def memory_db():
+    return MemoryDB()
+
+
+def _snapshot_entries(memory_db):
+    return {
+        key: value
+        for key, value in memory_db.kv_store.items()
+        if key.startswith(b'snapshot-')
+    }
+
+
+def _read_state(account_db):
+    return {
+        address: (
+            account_db.get_balance(address),
+            account_db.get_nonce(address),
+            tuple(account_db.get_storage(address, slot) for slot in range(4)),
+            account_db.account_exists(address),
+        )
+        for address in ADDRESSES
+    }
+
+
+def _random_changes(account_db, rng):
+    for _ in range(10):
+        address = rng.choice(ADDRESSES)
+        change = rng.randrange(6)
+        if change == 0:
+            account_db.set_balance(address, rng.randrange(10))
+        elif change == 1:
+            account_db.increment_nonce(address)
+        elif change in (2, 3):
+            account_db.set_storage(address, rng.randrange(4), rng.randrange(3))
+        elif change == 4:
+            account_db.delete_storage(address)
+        else:
+            account_db.delete_account(address)
+
+        if rng.randrange(4) == 0:
+            account_db.make_state_root()
+        else:
+            account_db.lock_changes()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_snapshot_follows_persisted_states(memory_db, seed):
+    rng = random.Random(seed)
+    db = AtomicDB(memory_db)
+    state_root = SnapshotAccountDB(db).state_root
+
+    for _ in range(8):
+        account_db = SnapshotAccountDB(db, state_root)
+        _random_changes(account_db, rng)
+        account_db.persist()
+        state_root = account_db.state_root
+
+        snapshot = StateSnapshot(db)
+        assert snapshot.state_root == state_root
+        expected_state = _read_state(AccountDB(db, state_root))
+        assert _read_state(SnapshotAccountDB(db, state_root)) == expected_state
+
+    # the snapshot holds exactly the entries of the state, without leftovers
+    generated_db = MemoryDB(dict(memory_db.kv_store))
+    for key in _snapshot_entries(memory_db):
+        del generated_db[key]
+    StateSnapshot(AtomicDB(generated_db)).generate(state_root)
+    assert _snapshot_entries(generated_db) == _snapshot_entries(memory_db)
+
+
+def test_snapshot_reads_skip_trie(memory_db):
+    db = AtomicDB(memory_db)
+    account_db = SnapshotAccountDB(db)
+    account_db.set_balance(ADDRESSES[0], 10)
+    account_db.set_storage(ADDRESSES[0], 1, 2)
+    account_db.persist()
+
+    account_db = SnapshotAccountDB(db, account_db.state_root)
+    assert account_db.get_balance(ADDRESSES[0]) == 10
+    assert account_db.get_storage(ADDRESSES[0], 1) == 2
+    assert account_db.get_balance(ADDRESSES[1]) == 0
+    assert len(account_db.persist().hashes) == 0
+
+    account_db = AccountDB(db, account_db.state_root)
+    assert account_db.get_storage(ADDRESSES[0], 1) == 2
+    assert len(account_db.persist().hashes) > 0
+
+
+def test_snapshot_not_used_at_other_roots(memory_db):
+    db = AtomicDB(memory_db)
+    account_db = SnapshotAccountDB(db)
+    account_db.set_storage(ADDRESSES[0], 1, 2)
+    account_db.persist()
+    first_root = account_db.state_root
+
+    # a state at the first root, which outlives the next persist
+    old_account_db = SnapshotAccountDB(db, first_root)
+
+    account_db.set_storage(ADDRESSES[0], 1, 3)
+    account_db.set_balance(ADDRESSES[0], 4)
+    account_db.persist()
+    second_root = account_db.state_root
+
+    assert old_account_db.get_storage(ADDRESSES[0], 1) == 2
+    assert old_account_db.get_balance(ADDRESSES[0]) == 0
+
+    # persisting another child of the first root leaves the snapshot where it is
+    old_account_db.set_balance(ADDRESSES[1], 5)
+    old_account_db.persist()
+    assert StateSnapshot(db).state_root == second_root
+    assert SnapshotAccountDB(db, old_account_db.state_root).get_balance(ADDRESSES[1]) == 5
+
+    # until it's rebuilt
+    StateSnapshot(db).generate(old_account_db.state_root)
+    account_db = SnapshotAccountDB(db, old_account_db.state_root)
+    assert account_db.get_storage(ADDRESSES[0], 1) == 2
+    assert account_db.get_balance(ADDRESSES[0]) == 0
+    assert account_db.get_balance(ADDRESSES[1]) == 5
+    assert len(account_db.persist().hashes) == 0
+
+
+def test_snapshot_root_is_shared_by_databases_over_one_store(memory_db):
+    db = AtomicDB(memory_db)
+    other_db = AtomicDB(memory_db)
+    other_snapshot = StateSnapshot(other_db)
+    assert other_snapshot.state_root == BLANK_ROOT_HASH
+
+    account_db = SnapshotAccountDB(db)
+    account_db.set_balance(ADDRESSES[0], 10)
+    account_db.persist()
+    state_root = account_db.state_root
+
+    # the snapshot of another database over the same store sees it move
+    assert other_snapshot.state_root == state_root
+    assert other_snapshot.get_account(state_root, ADDRESSES[0]) is not None
+    assert SnapshotAccountDB(other_db, state_root).get_balance(ADDRESSES[0]) == 10
+
+
+def test_snapshot_root_moves_when_the_batch_is_committed(memory_db):
+    db = AtomicDB(memory_db)
+    account_db = SnapshotAccountDB(db)
+    account_db.set_balance(ADDRESSES[0], 10)
+    account_db.persist()
+    state_root = account_db.state_root
+    snapshot = StateSnapshot(db)
+
+    with pytest.raises(ValueError):
+        with db.atomic_batch() as write_batch:
+            snapshot.update(write_batch, BLANK_ROOT_HASH, {ADDRESSES[0]: b''}, {})
+            raise ValueError("the batch is never committed")
+
+    assert snapshot.state_root == state_root
+    assert snapshot.get_account(BLANK_ROOT_HASH, ADDRESSES[0]) is None
+    assert SnapshotAccountDB(db, state_root).get_balance(ADDRESSES[0]) == 10
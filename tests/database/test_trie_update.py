@@ -0,0 +1,142 @@
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+import random
+
+import pytest
+from trie import HexaryTrie
+from trie.iter import NodeIterator
+
+from eth.constants import BLANK_ROOT_HASH
+from eth.db.account import (
+    AccountDB,
+)
+from eth.db.atomic import AtomicDB
+from eth.db.backends.memory import MemoryDB
+from eth.db.storage import AccountStorageDB
+from eth.db.trie import (
+    get_trie_items,
+    get_trie_update_nodes,
+    update_trie_items,
+)
+
+
+def _random_updates(rng, keys):
+    return {
+        key: b'' if rng.randrange(3) == 0 else bytes([rng.randrange(256)]) * rng.choice((1, 40))
+        for key in rng.sample(keys, rng.randrange(1, len(keys) + 1))
+    }
+
+
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('key_length', (1, 2, 32))
+def test_update_trie_items_matches_hexary_trie(seed, key_length):
+    rng = random.Random(seed)
+    db = {}
+    trie = HexaryTrie(db)
+    keys = list({
+        bytes(rng.randrange(256 if key_length == 32 else 4) for _ in range(key_length))
+        for _ in range(rng.randrange(1, 50))
+    })
+
+    for _ in range(4):
+        updates = _random_updates(rng, keys)
+
+        # the nodes along the updated paths are enough to compute the update
+        path_nodes = get_trie_update_nodes(db, trie.root_hash, updates)
+        assert update_trie_items(path_nodes, trie.root_hash, updates) == update_trie_items(
+            db,
+            trie.root_hash,
+            updates,
+        )
+
+        new_root, new_nodes = update_trie_items(db, trie.root_hash, updates)
+        for key, value in updates.items():
+            if value:
+                trie[key] = value
+            else:
+                del trie[key]
+        assert new_root == trie.root_hash
+
+        # the new root can be read from the new nodes
+        db.update(new_nodes)
+        new_trie = HexaryTrie(dict(db), new_root)
+        assert all(new_trie[key] == trie[key] for key in keys)
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('key_length', (1, 2, 32))
+def test_get_trie_items_matches_hexary_trie(seed, key_length):
+    rng = random.Random(seed)
+    db = {}
+    trie = HexaryTrie(db)
+    keys = list({
+        bytes(rng.randrange(256 if key_length == 32 else 4) for _ in range(key_length))
+        for _ in range(rng.randrange(1, 50))
+    })
+    for key in rng.sample(keys, rng.randrange(len(keys) + 1)):
+        trie[key] = bytes([rng.randrange(256)]) * rng.choice((1, 40))
+
+    assert get_trie_items(MemoryDB(db), trie.root_hash, keys) == {key: trie[key] for key in keys}
+
+    # the keys under a missing node are left out
+    for missing_node in {trie.root_hash, *rng.sample(list(db), min(len(db), 3))} & db.keys():
+        partial_db = {node_hash: db[node_hash] for node_hash in db if node_hash != missing_node}
+        items = get_trie_items(MemoryDB(partial_db), trie.root_hash, keys)
+        assert all(items[key] == trie[key] for key in items)
+        if missing_node == trie.root_hash:
+            assert items == {}
+
+
+def _make_state(account_db_class, db, state_root, rng):
+    account_db = account_db_class(db, state_root)
+    for _ in range(60):
+        address = bytes([rng.randrange(20)]) * 20
+        if rng.randrange(10) == 0:
+            account_db.delete_storage(address)
+        else:
+            account_db.set_storage(address, rng.randrange(8), rng.randrange(3))
+    return account_db
+
+
+@pytest.mark.parametrize('executor_class', (ThreadPoolExecutor, ProcessPoolExecutor))
+def test_parallel_storage_roots(executor_class):
+    class ParallelAccountDB(AccountDB):
+        min_parallel_storage_roots = 2
+
+    db = AtomicDB()
+    state_root = AccountDB(db).state_root
+    with executor_class(max_workers=2) as executor:
+        ParallelAccountDB.storage_root_executor = executor
+        for seed in range(4):
+            expected_db = _make_state(AccountDB, db, state_root, random.Random(seed))
+            expected_root = expected_db.make_state_root()
+
+            account_db = _make_state(ParallelAccountDB, db, state_root, random.Random(seed))
+            account_db.persist()
+            assert account_db.state_root == expected_root
+            state_root = expected_root
+
+
+def test_persisted_storage_nodes_are_the_nodes_of_the_trie():
+    rng = random.Random(0)
+    store = AccountStorageDB(AtomicDB(), BLANK_ROOT_HASH, b'\x01' * 20)
+    for _ in range(10):
+        for _ in range(20):
+            store.set(rng.randrange(40), rng.randrange(3))
+        store.make_storage_root()
+        # each update of the trie replaces nodes of the previous one
+        storage_root = store.get_changed_root()
+
+    persisted_db = MemoryDB()
+    store.persist(persisted_db)
+
+    # the nodes of the same trie, built from scratch
+    expected_nodes = {}
+    trie = HexaryTrie(expected_nodes)
+    with trie.squash_changes() as memory_trie:
+        for key, value in NodeIterator(HexaryTrie(persisted_db, storage_root)).items():
+            memory_trie[key] = value
+    assert trie.root_hash == storage_root
+    assert persisted_db.kv_store.keys() == expected_nodes.keys()
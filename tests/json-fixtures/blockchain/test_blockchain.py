@@ -376,12 +376,38 @@ EXPECTED_BAD_BLOCK_EXCEPTIONS = (
 )
 
 
-def test_blockchain_fixtures(fixture_data, fixture):
+def with_computation_options(vm_class, **options):
+    state_class = vm_class.get_state_class()
+    return vm_class.configure(
+        _state_class=state_class.configure(
+            computation_class=state_class.computation_class.configure(**options),
+        ),
+    )
+
+
+def test_blockchain_fixtures(fixture_data, fixture, request):
     try:
         chain = new_chain_from_fixture(fixture)
     except ValueError as e:
         raise AssertionError(f"could not load chain for {fixture_data}") from e
 
+    computation_options = {}
+    if request.config.getoption('superinstructions'):
+        computation_options['use_superinstructions'] = True
+    if request.config.getoption('gas_blocks'):
+        computation_options['use_gas_blocks'] = True
+
+    if computation_options:
+        # Re-open the same database with the execution options enabled in every VM,
+        # which must produce exactly the same blocks, receipts and state.
+        chain_class = type(chain)
+        chain = chain_class.configure(
+            vm_configuration=tuple(
+                (block_number, with_computation_options(vm_class, **computation_options))
+                for block_number, vm_class in chain_class.vm_configuration
+            ),
+        )(chain.chaindb.db)
+
     genesis_fields = genesis_fields_from_fixture(fixture)
 
     genesis_block = chain.get_canonical_block_by_number(0)